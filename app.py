@@ -1,44 +1,224 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Blueprint, current_app, render_template, request, jsonify, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from werkzeug.local import LocalProxy
 from werkzeug.utils import secure_filename
 from config import Config
+from db_config import build_engine_options, build_binds, configure_engine, RoutingSession, READ_BIND
 import os
+import time
+import uuid
+import shutil
+import threading
+import zipfile
 import datetime
-import openpyxl
-from openpyxl.utils import get_column_letter
-from sqlalchemy import or_, and_, func
-import re
+from contextlib import nullcontext
+from functools import wraps, partial
+from importer import iter_file_rows, file_format, run_import, run_batch_import, rollback_batch, extract_zip_workbooks, \
+    DimensionWriter, IMPORT_MODES
+from jobs import ImportJob, JobManager
+from uploads import SpooledUploadRequest, ResumableUploadStore, spool_copy, file_sha256
+from pagination import encode_cursor, decode_cursor
+from cache import ResultCache, DatabaseVersion, create_cache_backend
+from http_cache import make_etag, is_not_modified, set_validators, compress_response
+from serialization import make_row_serializer, init_json_provider
+from exporters import EXPORT_FORMATS, iter_csv, iter_ndjson, iter_xlsx
+from rollup import refresh_daily_rollup, rollup_available
+from search import ProductNameSearch, register_search_index
+from charting import CHART_GRANULARITIES, bucket_expression, resolve_granularity, to_date, lttb
+from sqlalchemy import or_, and_, func, select, exists, insert, update, event
+from sqlalchemy.exc import OperationalError, ProgrammingError
 
-app = Flask(__name__)
-app.config.from_object(Config)
+# 模型与路由在导入时定义，应用实例由create_app()创建：导入本模块不创建数据库引擎、不访问文件系统，
+# 无服务器函数（netlify/functions/app.py）冷启动时只做必要的工作
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+bp = Blueprint('inventory', __name__)
 
-# 初始化数据库
-db = SQLAlchemy(app)
-CORS(app)
+# 后台导入任务队列、查询结果缓存、产品名称搜索与分片上传会话属于应用实例，由create_app()创建并保存在app.extensions中
+job_manager = LocalProxy(lambda: current_app.extensions['job_manager'])
+result_cache = LocalProxy(lambda: current_app.extensions['result_cache'])
+product_search = LocalProxy(lambda: current_app.extensions['product_search'])
+upload_store = LocalProxy(lambda: current_app.extensions['upload_store'])
 
-# 确保上传目录存在
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+def reset_session_routing():
+    # 每个请求默认使用主库，只读接口由use_read_engine切换到读库
+    db.session.info['read_only'] = False
+
+def read_after_write():
+    """数据在READ_AFTER_WRITE_SECONDS秒内变更过时返回True：读库可能还没有同步，
+    此时读到的旧数据会按新的数据版本写入结果缓存并生成新的ETag，直到下次变更都不会失效，应改为查询主库"""
+    window = current_app.config['READ_AFTER_WRITE_SECONDS']
+    if window <= 0:
+        return False
+    # 变更时间可能略晚于当前时间（同一秒内的多次变更各前进一秒），窗口期相应延长
+    _, changed_at = result_cache.version_info()
+    return time.time() - changed_at < window
+
+def use_read_engine(view):
+    """只读接口：本次请求的查询使用读库（未配置读库或数据刚变更时仍使用主库）。
+    标记保留到请求结束，流式导出在视图返回后读取数据时同样使用读库"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        db.session.info['read_only'] = READ_BIND not in db.engines or not read_after_write()
+        return view(*args, **kwargs)
+    return wrapper
+
+def compress_json_response(response):
+    """较大的JSON响应按客户端支持的编码压缩（br/gzip）"""
+    if current_app.config['COMPRESS_RESPONSES']:
+        compress_response(response, request.accept_encodings,
+                          current_app.config['COMPRESS_MIN_SIZE'], current_app.config['COMPRESS_LEVEL'])
+    return response
+
+def request_validators():
+    """按数据版本、路径和查询参数生成当前请求的(ETag, 最后变更时间)，未启用HTTP缓存时返回None"""
+    if not current_app.config['HTTP_CACHE_ENABLED']:
+        return None
+    version_tag, changed_at = result_cache.version_info()
+    return make_etag(version_tag, request.path, request.args.items(multi=True)), changed_at
+
+def conditional_get(view):
+    """读接口的条件请求：客户端携带的ETag/Last-Modified与当前数据版本一致时直接返回304，不执行查询"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        validators = request_validators()
+        if validators is None:
+            return view(*args, **kwargs)
+        if is_not_modified(request, *validators):
+            return set_validators(Response(status=304), *validators)
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            set_validators(response, *validators)
+        return response
+    return wrapper
 
 # 数据模型
+class Supplier(db.Model):
+    """供应商维度表，导入时写入新出现的供应商，明细表通过supplier_id引用"""
+    __tablename__ = 'suppliers'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    name = db.Column(db.String(100), nullable=False, unique=True)
+    created_at = db.Column(db.DateTime, default=db.func.now())
+
+class Product(db.Model):
+    """SKU维度表，保存每个SKU最近一次导入的产品名称"""
+    __tablename__ = 'products'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    sku = db.Column(db.String(50), nullable=False, unique=True)
+    product_name = db.Column(db.String(200), nullable=True)
+    updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now())
+
+class ImportBatch(db.Model):
+    """一次上传导入的记录：按文件内容的SHA-256在解析前识别重复上传，明细行通过batch_id关联，可按批次撤销"""
+    __tablename__ = 'import_batches'
+    
+    IMPORTED = 'imported'
+    ROLLED_BACK = 'rolled_back'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    content_hash = db.Column(db.String(64), nullable=False)
+    filename = db.Column(db.String(255), nullable=True)
+    import_mode = db.Column(db.String(20), nullable=False)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default=IMPORTED)
+    created_at = db.Column(db.DateTime, default=db.func.now())
+    rolled_back_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (
+        # 上传前按内容查找已导入的相同文件；撤销后的批次不影响重新导入
+        db.Index('idx_batch_hash_status', 'content_hash', 'status'),
+    )
+    
+    def to_dict(self):
+        def fmt(value):
+            return value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+        return {
+            'id': self.id,
+            'content_hash': self.content_hash,
+            'filename': self.filename,
+            'import_mode': self.import_mode,
+            'row_count': self.row_count,
+            'status': self.status,
+            'created_at': fmt(self.created_at),
+            'rolled_back_at': fmt(self.rolled_back_at)
+        }
+
+class DataVersion(db.Model):
+    """数据版本（只有id=1一行）：导入、撤销和修改数据的脚本在写入数据的同一事务中加1，
+    各进程、各实例按它生成结果缓存的键和读接口的ETag/Last-Modified"""
+    __tablename__ = 'data_version'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    # 最后变更时间（Unix时间戳），用于Last-Modified
+    changed_at = db.Column(db.Float, nullable=False)
+
+@event.listens_for(DataVersion.__table__, 'after_create')
+def create_data_version_row(table, connection, **kw):
+    # 建表（含重建数据库）时写入版本行，变更时间使重建前后的ETag不同
+    connection.execute(insert(table).values(id=1, version=0, changed_at=time.time()))
+
+def bump_data_version(connection=None):
+    """在写入数据的事务中把数据版本加1，随数据一起提交（不提交事务）；connection默认使用当前会话的连接"""
+    table = DataVersion.__table__
+    connection = connection or db.session.connection()
+    changed_at = connection.execute(select(table.c.changed_at).where(table.c.id == 1)).scalar()
+    if changed_at is None:
+        connection.execute(insert(table).values(id=1, version=1, changed_at=time.time()))
+        return
+    # HTTP日期精确到秒，变更时间至少前进到下一秒，否则同一秒内的变更会被If-Modified-Since误判为未修改
+    connection.execute(update(table).where(table.c.id == 1).values(
+        version=table.c.version + 1, changed_at=max(time.time(), int(changed_at) + 1)))
+
+def read_data_version():
+    """从主库读取(版本号, 最后变更时间戳)：读库有延迟，可能读到旧版本。
+    升级前创建的数据库没有版本表，第一次读取时创建"""
+    table = DataVersion.__table__
+    query = select(table.c.version, table.c.changed_at).where(table.c.id == 1)
+    try:
+        with db.engine.connect() as connection:
+            row = connection.execute(query).first()
+    except (OperationalError, ProgrammingError):
+        table.create(db.engine, checkfirst=True)
+        with db.engine.connect() as connection:
+            row = connection.execute(query).first()
+    return (row.version, row.changed_at) if row is not None else (0, 0.0)
+
 class InventoryData(db.Model):
     __tablename__ = 'inventory_data'
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    date = db.Column(db.Date, nullable=False, index=True)
-    sku = db.Column(db.String(50), nullable=False, index=True)
+    date = db.Column(db.Date, nullable=False)
+    sku = db.Column(db.String(50), nullable=False)
     product_name = db.Column(db.String(200), nullable=True)
     inbound_quantity = db.Column(db.Integer, nullable=True, default=0)
     outbound_quantity = db.Column(db.Integer, nullable=True, default=0)
     inventory_balance = db.Column(db.Integer, nullable=True, default=0)
-    supplier = db.Column(db.String(100), nullable=True, index=True)
+    supplier_id = db.Column(db.Integer, db.ForeignKey('suppliers.id'), nullable=True)
     operator = db.Column(db.String(50), nullable=True)
     remarks = db.Column(db.Text, nullable=True)
+    # 写入（或覆盖模式下最后更新）该行的导入批次，早于批次记录导入的数据为空
+    batch_id = db.Column(db.Integer, db.ForeignKey('import_batches.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=db.func.now())
     updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now())
+    # 供应商名称按主键从维度表取出，只对返回的行执行
+    supplier = db.column_property(
+        select(Supplier.name).where(Supplier.id == supplier_id).correlate_except(Supplier).scalar_subquery()
+    )
     
+    # 索引按实际查询设计，已有数据库用 python ensure_indexes.py 补齐
     __table_args__ = (
+        # 相同日期和SKU的数据不能重复，也用于导入时的重复检查
         db.UniqueConstraint('date', 'sku', name='uq_date_sku'),
+        # 分页排序 ORDER BY date DESC, id DESC 与日期范围筛选
+        db.Index('idx_date_id', 'date', 'id'),
+        # 按SKU/供应商筛选的分页和图表，包含余额列使图表汇总不必回表
+        db.Index('idx_sku_date_balance', 'sku', 'date', 'inventory_balance'),
+        db.Index('idx_supplier_date_balance', 'supplier_id', 'date', 'inventory_balance'),
+        # 按批次撤销导入：查找受影响的日期并 DELETE ... WHERE batch_id = ?
+        db.Index('idx_batch_id', 'batch_id', 'date'),
     )
     
     def to_dict(self):
@@ -57,159 +237,227 @@ class InventoryData(db.Model):
             'updated_at': self.updated_at.strftime('%Y-%m-%d %H:%M:%S') if self.updated_at else None
         }
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
-
-def parse_date_flexible(date_str):
-    """灵活解析日期格式，支持多种格式"""
-    date_formats = [
-        '%Y-%m-%d',    # 2025-08-20
-        '%Y/%m/%d',    # 2025/08/20
-        '%Y.%m.%d',    # 2025.08.20
-        '%Y%m%d',      # 20250820
-        '%d-%m-%Y',    # 20-08-2025
-        '%d/%m/%Y',    # 20/08/2025
-        '%d.%m.%Y',    # 20.08.2025
-        '%m-%d-%Y',    # 08-20-2025
-        '%m/%d/%Y',    # 08/20-2025
-        '%m.%d.%Y',    # 08.20.2025
-    ]
-    
-    # 先尝试标准格式
-    for fmt in date_formats:
-        try:
-            return datetime.datetime.strptime(date_str, fmt).date()
-        except ValueError:
-            continue
+# 产品名称全文索引（SQLite FTS5 / MySQL FULLTEXT）随 inventory_data 表一起创建
+register_search_index(InventoryData.__table__)
+
+class InventoryDailySupplier(db.Model):
+    """按 日期 × 供应商 预先汇总的库存余额，由导入流程增量维护，供图表查询使用"""
+    __tablename__ = 'inventory_daily_supplier'
     
-    # 如果标准格式失败，尝试处理单数字月份和日期
-    # 处理 YYYY/M/D 格式
-    if re.match(r'^\d{4}/\d{1,2}/\d{1,2}$', date_str):
-        parts = date_str.split('/')
-        if len(parts) == 3:
-            try:
-                year = int(parts[0])
-                month = int(parts[1])
-                day = int(parts[2])
-                return datetime.date(year, month, day)
-            except ValueError:
-                pass
-    
-    # 处理 YYYY-M-D 格式
-    if re.match(r'^\d{4}-\d{1,2}-\d{1,2}$', date_str):
-        parts = date_str.split('-')
-        if len(parts) == 3:
-            try:
-                year = int(parts[0])
-                month = int(parts[1])
-                day = int(parts[2])
-                return datetime.date(year, month, day)
-            except ValueError:
-                pass
-    
-    # 处理 YYYY.M.D 格式
-    if re.match(r'^\d{4}\.\d{1,2}\.\d{1,2}$', date_str):
-        parts = date_str.split('.')
-        if len(parts) == 3:
-            try:
-                year = int(parts[0])
-                month = int(parts[1])
-                day = int(parts[2])
-                return datetime.date(year, month, day)
-            except ValueError:
-                pass
-    
-    # 处理 D-M-YYYY 格式
-    if re.match(r'^\d{1,2}-\d{1,2}-\d{4}$', date_str):
-        parts = date_str.split('-')
-        if len(parts) == 3:
-            try:
-                day = int(parts[0])
-                month = int(parts[1])
-                year = int(parts[2])
-                return datetime.date(year, month, day)
-            except ValueError:
-                pass
-    
-    # 处理 D/M/YYYY 格式
-    if re.match(r'^\d{1,2}/\d{1,2}/\d{4}$', date_str):
-        parts = date_str.split('/')
-        if len(parts) == 3:
-            try:
-                day = int(parts[0])
-                month = int(parts[1])
-                year = int(parts[2])
-                return datetime.date(year, month, day)
-            except ValueError:
-                pass
-    
-    # 处理 D.M.YYYY 格式
-    if re.match(r'^\d{1,2}\.\d{1,2}\.\d{4}$', date_str):
-        parts = date_str.split('.')
-        if len(parts) == 3:
-            try:
-                day = int(parts[0])
-                month = int(parts[1])
-                year = int(parts[2])
-                return datetime.date(year, month, day)
-            except ValueError:
-                pass
-    
-    return None
-
-def validate_excel_data(data):
-    """验证Excel数据格式"""
-    errors = []
-    
-    for row_idx, row in enumerate(data, start=2):  # 从第2行开始（第1行是标题）
-        if len(row) < 2:  # 至少需要date和sku
-            errors.append(f"第{row_idx}行：数据不完整，至少需要日期和SKU")
-            continue
-            
-        # 验证日期格式
-        date_str = str(row[0]).strip()
-        date = parse_date_flexible(date_str)
-        if not date:
-            errors.append(f"第{row_idx}行：日期格式错误，支持的格式包括：YYYY-MM-DD、YYYY/MM/DD、YYYY.MM.DD、YYYYMMDD、DD-MM-YYYY等")
-            
-        # 验证SKU
-        sku = str(row[1]).strip()
-        if not sku:
-            errors.append(f"第{row_idx}行：SKU不能为空")
-            
-        # 验证数量字段（如果存在）
-        if len(row) > 3:  # inbound_quantity
-            try:
-                if row[3]:
-                    int(row[3])
-            except (ValueError, TypeError):
-                errors.append(f"第{row_idx}行：入库数量必须为整数")
-                
-        if len(row) > 4:  # outbound_quantity
-            try:
-                if row[4]:
-                    int(row[4])
-            except (ValueError, TypeError):
-                errors.append(f"第{row_idx}行：出库数量必须为整数")
-                
-        if len(row) > 5:  # inventory_balance
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    date = db.Column(db.Date, nullable=False)
+    supplier_id = db.Column(db.Integer, nullable=True)
+    total_balance = db.Column(db.BigInteger, nullable=True)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.Index('idx_daily_supplier_date', 'date', 'supplier_id'),
+        db.Index('idx_daily_supplier_supplier_date', 'supplier_id', 'date'),
+    )
+
+# /api/data可返回的字段，顺序与to_dict一致
+DATA_FIELDS = (
+    'id', 'date', 'sku', 'product_name', 'inbound_quantity', 'outbound_quantity',
+    'inventory_balance', 'supplier', 'operator', 'remarks', 'created_at', 'updated_at'
+)
+
+def supplier_id_of(name):
+    """按供应商名称查询id的标量子查询，筛选条件 supplier_id = (子查询) 可以使用索引"""
+    return select(Supplier.id).where(Supplier.name == name).scalar_subquery()
+
+def make_dimension_writer():
+    """导入时维护供应商/产品维度表，与导入共用同一连接和事务"""
+    return DimensionWriter(db.session.connection(), Supplier.__table__, Product.__table__)
+
+def upload_folder():
+    """上传文件的保存目录，第一次上传时才创建"""
+    folder = current_app.config['UPLOAD_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+def allowed_file(filename):
+    return file_format(filename) in current_app.config['ALLOWED_EXTENSIONS']
+
+def unsupported_format_response():
+    extensions = '、'.join(f'.{ext}' for ext in sorted(current_app.config['ALLOWED_EXTENSIONS']))
+    return jsonify({'code': 400, 'message': f'文件格式不支持，只支持{extensions}格式'}), 400
+
+# SQLite同一时间只允许一个写事务，导入在解析整个文件期间都持有写事务，
+# 并发的导入等待超过SQLITE_BUSY_TIMEOUT后会报database is locked
+SQLITE_WRITE_LOCK = threading.Lock()
+
+def write_lock():
+    """使用SQLite时返回进程内的写入锁，同步请求与后台任务的导入、撤销依次执行；其他数据库不加锁。
+    多个进程共用同一个SQLite文件时仍可能等待超时，SQLite部署应只运行一个进程"""
+    if db.engine.dialect.name == 'sqlite':
+        return SQLITE_WRITE_LOCK
+    return nullcontext()
+
+def serialized_write(func):
+    """在写入锁内执行导入，出错时在释放锁之前回滚，不把未结束的写事务留给下一个导入"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with write_lock():
             try:
-                if row[5]:
-                    int(row[5])
-            except (ValueError, TypeError):
-                errors.append(f"第{row_idx}行：库存余额必须为整数")
+                return func(*args, **kwargs)
+            except Exception:
+                db.session.rollback()
+                raise
+    return wrapper
+
+def begin_import_batch(content_hash, filename, import_mode):
+    """在导入事务中创建批次记录，返回(批次, None)；相同内容的文件已导入过、且该批次的数据还在时
+    返回(None, (409响应数据, 状态码))，不解析文件。覆盖模式总是重新导入，用于按文件内容恢复此后被修改的数据"""
+    if import_mode != 'overwrite':
+        existing = ImportBatch.query.filter_by(content_hash=content_hash, status=ImportBatch.IMPORTED)\
+            .order_by(ImportBatch.id.desc()).first()
+        # 批次的数据可能已被之后的覆盖导入接管并撤销，此时按正常流程重新导入
+        if existing is not None and db.session.query(exists().where(InventoryData.batch_id == existing.id)).scalar():
+            info = existing.to_dict()
+            return None, ({
+                'code': 409,
+                'message': f'相同内容的文件已于{info["created_at"]}导入（批次{existing.id}，{existing.row_count}条数据），'
+                           f'未重复导入；如需重新导入请先撤销该批次或使用覆盖模式',
+                'data': info
+            }, 409)
+    batch = ImportBatch(content_hash=content_hash, filename=filename, import_mode=import_mode)
+    db.session.add(batch)
+    # 取得批次id，批次记录与导入的数据在同一事务中提交或回滚
+    db.session.flush()
+    return batch, None
+
+@serialized_write
+def import_file(source, import_mode, progress=None, fmt='xlsx', filename=None, content_hash=None):
+    """执行一次导入（xlsx/csv/parquet）并提交或回滚事务，返回(响应数据, 状态码)；source为文件路径或已打开的二进制文件，
+    content_hash为已校验的文件SHA-256（未提供时计算）"""
+    batch, duplicate = begin_import_batch(content_hash or file_sha256(source), filename, import_mode)
+    if duplicate:
+        db.session.rollback()
+        return duplicate
+    result = run_import(
+        iter_file_rows(source, fmt),
+        db.session,
+        InventoryData,
+        mode=import_mode,
+        chunk_size=current_app.config['UPLOAD_CHUNK_SIZE'],
+        sample_rows=current_app.config['DATE_FORMAT_SAMPLE_ROWS'],
+        progress=progress,
+        dimensions=make_dimension_writer(),
+        batch_id=batch.id
+    )
+    return build_import_response(result, import_mode, batch)
+
+@serialized_write
+def import_excel_batch(sources, import_mode, progress=None):
+    """导入多个文件的全部工作表并提交或回滚事务，返回(响应数据, 状态码)，包含每个工作表的报告；
+    一次上传的全部文件记为一个导入批次"""
+    batch, duplicate = begin_import_batch(file_sha256(*(path for _, path in sources)),
+                                          ', '.join(name for name, _ in sources)[:255], import_mode)
+    if duplicate:
+        db.session.rollback()
+        return duplicate
+    result = run_batch_import(
+        sources,
+        db.session,
+        InventoryData,
+        mode=import_mode,
+        chunk_size=current_app.config['UPLOAD_CHUNK_SIZE'],
+        sample_rows=current_app.config['DATE_FORMAT_SAMPLE_ROWS'],
+        processes=current_app.config['IMPORT_PARSE_PROCESSES'],
+        progress=progress,
+        dimensions=make_dimension_writer(),
+        batch_id=batch.id
+    )
+    payload, status = build_import_response(result, import_mode, batch)
+    payload.setdefault('data', {})['sheets'] = result.sheets
+    return payload, status
+
+def build_import_response(result, import_mode, batch):
+    """根据导入结果提交或回滚事务（导入失败时批次记录一并回滚），返回(响应数据, 状态码)"""
+    if result.validation_errors:
+        db.session.rollback()
+        return {
+            'code': 400,
+            'message': '数据格式验证失败',
+            'errors': result.validation_errors
+        }, 400
+    
+    if result.file_duplicates or result.db_duplicates:
+        db.session.rollback()
+        messages = []
+        if result.file_duplicates:
+            messages.append(f'文件内存在重复数据（{"; ".join(result.file_duplicates)}）')
+        if result.db_duplicates:
+            messages.append(f'发现重复数据（{"; ".join(result.db_duplicates)}）')
+        return {
+            'code': 400,
+            'message': f'导入失败：{"；".join(messages)}'
+        }, 400
     
-    return errors
+    # 在同一事务中刷新受影响日期的图表汇总
+    refresh_daily_rollup(db.session.connection(), InventoryData.__table__,
+                         InventoryDailySupplier.__table__, result.affected_dates)
+    batch.row_count = result.writer.written_count
+    # 数据版本与导入的数据一起提交，所有进程此前缓存的查询结果和ETag随之失效
+    bump_data_version()
+    db.session.commit()
+    result_cache.bump_version()
+    
+    writer = result.writer
+    if import_mode == 'skip':
+        message = f'导入成功，共导入{writer.written_count}条数据，跳过{writer.skipped_count}条已存在的数据。'
+    elif import_mode == 'overwrite':
+        message = f'导入成功，共导入或更新{writer.written_count}条数据。'
+    else:
+        message = f'导入成功，共导入{writer.written_count}条数据。'
+    
+    return {
+        'code': 200,
+        'message': message,
+        'data': {
+            'mode': import_mode,
+            'batch_id': batch.id,
+            'written': writer.written_count,
+            'skipped': writer.skipped_count,
+            'chunks': writer.chunk_stats
+        }
+    }, 200
 
-@app.route('/')
+def remove_upload(path):
+    """删除上传的临时文件或目录"""
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+def run_import_job(app, job, import_func, source, cleanup):
+    """在后台线程中执行导入任务（推入提交任务的应用上下文），结束后调用cleanup释放上传的文件"""
+    with app.app_context():
+        try:
+            return import_func(source, job.mode, job.progress)
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            cleanup()
+
+def get_import_options():
+    """读取导入模式与是否后台执行，导入模式不合法时返回None"""
+    import_mode = request.form.get('mode', current_app.config['UPLOAD_IMPORT_MODE'])
+    if import_mode not in IMPORT_MODES:
+        return None, False
+    run_async = request.values.get('async', str(current_app.config['UPLOAD_ASYNC'])).lower() in ('1', 'true')
+    return import_mode, run_async
+
+@bp.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/upload')
+@bp.route('/upload')
 def upload():
     return render_template('upload.html')
 
-@app.route('/api/upload', methods=['POST'])
+@bp.route('/api/upload', methods=['POST'])
 def upload_file():
     try:
         if 'file' not in request.files:
@@ -220,240 +468,646 @@ def upload_file():
             return jsonify({'code': 400, 'message': '没有选择文件'}), 400
             
         if not allowed_file(file.filename):
-            return jsonify({'code': 400, 'message': '文件格式不支持，只支持.xlsx格式'}), 400
+            return unsupported_format_response()
+        
+        import_mode, run_async = get_import_options()
+        if import_mode is None:
+            return jsonify({'code': 400, 'message': f'导入模式不支持，可选：{"、".join(IMPORT_MODES)}'}), 400
             
-        # 保存文件
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        # 上传的文件不保存到上传目录，直接从请求中的文件流解析（较大时由SpooledUploadRequest写入匿名临时文件）
+        if run_async:
+            # 后台导入：立即返回任务ID；请求结束后文件流会被关闭，复制一份交给任务，任务结束后释放
+            job = ImportJob(os.path.basename(file.filename), import_mode)
+            stream = spool_copy(file.stream, current_app.config['UPLOAD_SPOOL_MAX_MEMORY'])
+            job_manager.submit(job, run_import_job, current_app._get_current_object(), job,
+                               partial(import_file, fmt=file_format(file.filename), filename=job.filename),
+                               stream, stream.close)
+            return jsonify({
+                'code': 202,
+                'message': '文件已上传，正在后台导入',
+                'data': job.to_dict()
+            }), 202
         
-        # 读取Excel文件
+        # 流式读取文件：按批次完成 验证 → 查重 → 写入，内存占用与表格大小无关
         try:
-            workbook = openpyxl.load_workbook(filepath, data_only=True)
-            sheet = workbook.active
+            payload, status = import_file(file.stream, import_mode, fmt=file_format(file.filename),
+                                          filename=os.path.basename(file.filename))
+            return jsonify(payload), status
             
-            # 读取数据（跳过标题行）
-            data = []
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                if row[0]:  # 如果第一列（日期）有值
-                    data.append(row)
-            
-            # 验证数据格式
-            validation_errors = validate_excel_data(data)
-            if validation_errors:
-                return jsonify({
-                    'code': 400,
-                    'message': '数据格式验证失败',
-                    'errors': validation_errors
-                }), 400
-            
-            # 检查重复数据
-            duplicate_items = []
-            for row in data:
-                if len(row) >= 2:
-                    date_str = str(row[0]).strip()
-                    sku = str(row[1]).strip()
-                    
-                    date = parse_date_flexible(date_str)
-                    if date:
-                        existing = InventoryData.query.filter_by(date=date, sku=sku).first()
-                        if existing:
-                            duplicate_items.append(f"SKU: {sku}, 日期: {date_str}")
-            
-            if duplicate_items:
-                return jsonify({
-                    'code': 400,
-                    'message': f'导入失败：发现重复数据（{"; ".join(duplicate_items)}）'
-                }), 400
-            
-            # 导入数据
-            success_count = 0
-            for row in data:
-                if len(row) >= 2:
-                    try:
-                        date_str = str(row[0]).strip()
-                        sku = str(row[1]).strip()
-                        product_name = str(row[2]).strip() if len(row) > 2 and row[2] else None
-                        inbound_quantity = int(row[3]) if len(row) > 3 and row[3] is not None else 0
-                        outbound_quantity = int(row[4]) if len(row) > 4 and row[4] is not None else 0
-                        inventory_balance = int(row[5]) if len(row) > 5 and row[5] is not None else 0
-                        supplier = str(row[6]).strip() if len(row) > 6 and row[6] else None
-                        operator = str(row[7]).strip() if len(row) > 7 and row[7] else None
-                        remarks = str(row[8]).strip() if len(row) > 8 and row[8] else None
-                        
-                        date = parse_date_flexible(date_str)
-                        if not date:
-                            continue  # 跳过日期解析失败的行
-                        
-                        # 创建新记录
-                        new_record = InventoryData(
-                            date=date,
-                            sku=sku,
-                            product_name=product_name,
-                            inbound_quantity=inbound_quantity,
-                            outbound_quantity=outbound_quantity,
-                            inventory_balance=inventory_balance,
-                            supplier=supplier,
-                            operator=operator,
-                            remarks=remarks
-                        )
-                        
-                        db.session.add(new_record)
-                        success_count += 1
-                        
-                    except (ValueError, TypeError) as e:
-                        continue
-            
-            db.session.commit()
-            
-            # 删除临时文件
-            os.remove(filepath)
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'code': 500, 'message': f'文件读取失败：{str(e)}'}), 500
             
+    except Exception as e:
+        return jsonify({'code': 500, 'message': f'服务器错误：{str(e)}'}), 500
+
+@bp.route('/api/upload/sessions', methods=['POST'])
+def create_upload_session():
+    """分片续传第一步：声明文件名、大小（可选整个文件的sha256），返回会话ID与分片大小"""
+    try:
+        data = request.get_json(silent=True) or {}
+        filename = os.path.basename(str(data.get('filename') or ''))
+        if not filename:
+            return jsonify({'code': 400, 'message': '没有选择文件'}), 400
+        if not allowed_file(filename):
+            return unsupported_format_response()
+        try:
+            size = int(data.get('size'))
+        except (TypeError, ValueError):
+            return jsonify({'code': 400, 'message': '文件大小不正确'}), 400
+        
+        meta = upload_store.create(filename, size, data.get('sha256'))
+        return jsonify({
+            'code': 201,
+            'message': '上传会话已创建',
+            'data': upload_store.describe(meta)
+        }), 201
+    except ValueError as e:
+        return jsonify({'code': 400, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'code': 500, 'message': f'服务器错误：{str(e)}'}), 500
+
+def load_upload_session(upload_id):
+    """读取上传会话，不存在时返回(None, 404响应)"""
+    meta = upload_store.load(upload_id)
+    if meta is None:
+        return None, (jsonify({'code': 404, 'message': '上传会话不存在或已过期'}), 404)
+    return meta, None
+
+@bp.route('/api/upload/sessions/<upload_id>', methods=['GET'])
+def get_upload_session(upload_id):
+    """查询已接收的分片，中断后续传时只上传缺少的分片"""
+    meta, error = load_upload_session(upload_id)
+    if error:
+        return error
+    return jsonify({'code': 200, 'data': upload_store.describe(meta)})
+
+@bp.route('/api/upload/sessions/<upload_id>/chunks/<int:index>', methods=['PUT'])
+def put_upload_chunk(upload_id, index):
+    """上传一个分片：请求体为分片的原始字节，按块写入会话的数据文件；
+    X-Chunk-SHA256 请求头（可选）为分片的校验值，不一致时返回400，客户端重传该分片"""
+    meta, error = load_upload_session(upload_id)
+    if error:
+        return error
+    try:
+        checksum = upload_store.write_chunk(meta, index, request.stream, request.headers.get('X-Chunk-SHA256'))
+        return jsonify({'code': 200, 'data': {'index': index, 'sha256': checksum}})
+    except ValueError as e:
+        return jsonify({'code': 400, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'code': 500, 'message': f'分片保存失败：{str(e)}'}), 500
+
+@bp.route('/api/upload/sessions/<upload_id>/complete', methods=['POST'])
+def complete_upload_session(upload_id):
+    """分片全部上传后校验文件并导入（参数与/api/upload相同：mode、async），导入结束后删除会话"""
+    meta, error = load_upload_session(upload_id)
+    if error:
+        return error
+    try:
+        import_mode, run_async = get_import_options()
+        if import_mode is None:
+            return jsonify({'code': 400, 'message': f'导入模式不支持，可选：{"、".join(IMPORT_MODES)}'}), 400
+        try:
+            filepath = upload_store.complete(meta)
+        except ValueError as e:
+            return jsonify({'code': 400, 'message': str(e)}), 400
+        
+        cleanup = partial(upload_store.discard, upload_id)
+        if run_async:
+            job = ImportJob(meta['filename'], import_mode)
+            job_manager.submit(job, run_import_job, current_app._get_current_object(), job,
+                               partial(import_file, fmt=file_format(meta['filename']), filename=meta['filename'],
+                                       content_hash=meta['sha256']), filepath, cleanup)
             return jsonify({
-                'code': 200,
-                'message': f'导入成功，共导入{success_count}条数据。'
-            })
-            
+                'code': 202,
+                'message': '文件已上传，正在后台导入',
+                'data': job.to_dict()
+            }), 202
+        
+        try:
+            payload, status = import_file(filepath, import_mode, fmt=file_format(meta['filename']),
+                                          filename=meta['filename'], content_hash=meta['sha256'])
+            return jsonify(payload), status
         except Exception as e:
-            return jsonify({'code': 500, 'message': f'Excel文件读取失败：{str(e)}'}), 500
+            db.session.rollback()
+            return jsonify({'code': 500, 'message': f'文件读取失败：{str(e)}'}), 500
+        finally:
+            cleanup()
             
     except Exception as e:
         return jsonify({'code': 500, 'message': f'服务器错误：{str(e)}'}), 500
 
-@app.route('/api/data', methods=['GET'])
-def get_data():
+@bp.route('/api/upload/sessions/<upload_id>', methods=['DELETE'])
+def delete_upload_session(upload_id):
+    """放弃上传，删除已接收的分片"""
+    meta, error = load_upload_session(upload_id)
+    if error:
+        return error
+    upload_store.discard(upload_id)
+    return jsonify({'code': 200, 'message': '上传会话已删除'})
+
+@bp.route('/api/upload/batch', methods=['POST'])
+def upload_batch():
+    """批量导入：支持一次上传多个.xlsx文件或zip压缩包，导入每个文件的全部工作表"""
     try:
-        # 获取查询参数
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        sku = request.args.get('sku')
-        product_name_like = request.args.get('product_name_like')
-        supplier = request.args.get('supplier')
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 20))
+        # 多文件或压缩包通常超过MAX_CONTENT_LENGTH，读取请求体前放宽本请求的上限
+        request.max_content_length = current_app.config['BATCH_MAX_CONTENT_LENGTH']
+        files = [f for f in request.files.getlist('files') if f.filename]
+        if not files:
+            return jsonify({'code': 400, 'message': '没有选择文件'}), 400
         
-        # 构建查询条件
-        query = InventoryData.query
+        for file in files:
+            extension = file.filename.rsplit('.', 1)[-1].lower() if '.' in file.filename else ''
+            if extension not in current_app.config['BATCH_ALLOWED_EXTENSIONS']:
+                return jsonify({'code': 400, 'message': f'文件格式不支持：{file.filename}，只支持.xlsx和.zip格式'}), 400
         
-        if start_date:
-            try:
-                start_date_obj = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
-                query = query.filter(InventoryData.date >= start_date_obj)
-            except ValueError:
-                pass
-                
-        if end_date:
-            try:
-                end_date_obj = datetime.datetime.strptime(end_date, '%Y-%m-%d').date()
-                query = query.filter(InventoryData.date <= end_date_obj)
-            except ValueError:
-                pass
-                
-        if sku:
-            query = query.filter(InventoryData.sku == sku)
-            
-        if product_name_like:
-            query = query.filter(InventoryData.product_name.like(f'%{product_name_like}%'))
+        import_mode, run_async = get_import_options()
+        if import_mode is None:
+            return jsonify({'code': 400, 'message': f'导入模式不支持，可选：{"、".join(IMPORT_MODES)}'}), 400
+        
+        # 每批上传使用独立目录，避免与其他上传的文件重名
+        batch_dir = os.path.join(upload_folder(), uuid.uuid4().hex)
+        os.makedirs(batch_dir)
+        try:
+            sources = []
+            # 本次上传的全部压缩包共用解压大小上限
+            zip_budget = current_app.config['BATCH_ZIP_MAX_UNCOMPRESSED']
+            for index, file in enumerate(files):
+                filepath = os.path.join(batch_dir, f'{index}_{secure_filename(file.filename)}')
+                file.save(filepath)
+                if filepath.lower().endswith('.zip'):
+                    extracted = extract_zip_workbooks(filepath, batch_dir, max_size=zip_budget,
+                                                      max_entries=current_app.config['BATCH_ZIP_MAX_ENTRIES'])
+                    zip_budget -= sum(os.path.getsize(path) for _, path in extracted)
+                    sources.extend(extracted)
+                else:
+                    sources.append((os.path.basename(file.filename), filepath))
+            if not sources:
+                remove_upload(batch_dir)
+                return jsonify({'code': 400, 'message': '压缩包中没有.xlsx文件'}), 400
+        except (ValueError, zipfile.BadZipFile) as e:
+            remove_upload(batch_dir)
+            return jsonify({'code': 400, 'message': f'压缩包无法导入：{str(e)}'}), 400
+        except Exception:
+            remove_upload(batch_dir)
+            raise
+        
+        if run_async:
+            job = ImportJob(', '.join(name for name, _ in sources), import_mode)
+            job_manager.submit(job, run_import_job, current_app._get_current_object(), job, import_excel_batch,
+                               sources, partial(remove_upload, batch_dir))
+            return jsonify({
+                'code': 202,
+                'message': '文件已上传，正在后台导入',
+                'data': job.to_dict()
+            }), 202
+        
+        try:
+            payload, status = import_excel_batch(sources, import_mode)
+            return jsonify(payload), status
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'code': 500, 'message': f'Excel文件读取失败：{str(e)}'}), 500
+        finally:
+            remove_upload(batch_dir)
             
-        if supplier:
-            query = query.filter(InventoryData.supplier == supplier)
+    except Exception as e:
+        return jsonify({'code': 500, 'message': f'服务器错误：{str(e)}'}), 500
+
+@bp.route('/api/upload/jobs', methods=['GET'])
+def list_upload_jobs():
+    return jsonify({
+        'code': 200,
+        'data': [job.to_dict() for job in job_manager.list()]
+    })
+
+@bp.route('/api/upload/jobs/<job_id>', methods=['GET'])
+def get_upload_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'code': 404, 'message': '导入任务不存在'}), 404
+    return jsonify({
+        'code': 200,
+        'data': job.to_dict()
+    })
+
+@bp.route('/api/imports', methods=['GET'])
+def list_import_batches():
+    """最近的导入批次（新的在前）"""
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+    except ValueError:
+        return jsonify({'code': 400, 'message': 'limit必须为整数'}), 400
+    batches = ImportBatch.query.order_by(ImportBatch.id.desc()).limit(limit).all()
+    return jsonify({
+        'code': 200,
+        'data': [batch.to_dict() for batch in batches]
+    })
+
+@bp.route('/api/imports/<int:batch_id>', methods=['GET'])
+def get_import_batch(batch_id):
+    batch = db.session.get(ImportBatch, batch_id)
+    if batch is None:
+        return jsonify({'code': 404, 'message': '导入批次不存在'}), 404
+    return jsonify({
+        'code': 200,
+        'data': batch.to_dict()
+    })
+
+@bp.route('/api/imports/<int:batch_id>/rollback', methods=['POST'])
+@serialized_write
+def rollback_import_batch(batch_id):
+    """撤销一个导入批次：按batch_id删除该批次写入的明细行并刷新受影响日期的图表汇总，批次记录保留并标记为已撤销；
+    覆盖模式导入的批次不能撤销（返回409）"""
+    try:
+        batch = db.session.get(ImportBatch, batch_id)
+        if batch is None:
+            return jsonify({'code': 404, 'message': '导入批次不存在'}), 404
+        if batch.status != ImportBatch.IMPORTED:
+            return jsonify({'code': 400, 'message': f'批次{batch_id}已撤销'}), 400
+        # 覆盖模式更新的行归属于该批次，但没有保留更新前的值，按batch_id删除会连同导入前已有的数据一起删除
+        if batch.import_mode == 'overwrite':
+            return jsonify({
+                'code': 409,
+                'message': f'批次{batch_id}为覆盖模式导入，被覆盖的数据无法恢复，不能撤销',
+                'data': batch.to_dict()
+            }), 409
+        
+        connection = db.session.connection()
+        deleted, dates = rollback_batch(connection, InventoryData.__table__, batch_id)
+        refresh_daily_rollup(connection, InventoryData.__table__, InventoryDailySupplier.__table__, dates)
+        batch.status = ImportBatch.ROLLED_BACK
+        batch.rolled_back_at = db.func.now()
+        bump_data_version(connection)
+        db.session.commit()
+        result_cache.bump_version()
         
-        # 按日期降序排序
-        query = query.order_by(InventoryData.date.desc())
+        return jsonify({
+            'code': 200,
+            'message': f'已撤销批次{batch_id}，删除{deleted}条数据',
+            'data': dict(batch.to_dict(), deleted=deleted)
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'code': 500, 'message': f'撤销失败：{str(e)}'}), 500
+
+@bp.route('/api/data', methods=['GET'])
+@conditional_get
+@use_read_engine
+def get_data():
+    return read_response(prepare_data_request, '查询失败')
+
+def prepare_data_request(args):
+    """解析/api/data的参数，返回(缓存端点, 是否缓存, 查询函数)，查询函数接收会话并返回响应数据；参数错误时抛出ValueError"""
+    page = int(args.get('page', 1))
+    per_page = int(args.get('per_page', 20))
+    if per_page < 1:
+        raise ValueError('per_page必须为正整数')
+    # pagination=cursor 时使用基于 (date DESC, id DESC) 的游标分页
+    use_cursor = args.get('pagination') == 'cursor' or 'cursor' in args
+    cursor = args.get('cursor')
+    with_total = args.get('with_total', 'true').lower() != 'false'
+    fields = parse_data_fields(args.get('fields'))
+    if fields is None:
+        raise ValueError(f'字段不支持，可选：{",".join(DATA_FIELDS)}')
+    
+    # 列投影：只查询需要的列（分页排序还需要date和id），从元组直接序列化，不构造ORM对象
+    columns = [getattr(InventoryData, name) for name in fields]
+    columns += [getattr(InventoryData, name) for name in ('date', 'id') if name not in fields]
+    serialize = make_row_serializer(fields, columns)
+    
+    def build_query(session):
+        # 构建查询条件
+        return apply_inventory_filters(session.query(*columns), args)
+    
+    if use_cursor:
+        count_params = [(name, args.get(name)) for name in
+                        ('start_date', 'end_date', 'sku', 'product_name_like', 'supplier')]
+        # 只缓存第一页（不带游标），后续页依赖游标位置，命中率低
+        return 'data', not cursor, lambda session: get_data_page_by_cursor(
+            build_query(session), cursor, per_page, with_total, count_params, serialize
+        )
+    
+    def get_page(session):
+        # 按日期降序排序，id作为次序键保证分页稳定
+        ordered = build_query(session).order_by(InventoryData.date.desc(), InventoryData.id.desc())
         
-        # 分页查询
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        # 分页查询（with_total=false时不执行COUNT查询）
+        pagination = ordered.paginate(page=page, per_page=per_page, error_out=False, count=with_total)
         
         # 构建响应数据
-        result = {
+        return {
             'code': 200,
             'data': {
-                'items': [item.to_dict() for item in pagination.items],
+                'items': [serialize(item) for item in pagination.items],
                 'total': pagination.total,
                 'page': page,
                 'per_page': per_page,
-                'pages': pagination.pages
+                'pages': pagination.pages if with_total else None
             }
         }
+    
+    # 只缓存前几页，用户通常只浏览开头的数据
+    return 'data', page <= current_app.config['RESULT_CACHE_DATA_PAGES'], get_page
+
+def apply_date_range(query, column, args):
+    """按start_date/end_date参数添加日期范围条件，格式错误的日期忽略"""
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    
+    if start_date:
+        try:
+            start_date_obj = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
+            query = query.filter(column >= start_date_obj)
+        except ValueError:
+            pass
+            
+    if end_date:
+        try:
+            end_date_obj = datetime.datetime.strptime(end_date, '%Y-%m-%d').date()
+            query = query.filter(column <= end_date_obj)
+        except ValueError:
+            pass
+    
+    return query
+
+def apply_inventory_filters(query, args, name_filter=True):
+    """按请求参数（日期范围、SKU、产品名称、供应商）添加查询条件，/api/data、/api/export与图表共用"""
+    sku = args.get('sku')
+    product_name_like = args.get('product_name_like')
+    supplier = args.get('supplier')
+    
+    query = apply_date_range(query, InventoryData.date, args)
+            
+    if sku:
+        query = query.filter(InventoryData.sku == sku)
         
-        return jsonify(result)
+    if name_filter and product_name_like:
+        # 有全文索引时先按索引筛选，结果与LIKE一致
+        query = query.filter(product_search.condition(
+            InventoryData.id, InventoryData.product_name, product_name_like, query.session.get_bind()
+        ))
         
+    if supplier:
+        query = query.filter(InventoryData.supplier_id == supplier_id_of(supplier))
+    
+    return query
+
+def parse_data_fields(fields_param):
+    """解析fields参数（逗号分隔），未指定时返回全部字段，包含未知字段时返回None"""
+    if not fields_param:
+        return list(DATA_FIELDS)
+    fields = [name.strip() for name in fields_param.split(',') if name.strip()]
+    if not fields or any(name not in DATA_FIELDS for name in fields):
+        return None
+    return list(dict.fromkeys(fields))
+
+def cached_response(endpoint, compute, enabled=True):
+    """按端点和请求参数缓存响应数据，导入提交后数据版本变化即失效"""
+    if not enabled:
+        return compute()
+    return result_cache.get_or_compute(endpoint, list(request.args.items(multi=True)), compute)
+
+def read_response(prepare, error_message):
+    """执行只读接口：prepare解析参数（见READ_ENDPOINTS），查询在db.session上执行，结果按端点和参数缓存"""
+    try:
+        endpoint, cacheable, compute = prepare(request.args)
+        return jsonify(cached_response(endpoint, lambda: compute(db.session), enabled=cacheable))
+    except ValueError as e:
+        return jsonify({'code': 400, 'message': str(e)}), 400
     except Exception as e:
-        return jsonify({'code': 500, 'message': f'查询失败：{str(e)}'}), 500
+        return jsonify({'code': 500, 'message': f'{error_message}：{str(e)}'}), 500
 
-@app.route('/api/suppliers', methods=['GET'])
-def get_suppliers():
+def get_data_page_by_cursor(query, cursor, per_page, with_total, count_params, serialize):
+    """游标分页：按 (date DESC, id DESC) 定位到上一页最后一行之后，不使用OFFSET"""
+    last_date, last_id = decode_cursor(cursor) if cursor else (None, None)
+    
+    if with_total:
+        # 总数按查询条件缓存，翻页时不必每次COUNT(*)
+        total = result_cache.get_or_compute('data_count', count_params, query.count,
+                                            ttl=current_app.config['DATA_COUNT_CACHE_SECONDS'])
+    else:
+        total = None
+    
+    if cursor:
+        query = query.filter(or_(
+            InventoryData.date < last_date,
+            and_(InventoryData.date == last_date, InventoryData.id < last_id)
+        ))
+    
+    # 多取一行判断是否还有下一页
+    items = query.order_by(InventoryData.date.desc(), InventoryData.id.desc())\
+        .limit(per_page + 1)\
+        .all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    next_cursor = encode_cursor(items[-1].date, items[-1].id) if has_more else None
+    
+    return {
+        'code': 200,
+        'data': {
+            'items': [serialize(item) for item in items],
+            'total': total,
+            'per_page': per_page,
+            'pages': -(-total // per_page) if total is not None else None,
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        }
+    }
+
+@bp.route('/api/export', methods=['GET'])
+@use_read_engine
+def export_data():
+    """按/api/data的筛选条件流式导出全部结果（csv、ndjson、xlsx），使用服务端游标分批读取"""
     try:
-        # 获取所有不重复的供应商列表
-        suppliers = db.session.query(InventoryData.supplier)\
-            .filter(InventoryData.supplier.isnot(None))\
-            .filter(InventoryData.supplier != '')\
-            .distinct()\
-            .order_by(InventoryData.supplier)\
-            .all()
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'code': 400, 'message': f'导出格式不支持，可选：{"、".join(EXPORT_FORMATS)}'}), 400
+        fields = parse_data_fields(request.args.get('fields'))
+        if fields is None:
+            return jsonify({'code': 400, 'message': f'字段不支持，可选：{",".join(DATA_FIELDS)}'}), 400
         
-        supplier_list = [supplier[0] for supplier in suppliers]
+        columns = [getattr(InventoryData, name) for name in fields]
+        serialize = make_row_serializer(fields, columns)
+        query = apply_inventory_filters(InventoryData.query.with_entities(*columns), request.args)\
+            .order_by(InventoryData.date.desc(), InventoryData.id.desc())
         
-        return jsonify({
-            'code': 200,
-            'data': supplier_list
-        })
+        batch_size = current_app.config['EXPORT_BATCH_SIZE']
+        # yield_per使用服务端游标分批取数，内存占用与结果行数无关
+        items = (serialize(row) for row in query.yield_per(batch_size))
+        if export_format == 'csv':
+            body = iter_csv(items, fields, batch_size)
+        elif export_format == 'ndjson':
+            body = iter_ndjson(items, current_app.json.dumps, batch_size)
+        else:
+            body = iter_xlsx(items, fields)
+        
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        filename = f"inventory_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+        # 不设置Content-Length，以分块传输编码边生成边发送
+        return Response(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
         
     except Exception as e:
-        return jsonify({'code': 500, 'message': f'获取供应商列表失败：{str(e)}'}), 500
+        return jsonify({'code': 500, 'message': f'导出失败：{str(e)}'}), 500
 
-@app.route('/api/chart-data', methods=['GET'])
-def get_chart_data():
-    try:
-        # 获取查询参数
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        sku = request.args.get('sku')
-        supplier = request.args.get('supplier')
+@bp.route('/api/suppliers', methods=['GET'])
+@conditional_get
+@use_read_engine
+def get_suppliers():
+    return read_response(prepare_suppliers_request, '获取供应商列表失败')
+
+def prepare_suppliers_request(args):
+    def list_suppliers(session):
+        # 从供应商维度表读取，只列出明细表中仍有数据的供应商（按索引逐个探测，不扫描明细表）
+        suppliers = session.query(Supplier.name)\
+            .filter(exists().where(InventoryData.supplier_id == Supplier.id))\
+            .order_by(Supplier.name)\
+            .all()
         
-        # 构建查询条件
-        query = InventoryData.query
+        return {
+            'code': 200,
+            'data': [supplier[0] for supplier in suppliers]
+        }
+    
+    return 'suppliers', True, list_suppliers
+
+@bp.route('/api/chart-data', methods=['GET'])
+@conditional_get
+@use_read_engine
+def get_chart_data():
+    return read_response(prepare_chart_request, '获取图表数据失败')
+
+def prepare_chart_request(args):
+    # 获取查询参数（日期范围由apply_date_range读取）
+    sku = args.get('sku')
+    supplier = args.get('supplier')
+    granularity = args.get('granularity', current_app.config['CHART_DEFAULT_GRANULARITY'])
+    if granularity not in CHART_GRANULARITIES:
+        raise ValueError(f'时间粒度不支持，可选：{",".join(CHART_GRANULARITIES)}')
+    max_points = args.get('max_points', 0, type=int)
+    if max_points and max_points < 3:
+        raise ValueError('max_points至少为3')
+    
+    def query_chart_data(session):
+        if current_app.config['CHART_USE_ROLLUP'] and not sku and rollup_available(
+                session.connection(), InventoryData.__table__, InventoryDailySupplier.__table__):
+            # 没有SKU条件时从 日期 × 供应商 汇总表读取，不扫描明细表；汇总表不存在或未回填时使用明细表
+            source = 'rollup'
+            query = apply_date_range(session.query(InventoryDailySupplier), InventoryDailySupplier.date, args)
+            if supplier:
+                query = query.filter(InventoryDailySupplier.supplier_id == supplier_id_of(supplier))
+            date_column = InventoryDailySupplier.date
+            balance_column = InventoryDailySupplier.total_balance
+        else:
+            # 按SKU筛选时使用明细表（(date, sku)唯一，按SKU汇总与明细行一一对应）
+            source = 'raw'
+            query = apply_inventory_filters(session.query(InventoryData), args, name_filter=False)
+            date_column = InventoryData.date
+            balance_column = InventoryData.inventory_balance
         
-        if start_date:
-            try:
-                start_date_obj = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
-                query = query.filter(InventoryData.date >= start_date_obj)
-            except ValueError:
-                pass
-                
-        if end_date:
-            try:
-                end_date_obj = datetime.datetime.strptime(end_date, '%Y-%m-%d').date()
-                query = query.filter(InventoryData.date <= end_date_obj)
-            except ValueError:
-                pass
-                
-        if sku:
-            query = query.filter(InventoryData.sku == sku)
-            
-        if supplier:
-            query = query.filter(InventoryData.supplier == supplier)
+        resolved = granularity
+        if granularity == 'auto':
+            first_date, last_date = query.with_entities(func.min(date_column), func.max(date_column)).one()
+            resolved = resolve_granularity(
+                granularity, to_date(first_date), to_date(last_date),
+                max_points or current_app.config['CHART_AUTO_MAX_POINTS']
+            )
         
-        # 按日期分组，计算每日库存余额总和
+        # 在SQL中按时间桶分组；余额是时点值，每个桶取桶内每日总余额的平均值（按天时即当日总余额）
+        bucket = bucket_expression(date_column, resolved, session.get_bind().dialect.name).label('bucket')
         chart_data = query.with_entities(
-            InventoryData.date,
-            func.sum(InventoryData.inventory_balance).label('total_balance')
-        ).group_by(InventoryData.date).order_by(InventoryData.date).all()
+            bucket,
+            func.sum(balance_column).label('total_balance'),
+            func.count(func.distinct(date_column)).label('days')
+        ).group_by(bucket).order_by(bucket).all()
         
         # 格式化数据
-        dates = [item.date.strftime('%Y-%m-%d') for item in chart_data]
-        balances = [float(item.total_balance) if item.total_balance else 0 for item in chart_data]
+        bucket_dates = [to_date(item.bucket) for item in chart_data]
+        balances = [round(float(item.total_balance) / item.days, 2) if item.total_balance else 0 for item in chart_data]
         
-        return jsonify({
+        # 点数超过max_points时用LTTB降采样，保留趋势形状
+        total_points = len(bucket_dates)
+        if max_points and total_points > max_points:
+            keep = lttb([d.toordinal() for d in bucket_dates], balances, max_points)
+            bucket_dates = [bucket_dates[i] for i in keep]
+            balances = [balances[i] for i in keep]
+        
+        return {
             'code': 200,
             'data': {
-                'dates': dates,
-                'balances': balances
+                'dates': [d.strftime('%Y-%m-%d') for d in bucket_dates],
+                'balances': balances,
+                'source': source,
+                'granularity': resolved,
+                'total_points': total_points
             }
-        })
-        
-    except Exception as e:
-        return jsonify({'code': 500, 'message': f'获取图表数据失败：{str(e)}'}), 500
+        }
+    
+    return 'chart-data', True, query_chart_data
+
+# 只读接口：路径 -> (参数解析函数, 查询失败时的提示)，WSGI视图与ASGI服务（asgi.py）共用
+READ_ENDPOINTS = {
+    '/api/data': (prepare_data_request, '查询失败'),
+    '/api/suppliers': (prepare_suppliers_request, '获取供应商列表失败'),
+    '/api/chart-data': (prepare_chart_request, '获取图表数据失败'),
+}
+
+@bp.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """查询结果缓存的命中统计与当前数据版本"""
+    return jsonify({'code': 200, 'data': result_cache.stats()})
+
+def create_app(config_object=Config):
+    """创建应用实例：加载配置，初始化数据库、任务队列与缓存，注册路由"""
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    init_json_provider(app)
+    
+    # 初始化数据库（引擎参数按数据库类型与DB_POOL_MODE生成，SQLite连接设置WAL等PRAGMA）；
+    # 创建引擎不建立连接，第一次查询时才连接数据库
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', build_engine_options(app.config))
+    # 配置了读库时，只读接口的查询使用读库
+    app.config.setdefault('SQLALCHEMY_BINDS', build_binds(app.config))
+    db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_engine(engine, app.config)
+    CORS(app)
+    # 上传的文件在内存中解析，超过UPLOAD_SPOOL_MAX_MEMORY时才写入匿名临时文件
+    app.request_class = SpooledUploadRequest
+    
+    # 后台导入任务队列（线程在提交第一个任务时才启动）
+    app.extensions['job_manager'] = JobManager(app.config['IMPORT_WORKERS'], app.config['IMPORT_JOB_HISTORY'])
+    
+    # 查询结果缓存（供应商列表、图表、数据首页与总数），导入提交后按数据版本失效
+    app.extensions['result_cache'] = ResultCache(
+        create_cache_backend(app.config['RESULT_CACHE_BACKEND'], app.config['RESULT_CACHE_URL'],
+                             app.config['RESULT_CACHE_MAX_SIZE']),
+        ttl=app.config['RESULT_CACHE_TTL'],
+        enabled=app.config['RESULT_CACHE_ENABLED'],
+        version_source=DatabaseVersion(read_data_version, app.config['DATA_VERSION_TTL'])
+    )
+    
+    # product_name_like 搜索（全文索引可用时使用索引）
+    app.extensions['product_search'] = ProductNameSearch(app.config['PRODUCT_SEARCH_FULLTEXT'])
+    
+    # 分片续传的会话保存在上传目录的sessions子目录中（第一次创建会话时才创建目录）
+    app.extensions['upload_store'] = ResumableUploadStore(
+        os.path.join(app.config['UPLOAD_FOLDER'], 'sessions'),
+        chunk_size=app.config['RESUMABLE_CHUNK_SIZE'],
+        max_size=app.config['RESUMABLE_MAX_FILE_SIZE'],
+        ttl=app.config['RESUMABLE_SESSION_TTL']
+    )
+    
+    app.before_request(reset_session_routing)
+    app.after_request(compress_json_response)
+    app.register_blueprint(bp)
+    return app
 
 if __name__ == '__main__':
+    app = create_app()
     app.run(debug=app.config['DEBUG'], host='0.0.0.0', port=5000)
\ No newline at end of file
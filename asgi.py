@@ -0,0 +1,142 @@
+import io
+import sys
+from a2wsgi import WSGIMiddleware
+from flask import jsonify, request, Response
+from flask_sqlalchemy.query import Query
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from app import create_app, result_cache, request_validators, read_after_write, READ_ENDPOINTS
+from db_config import build_async_url, build_engine_options, configure_engine
+from http_cache import is_not_modified, set_validators
+
+# ASGI服务模式：只读接口（READ_ENDPOINTS）在事件循环中通过异步引擎查询，等待数据库时不占用线程，
+# 单个进程即可同时服务大量看板请求；上传、导出、页面等其余请求交给Flask在线程池中处理。
+# 启动：uvicorn asgi:asgi_app --host 0.0.0.0 --port 5000
+# 需要安装 uvicorn、a2wsgi 以及异步驱动（SQLite为aiosqlite，MySQL为aiomysql）
+
+
+def create_read_engine(config):
+    """只读接口使用的异步引擎，连接池参数与SQLite PRAGMA与同步引擎相同"""
+    url = build_async_url(config)
+    engine = create_async_engine(url, **build_engine_options(config, url))
+    configure_engine(engine.sync_engine, config)
+    return engine
+
+
+def build_environ(scope):
+    """由ASGI请求构造WSGI environ（只读接口都是GET请求，没有请求体），用于创建Flask请求上下文"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': '',
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope['headers']:
+        key = name.decode('latin-1').upper().replace('-', '_')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = 'HTTP_' + key
+        value = value.decode('latin-1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+async def send_response(response, send):
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                    for name, value in response.headers.items()]
+    })
+    await send({'type': 'http.response.body', 'body': response.get_data()})
+
+
+class AsyncReadApp:
+    """ASGI应用：GET只读接口使用异步引擎，其余请求转发给WSGI应用"""
+
+    def __init__(self, flask_app, engine, wsgi_workers=10):
+        self.flask_app = flask_app
+        self.engine = engine
+        self.wsgi_app = WSGIMiddleware(flask_app, workers=wsgi_workers)
+        # 异步引擎连接的是读库（地址与主库不同）时，数据刚变更后的请求交给Flask视图查询主库
+        primary = make_url(flask_app.config['SQLALCHEMY_DATABASE_URI']).set(drivername=engine.url.drivername)
+        self.reads_replica = engine.url != primary
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif (scope['type'] == 'http' and scope['method'] == 'GET' and scope['path'] in READ_ENDPOINTS
+              and not (self.reads_replica and self.read_after_write())):
+            response = await self.handle_read(scope, *READ_ENDPOINTS[scope['path']])
+            await send_response(response, send)
+        else:
+            await self.wsgi_app(scope, receive, send)
+
+    def read_after_write(self):
+        with self.flask_app.app_context():
+            return read_after_write()
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def handle_read(self, scope, prepare, error_message):
+        """与WSGI视图相同的处理流程：条件请求（304）、结果缓存、错误响应，
+        before_request/after_request钩子（CORS、压缩）同样生效"""
+        with self.flask_app.request_context(build_environ(scope)):
+            response = self.flask_app.preprocess_request()
+            if response is None:
+                validators = request_validators()
+                if validators is not None and is_not_modified(request, *validators):
+                    response = set_validators(Response(status=304), *validators)
+                else:
+                    response = self.flask_app.make_response(await self.read_response(prepare, error_message))
+                    if validators is not None and response.status_code == 200:
+                        set_validators(response, *validators)
+            return self.flask_app.process_response(self.flask_app.make_response(response))
+
+    async def read_response(self, prepare, error_message):
+        try:
+            endpoint, cacheable, compute = prepare(request.args)
+            if cacheable:
+                payload = await result_cache.get_or_compute_async(
+                    endpoint, list(request.args.items(multi=True)), lambda: self.run_query(compute))
+            else:
+                payload = await self.run_query(compute)
+            return jsonify(payload)
+        except ValueError as e:
+            return jsonify({'code': 400, 'message': str(e)}), 400
+        except Exception as e:
+            return jsonify({'code': 500, 'message': f'{error_message}：{str(e)}'}), 500
+
+    async def run_query(self, compute):
+        # 在异步会话中执行与WSGI视图相同的ORM查询，数据库IO期间切回事件循环处理其他请求；
+        # 使用Flask-SQLAlchemy的Query类以支持paginate
+        async with AsyncSession(self.engine, query_cls=Query) as session:
+            return await session.run_sync(compute)
+
+
+app = create_app()
+asgi_app = AsyncReadApp(app, create_read_engine(app.config), app.config['ASGI_WSGI_WORKERS'])
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(asgi_app, host='0.0.0.0', port=5000)
@@ -0,0 +1,196 @@
+import argparse
+import datetime
+import http.client
+import io
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import openpyxl
+from sqlalchemy import create_engine, insert
+from app import db, InventoryData, InventoryDailySupplier, Supplier
+from rollup import rebuild_daily_rollup
+
+# 看板并发负载测试：WSGI（Flask开发服务器，多线程）vs ASGI（uvicorn asgi:asgi_app，只读接口使用异步引擎）
+# 每种模式启动独立的服务进程，多个模拟用户不间断地请求 供应商列表 / 数据分页 / 图表，期间上传一次Excel导入
+
+SUPPLIER_COUNT = 20
+
+SERVERS = {
+    'WSGI（Flask开发服务器）': "from app import create_app; create_app().run(host='127.0.0.1', port={port}, threaded=True)",
+    'ASGI（uvicorn）': None,
+}
+
+
+def prepare_database(path, row_count, batch_size=50000):
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine)
+    start = datetime.date(2020, 1, 1)
+    now = datetime.datetime.now().replace(microsecond=0)
+    with engine.begin() as conn:
+        conn.execute(insert(Supplier.__table__),
+                     [{'id': i + 1, 'name': f'供应商{i}'} for i in range(SUPPLIER_COUNT)])
+        for offset in range(0, row_count, batch_size):
+            conn.execute(insert(InventoryData.__table__), [{
+                'date': start + datetime.timedelta(days=i % 1500),
+                'sku': f'SKU{i:07d}',
+                'product_name': f'产品{i % 500}',
+                'inventory_balance': i % 230,
+                'supplier_id': i % SUPPLIER_COUNT + 1,
+                'created_at': now,
+                'updated_at': now
+            } for i in range(offset, min(offset + batch_size, row_count))])
+        rebuild_daily_rollup(conn, InventoryData.__table__, InventoryDailySupplier.__table__)
+    engine.dispose()
+
+
+def make_workbook(row_count):
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('库存数据')
+    sheet.append(['日期', 'SKU', '产品名称', '入库数量', '出库数量', '库存余额', '供应商'])
+    for i in range(row_count):
+        sheet.append([f'2025-01-{i % 28 + 1:02d}', f'IMPORT{i:07d}', f'导入产品{i % 100}', 10, 5, 5,
+                      f'供应商{i % SUPPLIER_COUNT}'])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def start_server(name, port, env):
+    if SERVERS[name] is None:
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:asgi_app', '--host', '127.0.0.1', '--port', str(port),
+                   '--log-level', 'warning', '--no-access-log']
+    else:
+        command = [sys.executable, '-c', SERVERS[name].format(port=port)]
+    process = subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/api/suppliers')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'{name} 服务启动失败')
+
+
+def dashboard_request():
+    """模拟看板页面的请求：供应商下拉列表、按供应商筛选的数据分页、图表"""
+    supplier = f'供应商{random.randrange(SUPPLIER_COUNT)}'
+    kind = random.random()
+    if kind < 0.2:
+        return '/api/suppliers'
+    if kind < 0.6:
+        return f'/api/data?supplier={supplier}&page={random.randint(1, 5)}&per_page=20'
+    return f'/api/chart-data?supplier={supplier}&granularity=auto&max_points=300'
+
+
+def run_user(port, stop, samples, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    while not stop.is_set():
+        path = dashboard_request()
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path.replace('供应商', '%E4%BE%9B%E5%BA%94%E5%95%86'))
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+            else:
+                samples.append((started, time.perf_counter() - started))
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            connection.close()
+
+
+def upload(port, workbook):
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="mode"\r\n\r\nskip\r\n'
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="load.xlsx"\r\n'
+        f'Content-Type: application/vnd.openxmlformats-officedocument.spreadsheetml.sheet\r\n\r\n'
+    ).encode() + workbook + f'\r\n--{boundary}--\r\n'.encode()
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+    started = time.perf_counter()
+    connection.request('POST', '/api/upload', body, {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+    response = connection.getresponse()
+    response.read()
+    return response.status, started, time.perf_counter()
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples):
+    if not samples:
+        return '没有完成的请求'
+    ordered = sorted(latency for _, latency in samples)
+    return (f"{len(ordered)} 次，中位数 {statistics.median(ordered) * 1000:.1f}ms，"
+            f"P95 {percentile(ordered, 0.95) * 1000:.1f}ms，P99 {percentile(ordered, 0.99) * 1000:.1f}ms")
+
+
+def run_mode(name, port, database, workbook, args):
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{database}', DEBUG='False',
+               RESULT_CACHE_ENABLED=str(args.cache), HTTP_CACHE_ENABLED='False')
+    process = start_server(name, port, env)
+    try:
+        stop = threading.Event()
+        samples, errors = [], []
+        users = [threading.Thread(target=run_user, args=(port, stop, samples, errors)) for _ in range(args.users)]
+        started = time.perf_counter()
+        for user in users:
+            user.start()
+        import_result = None
+        if workbook:
+            time.sleep(args.duration / 3)
+            import_result = upload(port, workbook)
+        time.sleep(max(0, args.duration - (time.perf_counter() - started)))
+        stop.set()
+        for user in users:
+            user.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait()
+
+    print(f"{name}：{len(samples) / elapsed:.0f} 请求/秒，全部请求 {summarize(samples)}，失败 {len(errors)} 次")
+    if import_result:
+        status, import_start, import_end = import_result
+        during = [sample for sample in samples if import_start <= sample[0] <= import_end]
+        print(f"    导入 {args.import_rows} 行：状态 {status}，用时 {import_end - import_start:.2f}s；"
+              f"导入期间的请求 {summarize(during)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='看板并发负载测试：WSGI vs ASGI')
+    parser.add_argument('--rows', type=int, default=200000, help='数据库中已有的数据行数')
+    parser.add_argument('--users', type=int, default=50, help='并发用户数')
+    parser.add_argument('--duration', type=float, default=15, help='每种模式的测试时长（秒）')
+    parser.add_argument('--import-rows', type=int, default=20000, help='测试期间导入的行数，0表示不导入')
+    parser.add_argument('--cache', action='store_true', help='开启查询结果缓存（默认关闭，测量数据库查询）')
+    parser.add_argument('--port', type=int, default=5100, help='服务端口（两种模式依次使用port和port+1）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        template = os.path.join(tmpdir, 'template.db')
+        prepare_database(template, args.rows)
+        workbook = make_workbook(args.import_rows) if args.import_rows else None
+        for index, name in enumerate(SERVERS):
+            # 每种模式使用相同的初始数据
+            database = os.path.join(tmpdir, f'load_{index}.db')
+            shutil.copy(template, database)
+            run_mode(name, args.port + index, database, workbook, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# 冷启动耗时（无服务器函数每个新实例都要经历）：在新的Python进程中 导入app → create_app() → 第一个请求，
+# 同时用 python -X importtime 统计各模块的导入耗时。test_startup_time.py 使用本脚本检查启动开销
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 启动时不应加载的模块：只在上传/导出xlsx、导入Parquet、MySQL、ASGI模式或Redis缓存时使用
+LAZY_MODULES = ('openpyxl', 'pyarrow', 'sqlalchemy.dialects.mysql', 'sqlalchemy.ext.asyncio', 'redis', 'a2wsgi', 'uvicorn')
+
+# 在新进程中执行，输出各阶段耗时与create_app()之后已加载的模块
+STARTUP_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+loaded = sorted(sys.modules)
+status = app.test_client().get(sys.argv[1]).status_code if len(sys.argv) > 1 else None
+finished = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_ms': (created - imported) * 1000,
+    'request_ms': (finished - created) * 1000 if status else None,
+    'status': status,
+    'loaded': loaded,
+}))
+'''
+
+
+def project_modules():
+    """项目自身的模块名（仓库根目录下的.py文件）"""
+    return {name[:-3] for name in os.listdir(PROJECT_DIR) if name.endswith('.py')}
+
+
+def parse_importtime(output):
+    """解析 -X importtime 的输出，返回{模块名: (自身耗时ms, 累计耗时ms, 嵌套层级)}"""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        modules[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000, depth)
+    return modules
+
+
+def measure_startup(env=None, path=None):
+    """在新进程中启动一次应用，path为第一个请求的路径（None表示不发请求）"""
+    command = [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT] + ([path] if path else [])
+    completed = subprocess.run(command, env=dict(os.environ, **(env or {})), cwd=PROJECT_DIR,
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f'应用启动失败：\n{completed.stderr[-2000:]}')
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['modules'] = parse_importtime(completed.stderr)
+    ours = project_modules()
+    result['project_ms'] = sum(self_ms for name, (self_ms, _, _) in result['modules'].items() if name in ours)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='应用冷启动耗时（导入、create_app、第一个请求）')
+    parser.add_argument('--repeat', type=int, default=5, help='启动次数，结果取中位数')
+    parser.add_argument('--pool-mode', default='null', help='DB_POOL_MODE（无服务器函数使用null）')
+    parser.add_argument('--path', default='/api/suppliers', help='第一个请求的路径')
+    parser.add_argument('--top', type=int, default=10, help='列出导入最慢的依赖数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        upload_dir = os.path.join(tmpdir, 'uploads')
+        env = {
+            'DATABASE_URL': f"sqlite:///{os.path.join(tmpdir, 'cold_start.db')}",
+            'DB_POOL_MODE': args.pool_mode,
+            'UPLOAD_FOLDER': upload_dir,
+            'DEBUG': 'False',
+        }
+        subprocess.run([sys.executable, 'init_db.py'], env=dict(os.environ, **env), cwd=PROJECT_DIR,
+                       check=True, stdout=subprocess.DEVNULL)
+        runs = [measure_startup(env, args.path) for _ in range(args.repeat)]
+        created_upload_dir = os.path.exists(upload_dir)
+
+    def median(key):
+        return statistics.median(run[key] for run in runs)
+
+    print(f"冷启动（{args.repeat} 次中位数）：导入app {median('import_ms'):.0f}ms，create_app() {median('create_ms'):.1f}ms，"
+          f"第一个请求 {args.path} {median('request_ms'):.1f}ms（状态 {runs[0]['status']}）")
+    print(f"项目模块自身的导入耗时 {median('project_ms'):.1f}ms")
+
+    last = runs[-1]
+    top_level = [(name, cumulative) for name, (_, cumulative, depth) in last['modules'].items() if depth == 1]
+    print(f"导入最慢的依赖（累计耗时）：")
+    for name, cumulative in sorted(top_level, key=lambda item: -item[1])[:args.top]:
+        print(f"    {name:<30} {cumulative:8.1f}ms")
+
+    loaded = [name for name in LAZY_MODULES if name in last['loaded']]
+    print(f"启动时加载的可延迟模块：{'、'.join(loaded) or '无'}")
+    print(f"启动时创建了上传目录：{'是' if created_upload_dir else '否'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import datetime
+import os
+import statistics
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine, insert, select, func, MetaData
+from app import InventoryData, Supplier, DATA_FIELDS
+from config import Config
+from db_config import build_engine_options, configure_engine
+
+# 导入进行中的并发查询：SQLite默认回滚日志模式 vs WAL性能配置
+# 大事务写入超出页缓存后会提前获取排他锁，回滚日志模式下此时所有查询都要等到导入提交
+
+PROFILES = {
+    '默认（回滚日志）': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_MMAP_SIZE': 0,
+        'SQLITE_CACHE_SIZE': -2000,
+    },
+    'WAL性能配置': {
+        'SQLITE_JOURNAL_MODE': Config.SQLITE_JOURNAL_MODE,
+        'SQLITE_SYNCHRONOUS': Config.SQLITE_SYNCHRONOUS,
+        'SQLITE_MMAP_SIZE': Config.SQLITE_MMAP_SIZE,
+        'SQLITE_CACHE_SIZE': Config.SQLITE_CACHE_SIZE,
+    },
+}
+
+
+def make_rows(start, count):
+    base = datetime.date(2020, 1, 1)
+    now = datetime.datetime.now().replace(microsecond=0)
+    return [{
+        'date': base + datetime.timedelta(days=i % 1500),
+        'sku': f'SKU{i:07d}',
+        'product_name': f'产品{i % 500}',
+        'inventory_balance': i % 230,
+        'supplier_id': i % 20 + 1,
+        'created_at': now,
+        'updated_at': now
+    } for i in range(start, start + count)]
+
+
+def prepare_engine(path, profile, base_rows):
+    config = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'SQLITE_BUSY_TIMEOUT': Config.SQLITE_BUSY_TIMEOUT}
+    config.update(profile)
+    engine = create_engine(config['SQLALCHEMY_DATABASE_URI'], **build_engine_options(config))
+    configure_engine(engine, config)
+    metadata = MetaData()
+    suppliers = Supplier.__table__.to_metadata(metadata)
+    table = InventoryData.__table__.to_metadata(metadata)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(suppliers), [{'id': i + 1, 'name': f'供应商{i}'} for i in range(20)])
+        for start in range(0, base_rows, 50000):
+            conn.execute(insert(table), make_rows(start, min(50000, base_rows - start)))
+    return engine, table
+
+
+def run_import(engine, table, start, count, batch_size, done):
+    """模拟一次导入：单个事务中分批写入，最后提交"""
+    with engine.begin() as conn:
+        for offset in range(start, start + count, batch_size):
+            conn.execute(insert(table), make_rows(offset, min(batch_size, start + count - offset)))
+    done.set()
+
+
+def run_reader(engine, table, done, latencies, errors, think_time):
+    """与/api/data相同的查询：按供应商筛选的总数 + 第一页（按supplier_id筛选，不含供应商名称列）"""
+    columns = [table.c[name] for name in DATA_FIELDS if name != 'supplier']
+    page = select(*columns).where(table.c.supplier_id == 4)\
+        .order_by(table.c.date.desc(), table.c.id.desc()).limit(20)
+    count = select(func.count()).select_from(table).where(table.c.supplier_id == 4)
+    while not done.is_set():
+        started = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(count).scalar()
+                conn.execute(page).all()
+            latencies.append(time.perf_counter() - started)
+        except Exception as e:
+            errors.append(str(e).splitlines()[0])
+        # 模拟用户操作间隔，也避免查询线程长期占用GIL拖慢导入
+        time.sleep(think_time)
+
+
+def run_profile(name, profile, args):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine, table = prepare_engine(os.path.join(tmpdir, 'bench.db'), profile, args.base_rows)
+        done = threading.Event()
+        latencies, errors = [], []
+        think_time = args.think_ms / 1000
+        readers = [threading.Thread(target=run_reader, args=(engine, table, done, latencies, errors, think_time))
+                   for _ in range(args.readers)]
+        started = time.perf_counter()
+        for reader in readers:
+            reader.start()
+        run_import(engine, table, args.base_rows, args.import_rows, 1000, done)
+        import_time = time.perf_counter() - started
+        for reader in readers:
+            reader.join()
+        engine.dispose()
+
+    if latencies:
+        ordered = sorted(latencies)
+        p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) >= 20 else ordered[-1]
+        summary = (f"完成查询 {len(latencies)} 次，中位数 {statistics.median(ordered) * 1000:.1f}ms，"
+                   f"P95 {p95 * 1000:.1f}ms，最长 {ordered[-1] * 1000:.1f}ms")
+    else:
+        summary = "没有查询完成"
+    print(f"{name}：导入 {args.import_rows} 行用时 {import_time:.2f}s；{summary}；失败 {len(errors)} 次")
+    if errors:
+        print(f"    {errors[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导入进行中的并发查询性能对比')
+    parser.add_argument('--base-rows', type=int, default=200000, help='导入前已有的数据行数')
+    parser.add_argument('--import-rows', type=int, default=200000, help='导入的行数')
+    parser.add_argument('--readers', type=int, default=4, help='并发查询线程数')
+    parser.add_argument('--think-ms', type=int, default=20, help='每个查询线程两次查询之间的间隔（毫秒）')
+    args = parser.parse_args()
+
+    for name, profile in PROFILES.items():
+        run_profile(name, profile, args)
+
+
+if __name__ == '__main__':
+    main()
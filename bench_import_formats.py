@@ -0,0 +1,131 @@
+import argparse
+import datetime
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine, Column, Integer, String, Date, UniqueConstraint
+from sqlalchemy.orm import declarative_base, Session
+from importer import iter_file_rows, run_import
+
+# 各导入格式的吞吐量对比（行/秒）：只读取（解析文件）与完整导入（读取 → 验证 → 查重 → 写入SQLite）
+
+HEADER = ["日期", "SKU", "产品名称", "入库数量", "出库数量", "库存余额", "供应商", "操作员", "备注"]
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = 'inventory_data'
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    sku = Column(String(50), nullable=False)
+    product_name = Column(String(200))
+    inbound_quantity = Column(Integer)
+    outbound_quantity = Column(Integer)
+    inventory_balance = Column(Integer)
+    supplier = Column(String(100))
+    operator = Column(String(50))
+    remarks = Column(String(200))
+    __table_args__ = (UniqueConstraint('date', 'sku', name='uq_date_sku'),)
+
+
+def generate_rows(row_count):
+    start = datetime.date(2020, 1, 1)
+    for i in range(row_count):
+        day = start + datetime.timedelta(days=i % 1500)
+        yield [day.isoformat(), f"SKU{i:07d}", f"产品{i % 500}", i % 300, i % 70, i % 230,
+               f"供应商{i % 20}", "张三", "基准数据"]
+
+
+def write_xlsx(path, row_count):
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("库存数据")
+    ws.append(HEADER)
+    for row in generate_rows(row_count):
+        ws.append(row)
+    wb.save(path)
+
+
+def write_csv(path, row_count, encoding):
+    import csv
+
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(generate_rows(row_count))
+
+
+def write_parquet(path, row_count):
+    import pyarrow
+    import pyarrow.parquet as pq
+
+    columns = list(zip(*generate_rows(row_count)))
+    columns[0] = [datetime.date.fromisoformat(value) for value in columns[0]]
+    pq.write_table(pyarrow.table(dict(zip(HEADER, map(list, columns)))), path)
+
+
+def build_files(tmpdir, row_count):
+    """生成各格式的测试文件，返回[(名称, 格式, 文件路径)]；没有安装pyarrow时跳过Parquet"""
+    files = []
+    path = os.path.join(tmpdir, 'bench.xlsx')
+    write_xlsx(path, row_count)
+    files.append(('xlsx', 'xlsx', path))
+    for encoding in ('utf-8', 'gbk'):
+        path = os.path.join(tmpdir, f'bench-{encoding}.csv')
+        write_csv(path, row_count, encoding)
+        files.append((f'csv（{encoding}）', 'csv', path))
+    try:
+        path = os.path.join(tmpdir, 'bench.parquet')
+        write_parquet(path, row_count)
+        files.append(('parquet', 'parquet', path))
+    except ImportError:
+        print("未安装pyarrow，跳过Parquet")
+    return files
+
+
+def measure_read(fmt, path):
+    started = time.perf_counter()
+    count = sum(1 for _ in iter_file_rows(path, fmt))
+    return count, time.perf_counter() - started
+
+
+def measure_import(fmt, path, database, chunk_size):
+    engine = create_engine(f'sqlite:///{database}')
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    try:
+        with Session(engine) as session:
+            started = time.perf_counter()
+            result = run_import(iter_file_rows(path, fmt), session, Item, chunk_size=chunk_size)
+            session.commit()
+            elapsed = time.perf_counter() - started
+        assert result.ok, result.validation_errors[:5]
+        return result.writer.written_count, elapsed
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='各导入格式（xlsx/csv/parquet）的吞吐量对比')
+    parser.add_argument('--rows', type=int, default=100000, help='测试文件行数')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='导入时每批处理的行数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"生成{args.rows}行测试文件...")
+        files = build_files(tmpdir, args.rows)
+        database = os.path.join(tmpdir, 'bench.db')
+
+        print(f"{'格式':<12}{'文件大小':>10}{'只读取（行/秒）':>16}{'完整导入（行/秒）':>18}")
+        for name, fmt, path in files:
+            read_count, read_seconds = measure_read(fmt, path)
+            written, import_seconds = measure_import(fmt, path, database, args.chunk_size)
+            assert read_count == written == args.rows
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            print(f"{name:<12}{size_mb:>8.1f}MB{read_count / read_seconds:>16,.0f}{written / import_seconds:>18,.0f}")
+
+
+if __name__ == '__main__':
+    main()
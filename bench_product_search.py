@@ -0,0 +1,81 @@
+import argparse
+import datetime
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine, insert, select, func, MetaData
+from app import InventoryData, Supplier
+from search import ProductNameSearch, install_search_index
+
+# product_name_like 查询性能对比：LIKE全表扫描 vs 全文索引（SQLite FTS5 trigram）
+
+BRANDS = ['华为', '小米', '苹果', '联想', '海尔', '美的', '格力', '索尼', '三星', '飞利浦']
+CATEGORIES = ['手机壳', '充电器', '蓝牙耳机', '数据线', '移动电源', '机械键盘', '无线鼠标', '显示器支架', '电饭煲', '空气净化器']
+TERMS = ['蓝牙耳机', '小米充电', '型号1234', '不存在的商品', 'USB']
+
+
+def prepare_database(path, row_count, batch_size=50000):
+    engine = create_engine(f'sqlite:///{path}')
+    # 只创建明细表，全文索引在数据写入后一次性建立
+    metadata = MetaData()
+    Supplier.__table__.to_metadata(metadata)
+    InventoryData.__table__.to_metadata(metadata)
+    metadata.create_all(engine)
+    start = datetime.date(2020, 1, 1)
+    now = datetime.datetime.now().replace(microsecond=0)
+    table = metadata.tables['inventory_data']
+    with engine.begin() as conn:
+        for offset in range(0, row_count, batch_size):
+            conn.execute(insert(table), [{
+                'date': start + datetime.timedelta(days=i % 1500),
+                'sku': f'SKU{i:07d}',
+                'product_name': f'{BRANDS[i % 10]}{CATEGORIES[i // 10 % 10]}型号{i % 5000}',
+                'inventory_balance': i % 230,
+                'supplier_id': i % 20 + 1,
+                'created_at': now,
+                'updated_at': now
+            } for i in range(offset, min(offset + batch_size, row_count))])
+    return engine
+
+
+def run_query(engine, search, term):
+    """与/api/data相同的查询形状：COUNT(*) + 按日期倒序取第一页"""
+    table = InventoryData.__table__
+    condition = search.condition(table.c.id, table.c.product_name, term, engine)
+    with engine.connect() as conn:
+        started = time.perf_counter()
+        total = conn.execute(select(func.count()).select_from(table).where(condition)).scalar()
+        rows = conn.execute(select(table.c.id).where(condition)
+                            .order_by(table.c.date.desc(), table.c.id.desc()).limit(20)).all()
+        elapsed = time.perf_counter() - started
+    return total, [row[0] for row in rows], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='product_name_like 查询性能对比')
+    parser.add_argument('--rows', type=int, default=1000000, help='测试数据行数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        started = time.perf_counter()
+        engine = prepare_database(os.path.join(tmpdir, 'bench.db'), args.rows)
+        print(f"写入 {args.rows} 行：{time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            install_search_index(conn)
+        print(f"建立全文索引：{time.perf_counter() - started:.1f}s")
+
+        like_search = ProductNameSearch(enabled=False)
+        fts_search = ProductNameSearch()
+        for term in TERMS:
+            like_total, like_rows, like_time = run_query(engine, like_search, term)
+            fts_total, fts_rows, fts_time = run_query(engine, fts_search, term)
+            assert (like_total, like_rows) == (fts_total, fts_rows)
+            print(f"'{term}'：匹配 {like_total} 行，LIKE {like_time * 1000:.1f}ms，"
+                  f"全文索引 {fts_time * 1000:.1f}ms（{like_time / fts_time:.1f}x）")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import argparse
+import datetime
+import os
+import tempfile
+import time
+import openpyxl
+from date_parser import make_column_date_parser
+from importer import iter_excel_rows, convert_rows
+
+# 行转换性能对比：原先 验证/查重/导入 各处理一遍 vs 单次遍历的 convert_rows
+
+LEGACY_DATE_FORMATS = [
+    '%Y-%m-%d', '%Y/%m/%d', '%Y.%m.%d', '%Y%m%d',
+    '%d-%m-%Y', '%d/%m/%Y', '%d.%m.%Y',
+    '%m-%d-%Y', '%m/%d/%Y', '%m.%d.%Y',
+]
+
+
+def legacy_parse_date(date_str):
+    # 原parse_date_flexible的strptime部分（基准数据中的日期都由这一部分解析）
+    for fmt in LEGACY_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def legacy_process(rows):
+    """按原upload_file的方式处理：验证、查重键计算、导入转换各遍历一次"""
+    errors = []
+    for row_idx, row in enumerate(rows, start=2):
+        if not legacy_parse_date(str(row[0]).strip()):
+            errors.append(row_idx)
+        if not str(row[1]).strip():
+            errors.append(row_idx)
+        for index in (3, 4, 5):
+            try:
+                if row[index]:
+                    int(row[index])
+            except (ValueError, TypeError):
+                errors.append(row_idx)
+
+    keys = []
+    for row in rows:
+        date_str = str(row[0]).strip()
+        sku = str(row[1]).strip()
+        date = legacy_parse_date(date_str)
+        if date:
+            keys.append((date, sku))
+
+    records = []
+    for row in rows:
+        date = legacy_parse_date(str(row[0]).strip())
+        records.append({
+            'date': date,
+            'sku': str(row[1]).strip(),
+            'product_name': str(row[2]).strip() if row[2] else None,
+            'inbound_quantity': int(row[3]) if row[3] is not None else 0,
+            'outbound_quantity': int(row[4]) if row[4] is not None else 0,
+            'inventory_balance': int(row[5]) if row[5] is not None else 0,
+            'supplier': str(row[6]).strip() if row[6] else None,
+            'operator': str(row[7]).strip() if row[7] else None,
+            'remarks': str(row[8]).strip() if row[8] else None,
+        })
+    return records, errors
+
+
+def new_process(rows):
+    parse_date = make_column_date_parser([row[0] for row in rows[:100]])
+    records, errors = convert_rows(rows, 2, parse_date)
+    return [record.to_params() for record in records], errors
+
+
+def create_sheet(path, row_count):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("库存数据")
+    ws.append(["日期", "SKU", "产品名称", "入库数量", "出库数量", "库存余额", "供应商", "操作员", "备注"])
+    start = datetime.date(2020, 1, 1)
+    for i in range(row_count):
+        day = start + datetime.timedelta(days=i % 1500)
+        ws.append([f"{day.year}/{day.month}/{day.day}", f"SKU{i:06d}", f"产品{i % 500}",
+                   i % 300, i % 70, i % 230, f"供应商{i % 20}", "张三", "基准数据"])
+    wb.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='行转换性能对比')
+    parser.add_argument('--rows', type=int, default=100000, help='测试表格行数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'bench.xlsx')
+        print(f"生成{args.rows}行测试表格...")
+        create_sheet(path, args.rows)
+        rows = list(iter_excel_rows(path))
+
+    for name, func in (('原实现（三次遍历）', legacy_process), ('单次遍历转换', new_process)):
+        started = time.perf_counter()
+        records, errors = func(rows)
+        elapsed = time.perf_counter() - started
+        assert len(records) == len(rows) and not errors
+        print(f"{name}: 总耗时 {elapsed:.3f}s，每行 {elapsed / len(rows) * 1e6:.2f}µs")
+
+
+if __name__ == '__main__':
+    main()
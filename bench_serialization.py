@@ -0,0 +1,80 @@
+import argparse
+import datetime
+import json
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from app import InventoryData, Supplier, DATA_FIELDS
+from serialization import make_row_serializer, orjson
+
+# /api/data 序列化性能对比：ORM对象 + to_dict vs 列投影 + 元组序列化（可选orjson）
+
+
+def prepare_database(path, row_count):
+    engine = create_engine(f'sqlite:///{path}')
+    InventoryData.metadata.create_all(engine)
+    start = datetime.date(2020, 1, 1)
+    now = datetime.datetime.now().replace(microsecond=0)
+    rows = [{
+        'date': start + datetime.timedelta(days=i % 1500),
+        'sku': f'SKU{i:06d}',
+        'product_name': f'产品{i % 500}',
+        'inbound_quantity': i % 300,
+        'outbound_quantity': i % 70,
+        'inventory_balance': i % 230,
+        'supplier_id': i % 20 + 1,
+        'operator': '张三',
+        'remarks': None,
+        'created_at': now,
+        'updated_at': now
+    } for i in range(row_count)]
+    with engine.begin() as conn:
+        conn.execute(insert(Supplier.__table__), [{'id': i + 1, 'name': f'供应商{i}'} for i in range(20)])
+        conn.execute(insert(InventoryData.__table__), rows)
+    return engine
+
+
+def orm_to_dict(session):
+    return [item.to_dict() for item in session.query(InventoryData).order_by(InventoryData.id).all()]
+
+
+def projection(session):
+    columns = [getattr(InventoryData, name) for name in DATA_FIELDS]
+    serialize = make_row_serializer(list(DATA_FIELDS), columns)
+    rows = session.query(InventoryData).with_entities(*columns).order_by(InventoryData.id).all()
+    return [serialize(row) for row in rows]
+
+
+def run(name, engine, func, dumps, row_count):
+    with Session(engine) as session:
+        started = time.perf_counter()
+        items = func(session)
+        serialized = time.perf_counter()
+        body = dumps({'code': 200, 'data': {'items': items}})
+        finished = time.perf_counter()
+    print(f"{name}: 查询+序列化 {(serialized - started) / row_count * 1e6:.2f}µs/行，"
+          f"JSON编码 {(finished - serialized) / row_count * 1e6:.2f}µs/行，共 {finished - started:.3f}s")
+    return items, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description='/api/data 序列化性能对比')
+    parser.add_argument('--rows', type=int, default=50000, help='测试数据行数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = prepare_database(os.path.join(tmpdir, 'bench.db'), args.rows)
+        baseline, _ = run('ORM + to_dict + json', engine, orm_to_dict, json.dumps, args.rows)
+        projected, _ = run('列投影 + json', engine, projection, json.dumps, args.rows)
+        assert baseline == projected
+        if orjson is not None:
+            run('列投影 + orjson', engine, projection, orjson.dumps, args.rows)
+        else:
+            print("未安装orjson，跳过orjson对比")
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import datetime
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine, insert, select, exists, MetaData, Table, Column, Index, UniqueConstraint, \
+    Integer, String, Text, Date, DateTime
+from app import InventoryData, Supplier
+
+# /api/suppliers 查询与明细表大小对比：明细表保存供应商名称 + SELECT DISTINCT vs 供应商维度表 + supplier_id
+
+
+def make_rows(row_count, supplier_value):
+    start = datetime.date(2020, 1, 1)
+    now = datetime.datetime.now().replace(microsecond=0)
+    return [{
+        'date': start + datetime.timedelta(days=i % 1500),
+        'sku': f'SKU{i:07d}',
+        'product_name': f'产品{i % 500}',
+        'inventory_balance': i % 230,
+        'created_at': now,
+        'updated_at': now,
+        **supplier_value(i % 50)
+    } for i in range(row_count)]
+
+
+def prepare_name_database(path, row_count):
+    """旧版本的表结构：inventory_data.supplier 保存供应商名称，其余列与索引与当前模型相同"""
+    engine = create_engine(f'sqlite:///{path}')
+    metadata = MetaData()
+    table = Table(
+        'inventory_data', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('date', Date, nullable=False),
+        Column('sku', String(50), nullable=False),
+        Column('product_name', String(200)),
+        Column('inbound_quantity', Integer),
+        Column('outbound_quantity', Integer),
+        Column('inventory_balance', Integer),
+        Column('supplier', String(100)),
+        Column('operator', String(50)),
+        Column('remarks', Text),
+        Column('created_at', DateTime),
+        Column('updated_at', DateTime),
+        UniqueConstraint('date', 'sku', name='uq_date_sku'),
+        Index('idx_date_id', 'date', 'id'),
+        Index('idx_sku_date_balance', 'sku', 'date', 'inventory_balance'),
+        Index('idx_supplier_date_balance', 'supplier', 'date', 'inventory_balance'),
+    )
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(table), make_rows(row_count, lambda n: {'supplier': f'华东区域供应商有限公司{n:03d}'}))
+    query = select(table.c.supplier).where(table.c.supplier.isnot(None)).where(table.c.supplier != '')\
+        .distinct().order_by(table.c.supplier)
+    return engine, query
+
+
+def prepare_dimension_database(path, row_count):
+    engine = create_engine(f'sqlite:///{path}')
+    metadata = MetaData()
+    suppliers = Supplier.__table__.to_metadata(metadata)
+    table = InventoryData.__table__.to_metadata(metadata)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(suppliers), [{'id': n + 1, 'name': f'华东区域供应商有限公司{n:03d}'} for n in range(50)])
+        conn.execute(insert(table), make_rows(row_count, lambda n: {'supplier_id': n + 1}))
+    query = select(suppliers.c.name).where(exists().where(table.c.supplier_id == suppliers.c.id))\
+        .order_by(suppliers.c.name)
+    return engine, query
+
+
+def run(name, path, prepare, row_count, repeat):
+    engine, query = prepare(path, row_count)
+    with engine.connect() as conn:
+        conn.exec_driver_sql('VACUUM')
+        started = time.perf_counter()
+        for _ in range(repeat):
+            names = conn.execute(query).scalars().all()
+        elapsed = (time.perf_counter() - started) / repeat
+    engine.dispose()
+    size = os.path.getsize(path) / 1024 / 1024
+    print(f"{name}：供应商 {len(names)} 个，查询 {elapsed * 1000:.2f}ms，数据库文件 {size:.1f}MB")
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description='/api/suppliers 查询与明细表大小对比')
+    parser.add_argument('--rows', type=int, default=500000, help='测试数据行数')
+    parser.add_argument('--repeat', type=int, default=5, help='每种查询重复执行的次数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        by_name = run('明细表保存名称 + DISTINCT', os.path.join(tmpdir, 'name.db'),
+                      prepare_name_database, args.rows, args.repeat)
+        by_dimension = run('供应商维度表', os.path.join(tmpdir, 'dimension.db'),
+                           prepare_dimension_database, args.rows, args.repeat)
+        assert by_name == by_dimension
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# 数据版本号在存储中的键，每次导入提交后加1，缓存键包含版本号，旧版本的结果自然失效
+VERSION_KEY = 'data_version'
+# 数据最后变更时间（Unix时间戳），用于Last-Modified
+CHANGED_AT_KEY = 'data_changed_at'
+
+
+class MemoryCacheBackend:
+    """进程内存储：LRU淘汰 + 过期时间，线程安全；只在单进程部署时保证各请求看到同一数据版本"""
+
+    name = 'memory'
+
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.counters = {}
+        self.meta = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return None
+            if item[1] <= time.time():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+            return item[0]
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.items[key] = (value, time.time() + ttl)
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def get_counter(self, key):
+        with self.lock:
+            return self.counters.get(key, 0)
+
+    def incr(self, key):
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+            return self.counters[key]
+
+    def get_meta(self, key):
+        with self.lock:
+            return self.meta.get(key)
+
+    def set_meta(self, key, value, only_if_missing=False):
+        with self.lock:
+            if only_if_missing:
+                self.meta.setdefault(key, value)
+            else:
+                self.meta[key] = value
+
+    def size(self):
+        with self.lock:
+            return len(self.items)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+class RedisCacheBackend:
+    """Redis存储，多进程/多实例共享缓存与数据版本号；值以JSON保存"""
+
+    name = 'redis'
+
+    def __init__(self, url, prefix='inventory:cache:'):
+        import redis  # 可选依赖，只在配置使用Redis时导入
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), ex=max(int(ttl), 1))
+
+    def get_counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def get_meta(self, key):
+        return self.get(key)
+
+    def set_meta(self, key, value, only_if_missing=False):
+        self.client.set(self.prefix + key, json.dumps(value), nx=only_if_missing)
+
+    def size(self):
+        return None
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+def create_cache_backend(name, url=None, max_size=512):
+    if name == 'memory':
+        return MemoryCacheBackend(max_size)
+    if name == 'redis':
+        return RedisCacheBackend(url)
+    raise ValueError(f'不支持的缓存类型：{name}')
+
+
+class DatabaseVersion:
+    """数据版本保存在数据库中（导入、撤销和修改数据的脚本在同一事务中更新），所有进程和实例读到同一版本；
+    read返回(版本号, 最后变更时间戳)，读取结果在进程内保留ttl秒，避免每个读请求都查询数据库"""
+
+    def __init__(self, read, ttl=1.0):
+        self.read = read
+        self.ttl = ttl
+        self.value = None
+        self.expires = 0
+        self.lock = threading.Lock()
+
+    def current(self):
+        with self.lock:
+            if self.value is not None and time.time() < self.expires:
+                return self.value
+        value = self.read()
+        with self.lock:
+            self.value, self.expires = value, time.time() + self.ttl
+        return value
+
+    def refresh(self):
+        """本进程提交了数据变更，下次读取时重新查询"""
+        with self.lock:
+            self.expires = 0
+
+
+class ResultCache:
+    """查询结果缓存：键为 端点 + 数据版本 + 规范化后的请求参数。
+    后端需实现 get/set/get_counter/incr/get_meta/set_meta/size/clear，可替换为测试用的字典或文件存储；
+    缓存的值不能为None（None表示未命中）。提供version_source（DatabaseVersion）时数据版本从数据库读取，
+    否则使用存储中的计数器（进程内存储只在单进程部署时各请求看到同一版本）"""
+
+    def __init__(self, backend, ttl=300, enabled=True, version_source=None):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.version_source = version_source
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        # 进程内存储在重启后版本号从0开始，以启动时间作为变更时间，使重启前后的版本标识不同
+        self.backend.set_meta(CHANGED_AT_KEY, time.time(), only_if_missing=True)
+
+    def data_version(self):
+        if self.version_source is not None:
+            return self.version_source.current()[0]
+        return self.backend.get_counter(VERSION_KEY)
+
+    def bump_version(self):
+        """数据变更（导入提交）后调用，此前缓存的结果全部失效；
+        使用数据库中的版本时版本已随数据一起提交，这里只让本进程立即读到新版本"""
+        if self.version_source is not None:
+            self.version_source.refresh()
+            return self.data_version()
+        version = self.backend.incr(VERSION_KEY)
+        # HTTP日期精确到秒，保证每次变更时间至少前进到下一秒，否则同一秒内的变更会被If-Modified-Since误判为未修改
+        previous = self.backend.get_meta(CHANGED_AT_KEY) or 0
+        self.backend.set_meta(CHANGED_AT_KEY, max(time.time(), int(previous) + 1))
+        return version
+
+    def version_info(self):
+        """返回(版本标识, 最后变更时间戳)，供HTTP条件请求生成ETag和Last-Modified"""
+        if self.version_source is not None:
+            version, changed_at = self.version_source.current()
+        else:
+            version, changed_at = self.data_version(), self.backend.get_meta(CHANGED_AT_KEY) or 0
+        return f'{version}.{int(changed_at * 1000)}', changed_at
+
+    @staticmethod
+    def make_key(endpoint, params, version):
+        # 参数按名称和值排序，与顺序无关；参数较多时用摘要保证键长度固定
+        normalized = json.dumps(sorted(params), ensure_ascii=False, separators=(',', ':'))
+        digest = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+        return f'{endpoint}:{version}:{digest}'
+
+    def _lookup(self, endpoint, params):
+        """返回(缓存键, 缓存的值)，未命中时值为None"""
+        key = self.make_key(endpoint, params, self.data_version())
+        value = self.backend.get(key)
+        with self.lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return key, value
+
+    def get_or_compute(self, endpoint, params, compute, ttl=None):
+        if not self.enabled:
+            return compute()
+        key, value = self._lookup(endpoint, params)
+        if value is None:
+            value = compute()
+            self.backend.set(key, value, self.ttl if ttl is None else ttl)
+        return value
+
+    async def get_or_compute_async(self, endpoint, params, compute, ttl=None):
+        """供ASGI读接口使用：compute返回awaitable，查询期间不阻塞事件循环（缓存后端的读写仍是同步调用）"""
+        if not self.enabled:
+            return await compute()
+        key, value = self._lookup(endpoint, params)
+        if value is None:
+            value = await compute()
+            self.backend.set(key, value, self.ttl if ttl is None else ttl)
+        return value
+
+    def stats(self):
+        with self.lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'enabled': self.enabled,
+            'backend': getattr(self.backend, 'name', type(self.backend).__name__),
+            'data_version': self.data_version(),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else None,
+            'size': self.backend.size()
+        }
@@ -0,0 +1,87 @@
+import datetime
+from sqlalchemy import func, Date
+
+# 图表时间粒度，auto根据日期跨度自动选择
+CHART_GRANULARITIES = ('day', 'week', 'month', 'auto')
+
+
+def bucket_expression(column, granularity, dialect_name):
+    """返回把日期列归入时间桶的SQL表达式（桶的起始日期）：
+    week以周一为起点，month以每月1日为起点"""
+    if granularity == 'day':
+        return column
+    if dialect_name == 'sqlite':
+        if granularity == 'week':
+            # weekday 0 前进到本周日（当天为周日时不变），再减6天得到周一
+            return func.date(column, 'weekday 0', '-6 days', type_=Date)
+        return func.date(column, 'start of month', type_=Date)
+    if dialect_name == 'mysql':
+        if granularity == 'week':
+            # SUBDATE(date, n) 减去n天；WEEKDAY周一为0
+            return func.subdate(column, func.weekday(column), type_=Date)
+        return func.subdate(column, func.dayofmonth(column) - 1, type_=Date)
+    # 其他数据库使用date_trunc（PostgreSQL等）
+    return func.date_trunc(granularity, column, type_=Date)
+
+
+def resolve_granularity(granularity, first_date, last_date, target_points):
+    """auto：日期跨度不超过target_points天时按天，按周不超过时按周，否则按月"""
+    if granularity != 'auto':
+        return granularity
+    if first_date is None or last_date is None:
+        return 'day'
+    span_days = (last_date - first_date).days + 1
+    if span_days <= target_points:
+        return 'day'
+    if span_days / 7 <= target_points:
+        return 'week'
+    return 'month'
+
+
+def to_date(value):
+    """部分数据库对日期函数返回字符串，统一转换为date"""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value[:10])
+    return value
+
+
+def lttb(xs, ys, threshold):
+    """Largest-Triangle-Three-Buckets降采样，返回保留点的下标。
+    保留首尾点，其余每个桶中选与前一保留点、下一桶平均点构成三角形面积最大的点，
+    能保留峰谷等形状特征"""
+    count = len(xs)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+
+    selected = [0]
+    every = (count - 2) / (threshold - 2)
+    previous = 0
+    for i in range(threshold - 2):
+        # 当前桶范围
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        # 下一个桶的平均点（最后一个桶用末尾点）
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, count)
+        if next_start >= count - 1:
+            avg_x, avg_y = xs[-1], ys[-1]
+        else:
+            span = next_end - next_start
+            avg_x = sum(xs[next_start:next_end]) / span
+            avg_y = sum(ys[next_start:next_end]) / span
+
+        prev_x, prev_y = xs[previous], ys[previous]
+        best_area = -1
+        best_index = start
+        for j in range(start, end):
+            area = abs((prev_x - avg_x) * (ys[j] - prev_y) - (prev_x - xs[j]) * (avg_y - prev_y))
+            if area > best_area:
+                best_area = area
+                best_index = j
+        selected.append(best_index)
+        previous = best_index
+
+    selected.append(count - 1)
+    return selected
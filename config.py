@@ -1,10 +1,12 @@
 import os
+from urllib.parse import quote_plus
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class Config:
-    # 数据库配置 - 使用SQLite进行测试
+    # 数据库配置 - 默认使用SQLite；DB_BACKEND=mysql时按以下参数连接MySQL，DATABASE_URL优先
+    DB_BACKEND = os.getenv('DB_BACKEND', 'sqlite')
     DB_HOST = os.getenv('DB_HOST', 'localhost')
     DB_USER = os.getenv('DB_USER', 'inventory_user')
     DB_PASSWORD = os.getenv('DB_PASSWORD', 'your_password')
@@ -13,18 +15,109 @@ class Config:
     # 应用配置
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
     DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
+    # 安装了orjson时使用其编码JSON响应
+    USE_FAST_JSON = os.getenv('USE_FAST_JSON', 'True').lower() == 'true'
     
     # 文件上传配置
-    UPLOAD_FOLDER = 'uploads'
+    # 上传文件的保存目录（第一次上传时创建）；无服务器函数只有/tmp可写
+    UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
     MAX_CONTENT_LENGTH = 2 * 1024 * 1024  # 2MB
-    ALLOWED_EXTENSIONS = {'xlsx'}
+    # 批量导入（/api/upload/batch）一次上传多个文件或压缩包，单独的请求大小上限
+    BATCH_MAX_CONTENT_LENGTH = int(os.getenv('BATCH_MAX_CONTENT_LENGTH', 200 * 1024 * 1024))
+    # 一次批量导入中压缩包解压后的总大小（字节）与每个压缩包的条目数上限，防止压缩炸弹占满上传目录
+    BATCH_ZIP_MAX_UNCOMPRESSED = int(os.getenv('BATCH_ZIP_MAX_UNCOMPRESSED', 1024 * 1024 * 1024))
+    BATCH_ZIP_MAX_ENTRIES = int(os.getenv('BATCH_ZIP_MAX_ENTRIES', 100))
+    # 上传的文件不超过该大小（字节）时只保存在内存中直接解析，超过时写入匿名临时文件
+    UPLOAD_SPOOL_MAX_MEMORY = int(os.getenv('UPLOAD_SPOOL_MAX_MEMORY', 4 * 1024 * 1024))
+    # 分片续传（/api/upload/sessions）：大文件分成多个请求上传，每个分片不能超过MAX_CONTENT_LENGTH
+    RESUMABLE_CHUNK_SIZE = int(os.getenv('RESUMABLE_CHUNK_SIZE', 1024 * 1024))
+    RESUMABLE_MAX_FILE_SIZE = int(os.getenv('RESUMABLE_MAX_FILE_SIZE', 500 * 1024 * 1024))
+    # 超过该秒数没有上传分片的会话及其分片会被删除
+    RESUMABLE_SESSION_TTL = int(os.getenv('RESUMABLE_SESSION_TTL', 24 * 3600))
+    # 单文件导入支持的格式：xlsx、csv（UTF-8/GBK编码自动识别）、parquet（需要安装pyarrow）
+    ALLOWED_EXTENSIONS = {'xlsx', 'csv', 'parquet'}
+    # 批量导入（多文件/压缩包）支持的格式
+    BATCH_ALLOWED_EXTENSIONS = {'xlsx', 'zip'}
+    # 导入时每批处理（验证/写入）的行数
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 1000))
+    # 推断日期列格式时采样的行数
+    DATE_FORMAT_SAMPLE_ROWS = int(os.getenv('DATE_FORMAT_SAMPLE_ROWS', 100))
+    # 默认导入模式：reject（存在重复即失败）、skip（跳过重复）、overwrite（覆盖重复）
+    UPLOAD_IMPORT_MODE = os.getenv('UPLOAD_IMPORT_MODE', 'reject')
+    # 是否默认在后台执行导入（请求可通过 async 参数覆盖）
+    UPLOAD_ASYNC = os.getenv('UPLOAD_ASYNC', 'False').lower() == 'true'
+    # 后台导入的并发线程数与保留的任务记录数；使用SQLite时导入与撤销在进程内依次执行（只允许一个写事务）
+    IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', 2))
+    IMPORT_JOB_HISTORY = int(os.getenv('IMPORT_JOB_HISTORY', 100))
+    # 批量导入时并行解析工作表的进程数，1表示在当前进程中依次解析
+    IMPORT_PARSE_PROCESSES = int(os.getenv('IMPORT_PARSE_PROCESSES', min(4, os.cpu_count() or 1)))
     
-    # 使用SQLite数据库进行测试
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///inventory.db'
+    # 查询结果缓存：memory（进程内，单进程部署）或 redis（多进程共享，需安装redis并配置RESULT_CACHE_URL）
+    RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'True').lower() == 'true'
+    RESULT_CACHE_BACKEND = os.getenv('RESULT_CACHE_BACKEND', 'memory')
+    RESULT_CACHE_URL = os.getenv('RESULT_CACHE_URL', 'redis://localhost:6379/0')
+    RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', 300))
+    RESULT_CACHE_MAX_SIZE = int(os.getenv('RESULT_CACHE_MAX_SIZE', 512))
+    # /api/data 只缓存前几页
+    RESULT_CACHE_DATA_PAGES = int(os.getenv('RESULT_CACHE_DATA_PAGES', 3))
+    # 数据版本保存在数据库中（data_version表），各进程读取后保留该秒数，数据变更后其他进程最多延迟该时间看到新数据
+    DATA_VERSION_TTL = float(os.getenv('DATA_VERSION_TTL', 1))
+    # 读接口返回ETag/Last-Modified，数据未变化时响应304
+    HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'True').lower() == 'true'
+    # 压缩超过COMPRESS_MIN_SIZE字节的JSON响应（安装brotli时优先使用br，否则gzip）
+    COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', 'True').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+    # 游标分页时总数缓存的有效期（秒）
+    DATA_COUNT_CACHE_SECONDS = int(os.getenv('DATA_COUNT_CACHE_SECONDS', 60))
+    
+    # 导出时每批从数据库读取的行数
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    
+    # 图表数据优先从 日期 × 供应商 汇总表读取（汇总表不存在或未回填时自动使用明细表）
+    CHART_USE_ROLLUP = os.getenv('CHART_USE_ROLLUP', 'True').lower() == 'true'
+    # 图表默认时间粒度（day/week/month/auto），auto时目标点数不超过CHART_AUTO_MAX_POINTS
+    CHART_DEFAULT_GRANULARITY = os.getenv('CHART_DEFAULT_GRANULARITY', 'day')
+    CHART_AUTO_MAX_POINTS = int(os.getenv('CHART_AUTO_MAX_POINTS', 366))
+    
+    # product_name_like 使用全文索引（SQLite FTS5 trigram / MySQL FULLTEXT ngram），索引不存在时自动使用LIKE
+    PRODUCT_SEARCH_FULLTEXT = os.getenv('PRODUCT_SEARCH_FULLTEXT', 'True').lower() == 'true'
+    
+    if os.getenv('DATABASE_URL'):
+        SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+    elif DB_BACKEND == 'mysql':
+        SQLALCHEMY_DATABASE_URI = (f'mysql+pymysql://{quote_plus(DB_USER)}:{quote_plus(DB_PASSWORD)}'
+                                   f'@{DB_HOST}/{DB_NAME}?charset=utf8mb4')
+    else:
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///inventory.db'
+    # 只读接口（查询、供应商、图表、导出）使用的读库，未设置时与主库相同；
+    # 本地可使用只读打开的SQLite文件，例如 sqlite:///file:/绝对路径/inventory.db?mode=ro&uri=true
+    DATABASE_READ_URL = os.getenv('DATABASE_READ_URL')
+    # 数据变更后该秒数内只读接口仍查询主库，避免从延迟的读库读到旧数据并按新数据版本缓存；
+    # 应大于读库的复制延迟与DATA_VERSION_TTL之和
+    READ_AFTER_WRITE_SECONDS = float(os.getenv('READ_AFTER_WRITE_SECONDS', 5))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
-        'pool_size': 10,
-        'max_overflow': 20
-    }
\ No newline at end of file
+    # 引擎参数由db_config.build_engine_options按数据库类型生成
+    
+    # 连接池模式：queue（常驻进程，MySQL按以下参数维持连接池）、
+    # null（NullPool，每次使用时建立连接、用完即关闭，适合随时可能被冻结的无服务器函数）、
+    # single（只保持一个连接，适合一次只处理一个请求的短生命周期进程）
+    DB_POOL_MODE = os.getenv('DB_POOL_MODE', 'queue')
+    # MySQL连接池
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 300))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    
+    # ASGI模式（uvicorn asgi:asgi_app）：只读接口使用的异步数据库地址，未设置时由读库/主库地址换成
+    # 异步驱动（sqlite+aiosqlite、mysql+aiomysql）；其余请求交给Flask在线程池中处理
+    ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')
+    ASGI_WSGI_WORKERS = int(os.getenv('ASGI_WSGI_WORKERS', 10))
+    
+    # SQLite连接参数（每个连接建立时通过PRAGMA设置）
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -64000))  # 约64MB
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))  # 毫秒
\ No newline at end of file
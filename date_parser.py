@@ -0,0 +1,124 @@
+import datetime
+import re
+from collections import Counter
+from functools import lru_cache
+
+# 单个预编译正则覆盖全部支持的日期格式：
+#   YYYY-M-D / YYYY/M/D / YYYY.M.D、D-M-YYYY（或 M-D-YYYY）等、以及紧凑的 YYYYMMDD
+_DATE_PATTERN = re.compile(
+    r'^(?:'
+    r'(?P<y1>\d{4})(?P<s1>[-/.])(?P<m1>\d{1,2})(?P=s1)(?P<d1>\d{1,2})'
+    r'|(?P<a>\d{1,2})(?P<s2>[-/.])(?P<b>\d{1,2})(?P=s2)(?P<y2>\d{4})'
+    r'|(?P<compact>\d{5,8})'
+    r')$'
+)
+
+# 按列推断时使用的固定格式正则，键为(字段顺序, 分隔符)
+_FIXED_PATTERNS = {
+    ('ymd', sep): re.compile(r'^(\d{4})' + re.escape(sep) + r'(\d{1,2})' + re.escape(sep) + r'(\d{1,2})$')
+    for sep in '-/.'
+}
+_FIXED_PATTERNS.update({
+    (order, sep): re.compile(r'^(\d{1,2})' + re.escape(sep) + r'(\d{1,2})' + re.escape(sep) + r'(\d{4})$')
+    for order in ('dmy', 'mdy') for sep in '-/.'
+})
+
+# 每个不同日期字符串的解析结果缓存上限
+DATE_CACHE_SIZE = 4096
+
+
+def _build_date(year, month, day):
+    try:
+        return datetime.date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _match_date(date_str):
+    """解析日期字符串，返回(date, 格式键)，无法解析时返回(None, None)"""
+    match = _DATE_PATTERN.match(date_str)
+    if not match:
+        return None, None
+
+    if match.group('y1'):
+        return _build_date(match.group('y1'), match.group('m1'), match.group('d1')), ('ymd', match.group('s1'))
+
+    if match.group('y2'):
+        sep = match.group('s2')
+        a, b, year = match.group('a'), match.group('b'), match.group('y2')
+        # 与原有规则一致：先按 日-月-年 解析，失败再按 月-日-年
+        date = _build_date(year, b, a)
+        if date:
+            return date, ('dmy', sep)
+        date = _build_date(year, a, b)
+        if date:
+            return date, ('mdy', sep)
+        return None, None
+
+    # 紧凑格式沿用strptime的%Y%m%d规则（兼容 2025815 这类省略补零的写法）
+    try:
+        return datetime.datetime.strptime(match.group('compact'), '%Y%m%d').date(), ('compact', '')
+    except ValueError:
+        return None, None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_str(date_str):
+    return _match_date(date_str)[0]
+
+
+def parse_date_flexible(value):
+    """灵活解析日期格式，支持多种格式；Excel中的原生日期单元格直接返回"""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if value is None:
+        return None
+    return _parse_date_str(str(value).strip())
+
+
+def infer_date_format(values):
+    """根据样本推断一列日期的主要格式，返回格式键；无法推断时返回None"""
+    counter = Counter()
+    for value in values:
+        if value is None or isinstance(value, datetime.date):
+            continue
+        date, fmt = _match_date(str(value).strip())
+        if date:
+            counter[fmt] += 1
+    if not counter:
+        return None
+    return counter.most_common(1)[0][0]
+
+
+def make_column_date_parser(sample_values):
+    """按样本推断的主要格式生成整列使用的解析函数，不符合该格式的值回退到灵活解析"""
+    fmt = infer_date_format(sample_values)
+    pattern = _FIXED_PATTERNS.get(fmt)
+    if pattern is None:
+        return parse_date_flexible
+    order = fmt[0]
+
+    def parse_column_date(value):
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        if isinstance(value, datetime.date):
+            return value
+        if value is None:
+            return None
+        date_str = str(value).strip()
+        match = pattern.match(date_str)
+        if match:
+            first, second, third = match.groups()
+            if order == 'ymd':
+                date = _build_date(first, second, third)
+            elif order == 'dmy':
+                date = _build_date(third, second, first)
+            else:
+                date = _build_date(third, first, second)
+            if date:
+                return date
+        return _parse_date_str(date_str)
+
+    return parse_column_date
@@ -0,0 +1,97 @@
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+# 读库在SQLALCHEMY_BINDS中的键
+READ_BIND = 'read'
+
+# DB_POOL_MODE可选的连接池模式
+POOL_MODES = ('queue', 'null', 'single')
+
+# ASGI模式下异步引擎使用的驱动
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'mysql': 'aiomysql'}
+
+
+def build_engine_options(config, uri=None):
+    """按数据库类型与DB_POOL_MODE生成引擎参数：SQLite的并发瓶颈是文件锁而不是连接数，使用SQLAlchemy默认连接池，
+    不设置pool_size/max_overflow（内存数据库不支持）；MySQL按配置设置连接池大小与回收，
+    single模式只保留一个连接；null模式不使用连接池（任何数据库）。uri默认为主库地址"""
+    pool_mode = config.get('DB_POOL_MODE', 'queue')
+    if pool_mode not in POOL_MODES:
+        raise ValueError(f'连接池模式不支持：{pool_mode}，可选：{"、".join(POOL_MODES)}')
+    if pool_mode == 'null':
+        return {'poolclass': NullPool}
+    backend = make_url(uri or config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+    if backend == 'sqlite':
+        return {}
+    single = pool_mode == 'single'
+    return {
+        'pool_size': 1 if single else config['DB_POOL_SIZE'],
+        'max_overflow': 0 if single else config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+
+def build_binds(config):
+    """配置了DATABASE_READ_URL时增加读库引擎，否则所有查询使用主库"""
+    read_url = config.get('DATABASE_READ_URL')
+    if not read_url:
+        return {}
+    return {READ_BIND: {'url': read_url, **build_engine_options(config, read_url)}}
+
+
+def build_async_url(config):
+    """ASGI只读接口使用的异步数据库地址：ASYNC_DATABASE_URL，否则由读库（未配置时为主库）地址换成异步驱动"""
+    if config.get('ASYNC_DATABASE_URL'):
+        return make_url(config['ASYNC_DATABASE_URL'])
+    url = make_url(config.get('DATABASE_READ_URL') or config['SQLALCHEMY_DATABASE_URI'])
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'数据库类型 {backend} 没有可用的异步驱动，请设置ASYNC_DATABASE_URL')
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}')
+
+
+def sqlite_pragmas(config):
+    return [
+        # WAL模式下读写互不阻塞：导入事务进行中，查询仍读取提交前的快照
+        ('journal_mode', config['SQLITE_JOURNAL_MODE']),
+        # WAL下NORMAL只在检查点时fsync，掉电最多丢失最近提交的事务，不会损坏数据库
+        ('synchronous', config['SQLITE_SYNCHRONOUS']),
+        ('mmap_size', config['SQLITE_MMAP_SIZE']),
+        # 负数表示KiB
+        ('cache_size', config['SQLITE_CACHE_SIZE']),
+        # 遇到写锁时等待的毫秒数，而不是立即报 database is locked
+        ('busy_timeout', config['SQLITE_BUSY_TIMEOUT']),
+        ('temp_store', 'MEMORY'),
+    ]
+
+
+def configure_engine(engine, config):
+    """SQLite引擎在每个新连接上设置PRAGMA；其他数据库不做处理"""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(config)
+    if engine.url.query.get('mode') == 'ro':
+        # 只读连接不能切换日志模式；WAL是数据库文件的持久属性，由主库连接设置
+        pragmas = [(name, value) for name, value in pragmas if name != 'journal_mode']
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+class RoutingSession(Session):
+    """session.info['read_only']为True且配置了读库时，查询使用读库引擎；flush（写入）始终使用主库"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('read_only') and not self._flushing:
+            engine = self._db.engines.get(READ_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
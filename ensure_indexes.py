@@ -0,0 +1,143 @@
+from app import create_app, db, InventoryData, InventoryDailySupplier, Supplier, Product, ImportBatch, DATA_FIELDS, \
+    apply_inventory_filters, supplier_id_of
+from indexes import ensure_indexes, find_missing_indexes, find_obsolete_indexes, explain, FULL_SCAN
+from search import MYSQL_FULLTEXT_INDEX
+from sqlalchemy import Column, func, or_, and_, exists, inspect
+from sqlalchemy.sql import visitors
+from werkzeug.datastructures import MultiDict
+import argparse
+import datetime
+import sys
+
+app = create_app()
+
+# 检查结果时忽略的非模型索引（全文索引由search.py维护）
+KEEP_INDEXES = (MYSQL_FULLTEXT_INDEX,)
+
+
+def api_queries():
+    """与各API相同形状的查询：(名称, 查询语句)"""
+    columns = [getattr(InventoryData, name) for name in DATA_FIELDS]
+    order = (InventoryData.date.desc(), InventoryData.id.desc())
+
+    def data_page(*conditions, **args):
+        return apply_inventory_filters(InventoryData.query.with_entities(*columns), MultiDict(args))\
+            .filter(*conditions).order_by(*order).limit(20)
+
+    last_date, last_id = datetime.date(2024, 6, 1), 100000
+    cursor_page = data_page(or_(
+        InventoryData.date < last_date,
+        and_(InventoryData.date == last_date, InventoryData.id < last_id)
+    ))
+    count = apply_inventory_filters(InventoryData.query.with_entities(func.count()),
+                                    MultiDict({'supplier': '供应商A'}))
+    suppliers = db.session.query(Supplier.name)\
+        .filter(exists().where(InventoryData.supplier_id == Supplier.id))\
+        .order_by(Supplier.name)
+
+    def chart(date_column, balance_column, query):
+        return query.with_entities(date_column, func.sum(balance_column)).group_by(date_column).order_by(date_column)
+
+    rollup = InventoryDailySupplier
+    queries = [
+        ('/api/data 第一页', data_page()),
+        ('/api/data 日期范围', data_page(start_date='2024-01-01', end_date='2024-03-31')),
+        ('/api/data SKU', data_page(sku='SKU000001')),
+        ('/api/data 供应商', data_page(supplier='供应商A')),
+        ('/api/data 产品名称', data_page(product_name_like='蓝牙耳机')),
+        ('/api/data 游标翻页', cursor_page),
+        ('/api/data 总数（供应商）', count),
+        ('/api/suppliers', suppliers),
+        ('/api/chart-data 汇总表', chart(rollup.date, rollup.total_balance, rollup.query)),
+        ('/api/chart-data 汇总表（供应商）', chart(rollup.date, rollup.total_balance,
+                                              rollup.query.filter(rollup.supplier_id == supplier_id_of('供应商A')))),
+        ('/api/chart-data 明细（SKU）', chart(InventoryData.date, InventoryData.inventory_balance,
+                                          InventoryData.query.filter(InventoryData.sku == 'SKU000001'))),
+        ('/api/chart-data 明细（供应商）', chart(InventoryData.date, InventoryData.inventory_balance,
+                                          InventoryData.query.filter(
+                                              InventoryData.supplier_id == supplier_id_of('供应商A')))),
+        ('上传前查找相同文件', ImportBatch.query.filter_by(content_hash='0' * 64, status=ImportBatch.IMPORTED)
+            .order_by(ImportBatch.id.desc()).limit(1)),
+        ('/api/imports 撤销批次', InventoryData.query.with_entities(InventoryData.date)
+            .filter(InventoryData.batch_id == 1).distinct()),
+    ]
+    return [(name, query.statement) for name, query in queries]
+
+
+def check_query_plans():
+    """对每个API查询执行EXPLAIN，返回是否全部使用了索引"""
+    all_indexed = True
+    connection = db.session.connection()
+    existing_tables = set(inspect(connection).get_table_names())
+    for name, statement in api_queries():
+        tables = {table.name for table in statement.get_final_froms()}
+        if not tables <= existing_tables:
+            print(f"[跳过] {name}：表不存在")
+            continue
+        columns = {(element.table.name, element.name) for element in visitors.iterate(statement)
+                   if isinstance(element, Column) and element.table is not None}
+        if any(column not in {column['name'] for column in inspect(connection).get_columns(table)}
+               for table, column in columns):
+            print(f"[跳过] {name}：列不存在，请先执行迁移脚本")
+            continue
+        kind, details = explain(connection, statement)
+        if kind is None:
+            print(f"当前数据库（{connection.dialect.name}）不支持执行计划检查")
+            return True
+        print(f"[{kind}] {name}")
+        for detail in details:
+            print(f"    {detail}")
+        if kind == FULL_SCAN:
+            all_indexed = False
+    return all_indexed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按模型补齐数据库索引，并用EXPLAIN检查各API查询是否使用索引')
+    parser.add_argument('--check', action='store_true', help='只检查（缺少的索引、多余的索引和执行计划），不修改数据库')
+    parser.add_argument('--drop-obsolete', action='store_true', help='删除模型中未声明的旧索引')
+    args = parser.parse_args()
+
+    with app.app_context():
+        try:
+            tables = [Supplier.__table__, Product.__table__, InventoryData.__table__, InventoryDailySupplier.__table__,
+                      ImportBatch.__table__]
+            connection = db.session.connection()
+            if args.check:
+                for table in tables:
+                    if not inspect(connection).has_table(table.name):
+                        print(f"{table.name}：表不存在")
+                        continue
+                    missing = [index.name for index in find_missing_indexes(connection, table)]
+                    obsolete = find_obsolete_indexes(connection, table, KEEP_INDEXES)
+                    print(f"{table.name}：缺少索引 {missing or '无'}，多余索引 {obsolete or '无'}")
+            else:
+                # 确保维度表和汇总表存在
+                for table in (Supplier.__table__, Product.__table__, InventoryDailySupplier.__table__, ImportBatch.__table__):
+                    table.create(connection, checkfirst=True)
+                for table in tables:
+                    created, dropped = ensure_indexes(connection, table, args.drop_obsolete, KEEP_INDEXES)
+                    obsolete = [] if args.drop_obsolete else find_obsolete_indexes(connection, table, KEEP_INDEXES)
+                    print(f"{table.name}：新建索引 {created or '无'}，删除索引 {dropped or '无'}")
+                    if obsolete:
+                        print(f"    模型未声明的旧索引：{obsolete}（使用 --drop-obsolete 删除）")
+                db.session.commit()
+                # 更新查询优化器的统计信息
+                if db.engine.dialect.name == 'sqlite':
+                    db.session.connection().exec_driver_sql('ANALYZE')
+                    db.session.commit()
+
+            print("\n执行计划检查：")
+            if not check_query_plans():
+                print("\n存在全表扫描的查询")
+                sys.exit(1)
+            print("\n所有查询均使用索引")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"索引检查失败: {str(e)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+import tempfile
+
+# 导出格式 -> (MIME类型, 文件扩展名)
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+# xlsx从临时文件读出时每次发送的字节数
+XLSX_READ_SIZE = 64 * 1024
+
+
+def iter_csv(items, fields, flush_rows=1000):
+    """逐批生成CSV文本，首块带BOM以便Excel正确识别UTF-8中文"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(fields)
+    count = 0
+    for item in items:
+        writer.writerow([item[name] for name in fields])
+        count += 1
+        if count % flush_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(items, dumps=None, flush_rows=1000):
+    """每行一个JSON对象，逐批生成"""
+    dumps = dumps or (lambda obj: json.dumps(obj, ensure_ascii=False))
+    lines = []
+    for item in items:
+        lines.append(dumps(item))
+        if len(lines) >= flush_rows:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def iter_xlsx(items, fields):
+    """使用openpyxl只写模式生成xlsx：行数据直接写入临时文件，内存占用恒定；
+    xlsx是zip格式，需全部写完后才能开始发送"""
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('库存数据')
+    sheet.append(list(fields))
+    for item in items:
+        sheet.append([item[name] for name in fields])
+
+    with tempfile.TemporaryFile() as tmp:
+        workbook.save(tmp)
+        tmp.seek(0)
+        while True:
+            block = tmp.read(XLSX_READ_SIZE)
+            if not block:
+                break
+            yield block
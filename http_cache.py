@@ -0,0 +1,66 @@
+import gzip
+import hashlib
+from werkzeug.http import http_date
+
+try:
+    import brotli
+except ImportError:  # brotli为可选依赖，未安装时只使用gzip压缩
+    brotli = None
+
+# brotli质量（0-11），5左右压缩率与速度较均衡
+BROTLI_QUALITY = 5
+
+
+def make_etag(version_tag, path, params):
+    """ETag = 数据版本 + 请求路径 + 排序后的查询参数；数据未变化时同一查询得到同一ETag"""
+    normalized = '&'.join(f'{name}={value}' for name, value in sorted(params))
+    return hashlib.sha1(f'{version_tag}|{path}?{normalized}'.encode('utf-8')).hexdigest()
+
+
+def is_not_modified(request, etag, changed_at):
+    """按If-None-Match（优先）或If-Modified-Since判断客户端缓存是否仍然有效"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since is not None:
+        # HTTP日期精确到秒
+        return int(changed_at) <= request.if_modified_since.timestamp()
+    return False
+
+
+def set_validators(response, etag, changed_at):
+    # 压缩后字节不同，使用弱ETag
+    response.set_etag(etag, weak=True)
+    response.headers['Last-Modified'] = http_date(changed_at)
+    # 允许浏览器缓存，但每次使用前须向服务器验证
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def choose_encoding(accept_encodings):
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response, accept_encodings, min_size=1024, level=6):
+    """压缩较大的JSON响应：客户端支持且安装了brotli时用br，否则用gzip（level为gzip压缩级别）"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None:
+        return response
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(body, compresslevel=level)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
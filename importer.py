@@ -0,0 +1,752 @@
+import codecs
+import csv
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import zipfile
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import tuple_, insert, select, delete, func
+from date_parser import make_column_date_parser
+
+# 写入inventory_data的字段，与Excel模板的列顺序一致
+RECORD_FIELDS = (
+    'date', 'sku', 'product_name', 'inbound_quantity', 'outbound_quantity',
+    'inventory_balance', 'supplier', 'operator', 'remarks'
+)
+
+DATE_FORMAT_ERROR = "日期格式错误，支持的格式包括：YYYY-MM-DD、YYYY/MM/DD、YYYY.MM.DD、YYYYMMDD、DD-MM-YYYY等"
+
+# 导入模式：reject-存在重复即整体失败，skip-跳过已存在的数据，overwrite-覆盖已存在的数据
+IMPORT_MODES = ('reject', 'skip', 'overwrite')
+
+
+def iter_excel_rows(filepath, sheet_name=None):
+    """以只读模式逐行读取Excel工作表（默认活动工作表，跳过标题行），内存占用与表格大小无关；
+    filepath也可以是已打开的二进制文件（如上传的文件流）"""
+    import openpyxl  # 只在导入Excel时加载，应用启动时不导入
+
+    workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.active
+        for row in sheet.iter_rows(min_row=2, values_only=True):
+            if row and row[0]:  # 如果第一列（日期）有值
+                yield row
+    finally:
+        # 只读模式会保持文件句柄，读取结束后必须关闭
+        workbook.close()
+
+
+def list_excel_sheets(filepath):
+    """返回工作簿中所有工作表的名称"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(filepath, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+
+# 识别CSV编码时读取的字节数
+CSV_SNIFF_BYTES = 64 * 1024
+# 依次尝试的CSV编码：UTF-8（可带BOM），否则按GB18030（兼容GBK，国内系统导出的CSV常用）
+CSV_ENCODINGS = ('utf-8-sig', 'gb18030')
+# 自动识别的CSV分隔符
+CSV_DELIMITERS = ',;\t'
+
+
+def _open_binary(source):
+    """source为文件路径时打开文件，返回(二进制文件, 是否需要由调用方关闭)"""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, 'rb'), True
+    return source, False
+
+
+def _readable_file(stream):
+    """Python 3.11之前SpooledTemporaryFile没有readable()等方法，不能直接用TextIOWrapper包装，
+    改为包装其内部文件（BytesIO或临时文件，读取位置相同）"""
+    if isinstance(stream, tempfile.SpooledTemporaryFile) and not hasattr(stream, 'readable'):
+        return stream._file
+    return stream
+
+
+def detect_csv_encoding(stream, encodings=CSV_ENCODINGS):
+    """根据文件开头的一段字节返回第一个能解码的编码，读取后回到文件开头；
+    标题行是中文列名，通常在这一段内就能区分UTF-8与GBK"""
+    sample = stream.read(CSV_SNIFF_BYTES)
+    stream.seek(0)
+    for encoding in encodings:
+        try:
+            # 样本末尾可能截断多字节字符，不要求解码完整
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f'无法识别CSV文件的编码，支持：{"、".join(encodings)}')
+
+
+def iter_csv_rows(source, encoding=None):
+    """逐行读取CSV（跳过标题行），列顺序与Excel模板相同；source为文件路径或已打开的二进制文件，
+    未指定编码时自动识别UTF-8/GBK，分隔符按标题行识别（逗号、分号或制表符）"""
+    stream, owned = _open_binary(source)
+    try:
+        encoding = encoding or detect_csv_encoding(stream)
+        text = io.TextIOWrapper(_readable_file(stream), encoding=encoding, newline='')
+        try:
+            header = text.readline()
+            try:
+                dialect = csv.Sniffer().sniff(header, delimiters=CSV_DELIMITERS)
+            except csv.Error:
+                dialect = csv.excel
+            for row in csv.reader(text, dialect):
+                if row and row[0].strip():  # 如果第一列（日期）有值
+                    yield row
+        finally:
+            # 不关闭调用方传入的文件
+            text.detach()
+    finally:
+        if owned:
+            stream.close()
+
+
+def iter_parquet_rows(source, batch_size=10000):
+    """按批读取Parquet文件，列按位置对应Excel模板；需要安装pyarrow，只在导入Parquet时加载"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError('导入Parquet文件需要安装pyarrow')
+
+    parquet_file = pq.ParquetFile(source)
+    try:
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            for row in zip(*(column.to_pylist() for column in batch.columns)):
+                if row[0]:
+                    yield row
+    finally:
+        parquet_file.close()
+
+
+# 单文件导入支持的格式：扩展名 -> 逐行读取函数（跳过标题行，按模板列顺序返回每行的值），
+# 各格式的数据都经过同一个 run_import（验证 → 查重 → 写入）
+ROW_READERS = {
+    'xlsx': iter_excel_rows,
+    'csv': iter_csv_rows,
+    'parquet': iter_parquet_rows,
+}
+
+
+def file_format(filename):
+    """按扩展名返回文件格式（小写，不含点）"""
+    return os.path.splitext(filename)[1][1:].lower()
+
+
+def iter_file_rows(source, fmt):
+    """按文件格式逐行读取，source为文件路径或已打开的二进制文件"""
+    if fmt not in ROW_READERS:
+        raise ValueError(f'文件格式不支持：{fmt}')
+    return ROW_READERS[fmt](source)
+
+def extract_zip_workbooks(zip_path, target_dir, max_size=None, max_entries=None):
+    """解压zip中的.xlsx文件到target_dir，返回[(文件名, 文件路径)]；
+    解压前按目录中记录的大小检查：条目数超过max_entries或.xlsx文件解压后总大小超过max_size（字节）时抛出ValueError，
+    不写入任何文件（读取时zipfile也不会解压出超过记录大小的数据）"""
+    sources = []
+    with zipfile.ZipFile(zip_path) as archive:
+        infos = archive.infolist()
+        if max_entries is not None and len(infos) > max_entries:
+            raise ValueError(f'压缩包中的文件不能超过{max_entries}个')
+        members = []
+        for index, info in enumerate(infos):
+            name = os.path.basename(info.filename)
+            if info.is_dir() or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+                continue
+            if not name.lower().endswith('.xlsx'):
+                continue
+            members.append((index, name, info))
+        if max_size is not None and sum(info.file_size for _, _, info in members) > max_size:
+            raise ValueError(f'压缩包解压后不能超过{max_size // (1024 * 1024)}MB')
+
+        for index, name, info in members:
+            # 只使用序号作为文件名，避免zip内路径穿越和重名覆盖
+            filepath = os.path.join(target_dir, f'zip_{index}.xlsx')
+            with archive.open(info) as src, open(filepath, 'wb') as dst:
+                while True:
+                    block = src.read(1024 * 1024)
+                    if not block:
+                        break
+                    dst.write(block)
+            sources.append((name, filepath))
+    return sources
+
+
+def iter_chunks(rows, chunk_size):
+    """将行迭代器按固定大小切分为批次"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class InventoryRecord(namedtuple('InventoryRecord', RECORD_FIELDS + ('row_no', 'raw_date'))):
+    """一行转换并验证后的数据，row_no/raw_date仅用于错误提示"""
+    __slots__ = ()
+
+    def to_params(self):
+        return dict(zip(RECORD_FIELDS, self))
+
+
+def _to_int(value):
+    # 空单元格按0处理
+    if value is None or value == '':
+        return 0
+    return int(value)
+
+
+def _to_text(value):
+    return str(value).strip() if value else None
+
+
+# 导入时检查长度的文本字段：字段名 -> 错误提示中的名称
+TEXT_FIELD_LABELS = {
+    'sku': 'SKU',
+    'product_name': '产品名称',
+    'supplier': '供应商',
+    'operator': '操作员',
+    'remarks': '备注',
+}
+
+
+def text_field_lengths(table, dimensions=None):
+    """按表结构取各文本字段的最大长度（字段名 -> 字符数），没有长度限制的列（Text）不检查；
+    dimensions为DimensionWriter时供应商名称与产品名称还写入维度表，取各表中较小的长度"""
+    tables = [table]
+    if dimensions is not None:
+        tables.append(dimensions.product_table)
+    lengths = {}
+    for name in TEXT_FIELD_LABELS:
+        columns = [t.c[name] for t in tables if t is not None and name in t.c]
+        if name == 'supplier' and dimensions is not None:
+            columns.append(dimensions.supplier_table.c.name)
+        limits = [column.type.length for column in columns if getattr(column.type, 'length', None)]
+        if limits:
+            lengths[name] = min(limits)
+    return lengths
+
+
+def convert_rows(rows, start_row, parse_date, max_lengths=None):
+    """一次遍历完成类型转换与验证，返回(InventoryRecord列表, 错误信息列表)；
+    max_lengths为text_field_lengths的结果，超长的文本报告为错误，而不是写入时被数据库截断或报错"""
+    records = []
+    errors = []
+    for row_no, row in enumerate(rows, start=start_row):
+        if len(row) < 2:  # 至少需要date和sku
+            errors.append(f"第{row_no}行：数据不完整，至少需要日期和SKU")
+            continue
+
+        row_errors = []
+        date = parse_date(row[0])
+        if not date:
+            row_errors.append(f"第{row_no}行：{DATE_FORMAT_ERROR}")
+
+        sku = str(row[1]).strip() if row[1] is not None else ''
+        if not sku:
+            row_errors.append(f"第{row_no}行：SKU不能为空")
+
+        quantities = []
+        for index, label in ((3, '入库数量'), (4, '出库数量'), (5, '库存余额')):
+            try:
+                quantities.append(_to_int(row[index]) if len(row) > index else 0)
+            except (ValueError, TypeError):
+                row_errors.append(f"第{row_no}行：{label}必须为整数")
+
+        if row_errors:
+            errors.extend(row_errors)
+            continue
+
+        record = InventoryRecord(
+            date, sku,
+            _to_text(row[2]) if len(row) > 2 else None,
+            quantities[0], quantities[1], quantities[2],
+            _to_text(row[6]) if len(row) > 6 else None,
+            _to_text(row[7]) if len(row) > 7 else None,
+            _to_text(row[8]) if len(row) > 8 else None,
+            row_no,
+            str(row[0]).strip()
+        )
+        if max_lengths:
+            row_errors = [
+                f"第{row_no}行：{TEXT_FIELD_LABELS[name]}长度不能超过{length}个字符"
+                for name, length in max_lengths.items()
+                if getattr(record, name) and len(getattr(record, name)) > length
+            ]
+            if row_errors:
+                errors.extend(row_errors)
+                continue
+        records.append(record)
+    return records, errors
+
+
+class DuplicateDetector:
+    """批量检测重复数据：文件内部重复 + 与数据库已有数据重复（uq_date_sku）"""
+
+    # 每个(date, sku)占用两个绑定参数，保持在SQLite默认的999个参数上限以内
+    QUERY_BATCH_SIZE = 400
+
+    def __init__(self, session, model):
+        self.session = session
+        self.model = model
+        self.seen = {}  # (date, sku) -> (首次出现的来源, 行号)
+
+    def check(self, records, check_database=True, source=None):
+        """records为InventoryRecord列表，source为多文件/多工作表导入时的来源名称，
+        返回(文件内重复, 数据库重复)描述列表"""
+        file_duplicates = []
+        new_keys = {}
+        for record in records:
+            row_no, date, sku, date_str = record.row_no, record.date, record.sku, record.raw_date
+            key = (date, sku)
+            first = self.seen.get(key)
+            if first is not None:
+                first_source, first_row = first
+                location = f"{first_source} " if first_source != source else ""
+                file_duplicates.append(f"第{row_no}行与{location}第{first_row}行重复（SKU: {sku}, 日期: {date_str}）")
+                continue
+            self.seen[key] = (source, row_no)
+            new_keys[key] = date_str
+
+        if not check_database:
+            return file_duplicates, []
+
+        db_duplicates = [
+            f"SKU: {sku}, 日期: {new_keys[(date, sku)]}"
+            for date, sku in self.find_existing(list(new_keys))
+        ]
+        return file_duplicates, db_duplicates
+
+    def find_existing(self, keys):
+        """用分批的 (date, sku) IN (...) 查询代替逐行SELECT，按输入顺序返回已存在的组合"""
+        existing = set()
+        for start in range(0, len(keys), self.QUERY_BATCH_SIZE):
+            batch = keys[start:start + self.QUERY_BATCH_SIZE]
+            rows = self.session.query(self.model.date, self.model.sku)\
+                .filter(tuple_(self.model.date, self.model.sku).in_(batch))\
+                .all()
+            existing.update((row.date, row.sku) for row in rows)
+        return [key for key in keys if key in existing]
+
+
+class BulkWriter:
+    """基于Core executemany的批量写入，按导入模式处理 uq_date_sku 冲突并记录每批耗时"""
+
+    CONFLICT_COLUMNS = ('date', 'sku')
+
+    def __init__(self, connection, table, mode='reject'):
+        if mode not in IMPORT_MODES:
+            raise ValueError(f'不支持的导入模式：{mode}')
+        self.connection = connection
+        self.table = table
+        self.mode = mode
+        self.statement = self._build_statement()
+        # MySQL跳过模式：连接启用了CLIENT.FOUND_ROWS，重复行也计入受影响行数，写入前先统计已存在的行数
+        self.count_existing = mode == 'skip' and connection.dialect.name == 'mysql'
+        self.chunk_stats = []
+        self.written_count = 0
+        self.skipped_count = 0
+
+    def _build_statement(self):
+        if self.mode == 'reject':
+            return insert(self.table)
+
+        # 方言模块在写入时才导入，不增加应用启动时间
+        from sqlalchemy.dialects import sqlite, mysql
+        dialect = self.connection.dialect.name
+        update_columns = [
+            column.name for column in self.table.columns
+            if column.name not in ('id', 'created_at') + self.CONFLICT_COLUMNS
+        ]
+        if dialect == 'sqlite':
+            stmt = sqlite.insert(self.table)
+            if self.mode == 'skip':
+                return stmt.on_conflict_do_nothing(index_elements=list(self.CONFLICT_COLUMNS))
+            values = {name: stmt.excluded[name] for name in update_columns}
+            values['updated_at'] = func.now()
+            return stmt.on_conflict_do_update(index_elements=list(self.CONFLICT_COLUMNS), set_=values)
+        if dialect == 'mysql':
+            stmt = mysql.insert(self.table)
+            if self.mode == 'skip':
+                # 用无操作的更新（id=id）只跳过唯一键冲突；INSERT IGNORE会把所有错误降为警告，
+                # 超长的文本被截断、超出范围的数值被截到边界后照常写入
+                return stmt.on_duplicate_key_update(id=self.table.c.id)
+            values = {name: stmt.inserted[name] for name in update_columns}
+            values['updated_at'] = func.now()
+            return stmt.on_duplicate_key_update(values)
+        raise ValueError(f'数据库类型 {dialect} 不支持导入模式：{self.mode}')
+
+    def write(self, records):
+        """写入一批记录（字典列表），返回受影响的行数"""
+        if not records:
+            return 0
+        started = time.perf_counter()
+        existing = self._count_existing(records) if self.count_existing else None
+        result = self.connection.execute(self.statement, records)
+        elapsed = time.perf_counter() - started
+
+        if existing is not None:
+            # 文件内的重复已在写入前拒绝，已存在的行即被跳过的行
+            written = len(records) - existing
+        elif self.mode == 'overwrite' or result.rowcount is None or result.rowcount < 0:
+            # MySQL的ON DUPLICATE KEY UPDATE对更新行计为2，覆盖模式下按处理行数统计
+            written = len(records)
+        else:
+            written = result.rowcount
+        if self.mode == 'skip':
+            self.skipped_count += len(records) - written
+        self.written_count += written
+        self.chunk_stats.append({
+            'chunk': len(self.chunk_stats) + 1,
+            'rows': len(records),
+            'written': written,
+            'seconds': round(elapsed, 4)
+        })
+        return written
+
+    def _count_existing(self, records):
+        """统计记录中 (date, sku) 已存在于表中的行数（uq_date_sku索引），分批查询"""
+        keys = [(record['date'], record['sku']) for record in records]
+        key_columns = tuple_(*(self.table.c[name] for name in self.CONFLICT_COLUMNS))
+        count = 0
+        for start in range(0, len(keys), DuplicateDetector.QUERY_BATCH_SIZE):
+            batch = keys[start:start + DuplicateDetector.QUERY_BATCH_SIZE]
+            count += self.connection.execute(
+                select(func.count()).select_from(self.table).where(key_columns.in_(batch))
+            ).scalar()
+        return count
+
+
+class DimensionWriter:
+    """导入时维护维度表：供应商名称换成suppliers表的整数键（新供应商先写入维度表），
+    SKU与最近导入的产品名称写入products表。已解析的供应商键在本次导入中缓存"""
+
+    QUERY_BATCH_SIZE = 500
+
+    def __init__(self, connection, supplier_table, product_table=None):
+        self.connection = connection
+        self.supplier_table = supplier_table
+        self.product_table = product_table
+        self.supplier_ids = {}  # 供应商名称 -> id
+        self.product_statement = self._build_product_statement() if product_table is not None else None
+
+    def _build_product_statement(self):
+        from sqlalchemy.dialects import sqlite, mysql
+        table = self.product_table
+        dialect = self.connection.dialect.name
+        # 新文件中产品名称为空时保留已有名称
+        if dialect == 'sqlite':
+            stmt = sqlite.insert(table)
+            return stmt.on_conflict_do_update(index_elements=['sku'], set_={
+                'product_name': func.coalesce(stmt.excluded.product_name, table.c.product_name),
+                'updated_at': func.now()
+            })
+        if dialect == 'mysql':
+            stmt = mysql.insert(table)
+            return stmt.on_duplicate_key_update(
+                product_name=func.coalesce(stmt.inserted.product_name, table.c.product_name),
+                updated_at=func.now()
+            )
+        raise ValueError(f'数据库类型 {dialect} 不支持维护产品维度表')
+
+    def _insert_suppliers_statement(self):
+        from sqlalchemy.dialects import sqlite, mysql
+        table = self.supplier_table
+        dialect = self.connection.dialect.name
+        # 并发导入可能同时新建同一个供应商，名称冲突时忽略，随后重新查询id
+        if dialect == 'sqlite':
+            return sqlite.insert(table).on_conflict_do_nothing(index_elements=['name'])
+        if dialect == 'mysql':
+            return mysql.insert(table).on_duplicate_key_update(id=table.c.id)
+        return insert(table)
+
+    def _load_suppliers(self, names):
+        table = self.supplier_table
+        names = list(names)
+        for start in range(0, len(names), self.QUERY_BATCH_SIZE):
+            batch = names[start:start + self.QUERY_BATCH_SIZE]
+            rows = self.connection.execute(
+                select(table.c.name, table.c.id).where(table.c.name.in_(batch))
+            )
+            self.supplier_ids.update((row.name, row.id) for row in rows)
+
+    def resolve_suppliers(self, names):
+        """返回{供应商名称: id}，不存在的供应商先写入维度表；空名称不对应任何供应商"""
+        names = {name for name in names if name}
+        missing = names - self.supplier_ids.keys()
+        if missing:
+            self._load_suppliers(missing)
+            new_names = sorted(missing - self.supplier_ids.keys())
+            if new_names:
+                self.connection.execute(self._insert_suppliers_statement(),
+                                        [{'name': name} for name in new_names])
+                self._load_suppliers(new_names)
+        return {name: self.supplier_ids[name] for name in names}
+
+    def apply(self, records):
+        """维护维度表，返回写入明细表的参数列表（supplier换成supplier_id）"""
+        self.resolve_suppliers(record.supplier for record in records)
+        params = []
+        for record in records:
+            values = record.to_params()
+            values['supplier_id'] = self.supplier_ids.get(values.pop('supplier'))
+            params.append(values)
+
+        if self.product_statement is not None and records:
+            # 同一批次中同一SKU出现多次时，以最后一个非空的产品名称为准
+            products = {}
+            for record in records:
+                if record.product_name or record.sku not in products:
+                    products[record.sku] = record.product_name
+            self.connection.execute(self.product_statement, [
+                {'sku': sku, 'product_name': name} for sku, name in products.items()
+            ])
+        return params
+
+
+class ImportProgress:
+    """导入进度计数，供后台任务轮询（各计数只由执行导入的线程写入）"""
+
+    def __init__(self):
+        self.rows_parsed = 0
+        self.rows_validated = 0
+        self.rows_written = 0
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def finish(self):
+        self.finished_at = time.time()
+
+    def to_dict(self):
+        elapsed = max((self.finished_at or time.time()) - self.started_at, 1e-6)
+        return {
+            'rows_parsed': self.rows_parsed,
+            'rows_validated': self.rows_validated,
+            'rows_written': self.rows_written,
+            'rows_per_second': round(self.rows_parsed / elapsed, 1)
+        }
+
+
+class ImportResult:
+    """一次导入的结果：验证错误、重复数据以及写入统计"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.validation_errors = []
+        self.file_duplicates = []
+        self.db_duplicates = []
+        # 写入过数据的日期，供提交前刷新汇总表
+        self.affected_dates = set()
+
+    @property
+    def ok(self):
+        return not (self.validation_errors or self.file_duplicates or self.db_duplicates)
+
+
+def to_write_params(records, dimensions, batch_id=None):
+    """生成一批记录的写入参数；指定了维度表时供应商名称换成整数键，指定了导入批次时每行记录batch_id"""
+    if dimensions is None:
+        params = [record.to_params() for record in records]
+    else:
+        params = dimensions.apply(records)
+    if batch_id is not None:
+        for values in params:
+            values['batch_id'] = batch_id
+    return params
+
+
+def rollback_batch(connection, table, batch_id):
+    """删除一个导入批次写入的全部明细行（按batch_id索引定位），返回(删除的行数, 受影响的日期)，不提交事务。
+    覆盖模式下被该批次更新的行同样属于该批次，会被删除而不是恢复为更新前的值，因此调用方不应撤销覆盖模式的批次"""
+    dates = set(connection.execute(
+        select(table.c.date).where(table.c.batch_id == batch_id).distinct()
+    ).scalars())
+    deleted = connection.execute(delete(table).where(table.c.batch_id == batch_id)).rowcount
+    return deleted, dates
+
+
+def run_import(rows, session, model, mode='reject', chunk_size=1000, sample_rows=100, progress=None,
+               dimensions=None, batch_id=None):
+    """流式导入：按批次完成 转换验证 → 查重 → 写入，不提交事务，由调用方根据结果提交或回滚。
+    dimensions为DimensionWriter时，写入明细前先维护供应商/产品维度表；batch_id为导入批次，写入的每行都记录该批次"""
+    progress = progress or ImportProgress()
+    duplicate_detector = DuplicateDetector(session, model)
+    # 与会话共用同一连接和事务，导入失败时整体回滚
+    result = ImportResult(BulkWriter(session.connection(), model.__table__, mode))
+    max_lengths = text_field_lengths(model.__table__, dimensions)
+    next_row = 2  # 第1行是标题
+    parse_date = None
+
+    for chunk in iter_chunks(rows, chunk_size):
+        chunk_start = next_row
+        next_row += len(chunk)
+        progress.rows_parsed += len(chunk)
+
+        if parse_date is None:
+            # 根据首批数据推断日期列的主要格式，之后整列按固定格式解析
+            parse_date = make_column_date_parser([row[0] for row in chunk[:sample_rows]])
+
+        # 一次遍历完成类型转换与验证
+        records, errors = convert_rows(chunk, chunk_start, parse_date, max_lengths)
+        result.validation_errors.extend(errors)
+        progress.rows_validated += len(chunk)
+        if result.validation_errors:
+            # 已有错误时不再写入，只继续验证以便一次性返回全部错误
+            continue
+
+        # 检查重复数据（文件内重复 + 数据库已存在），每批只需少量查询
+        # skip/overwrite模式由写入层处理与数据库的冲突，只需检查文件内重复
+        file_duplicates, db_duplicates = duplicate_detector.check(
+            records, check_database=(mode == 'reject'))
+        result.file_duplicates.extend(file_duplicates)
+        result.db_duplicates.extend(db_duplicates)
+        if not result.ok:
+            continue
+
+        # 每批通过executemany批量写入，整个导入仍在同一事务中
+        result.writer.write(to_write_params(records, dimensions, batch_id))
+        result.affected_dates.update(record.date for record in records)
+        progress.rows_written = result.writer.written_count
+
+    progress.finish()
+    return result
+
+
+def iter_sheet_chunks(filepath, sheet_name, chunk_size=1000, sample_rows=100, max_lengths=None):
+    """流式读取并转换单个工作表，逐批产出(行数, InventoryRecord列表, 错误信息列表)，只持有一批数据；
+    日期列格式按首批数据推断，max_lengths见convert_rows"""
+    parse_date = None
+    next_row = 2  # 第1行是标题
+    for chunk in iter_chunks(iter_excel_rows(filepath, sheet_name), chunk_size):
+        if parse_date is None:
+            parse_date = make_column_date_parser([row[0] for row in chunk[:sample_rows]])
+        records, errors = convert_rows(chunk, next_row, parse_date, max_lengths)
+        next_row += len(chunk)
+        yield len(chunk), records, errors
+
+
+def parse_sheet(filepath, sheet_name, sample_rows=100, chunk_size=1000, spool_dir=None, max_lengths=None):
+    """在子进程中解析并转换单个工作表：每批转换结果依次用pickle写入spool_dir中的临时文件，返回文件路径。
+    子进程与主进程（通过load_sheet_chunks逐批读回）都只持有一批数据，内存占用与工作表大小无关"""
+    fd, path = tempfile.mkstemp(suffix='.chunks', dir=spool_dir)
+    with os.fdopen(fd, 'wb') as f:
+        for chunk in iter_sheet_chunks(filepath, sheet_name, chunk_size, sample_rows, max_lengths):
+            pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def load_sheet_chunks(path):
+    """逐批读回parse_sheet写入的转换结果，读完后删除临时文件"""
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+    finally:
+        os.remove(path)
+
+
+class BatchImportResult(ImportResult):
+    """多文件/多工作表导入的结果，sheets中保存每个工作表的错误报告"""
+
+    def __init__(self, writer):
+        super().__init__(writer)
+        self.sheets = []
+
+
+def run_batch_import(sources, session, model, mode='reject', chunk_size=1000, sample_rows=100,
+                     processes=1, progress=None, dimensions=None, batch_id=None):
+    """导入多个文件的全部工作表：工作表在进程池中并行解析（解析XLSX受GIL限制），
+    结果按工作表顺序逐批经同一个查重器和批量写入器合并，内存中只保留一批数据。sources为[(文件名, 文件路径)]，不提交事务；
+    全部工作表属于同一个导入批次batch_id"""
+    progress = progress or ImportProgress()
+    duplicate_detector = DuplicateDetector(session, model)
+    result = BatchImportResult(BulkWriter(session.connection(), model.__table__, mode))
+    max_lengths = text_field_lengths(model.__table__, dimensions)
+
+    tasks = [
+        (filename, filepath, sheet_name)
+        for filename, filepath in sources
+        for sheet_name in list_excel_sheets(filepath)
+    ]
+    spool_dir = None
+    if processes > 1 and len(tasks) > 1:
+        # 使用spawn启动子进程，避免在多线程的Web进程中fork；子进程把转换结果写入临时文件，
+        # 主进程按工作表顺序逐批读回，不会同时持有多个工作表的数据
+        spool_dir = tempfile.mkdtemp(prefix='batch-import-')
+        executor = ProcessPoolExecutor(
+            max_workers=min(processes, len(tasks)),
+            mp_context=multiprocessing.get_context('spawn')
+        )
+        paths = executor.map(parse_sheet, [t[1] for t in tasks], [t[2] for t in tasks],
+                             [sample_rows] * len(tasks), [chunk_size] * len(tasks), [spool_dir] * len(tasks),
+                             [max_lengths] * len(tasks))
+        parsed = (load_sheet_chunks(path) for path in paths)
+    else:
+        executor = None
+        parsed = (iter_sheet_chunks(filepath, sheet_name, chunk_size, sample_rows, max_lengths)
+                  for _, filepath, sheet_name in tasks)
+
+    try:
+        for (filename, _, sheet_name), chunks in zip(tasks, parsed):
+            source = f"{filename}/{sheet_name}"
+            report = {
+                'file': filename,
+                'sheet': sheet_name,
+                'rows': 0,
+                'errors': [],
+                'file_duplicates': [],
+                'db_duplicates': [],
+                'written': 0
+            }
+            result.sheets.append(report)
+            written_before = result.writer.written_count
+
+            for row_count, records, errors in chunks:
+                report['rows'] += row_count
+                report['errors'].extend(errors)
+                progress.rows_parsed += row_count
+                progress.rows_validated += row_count
+                result.validation_errors.extend(f"{source}：{error}" for error in errors)
+                if result.validation_errors:
+                    # 已有错误时不再写入，只继续验证以便一次性返回全部错误
+                    continue
+
+                file_duplicates, db_duplicates = duplicate_detector.check(
+                    records, check_database=(mode == 'reject'), source=source)
+                report['file_duplicates'].extend(file_duplicates)
+                report['db_duplicates'].extend(db_duplicates)
+                result.file_duplicates.extend(f"{source}：{item}" for item in file_duplicates)
+                result.db_duplicates.extend(f"{source}：{item}" for item in db_duplicates)
+                if not result.ok:
+                    continue
+                result.writer.write(to_write_params(records, dimensions, batch_id))
+                result.affected_dates.update(record.date for record in records)
+                progress.rows_written = result.writer.written_count
+            report['written'] = result.writer.written_count - written_before
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if spool_dir is not None:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+
+    progress.finish()
+    return result
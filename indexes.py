@@ -0,0 +1,95 @@
+import re
+from sqlalchemy import inspect
+
+# EXPLAIN结果分类：search（按索引定位）、index_scan（按索引顺序遍历，配合LIMIT可提前结束）、full_scan（全表扫描）
+SEARCH = 'search'
+INDEX_SCAN = 'index_scan'
+FULL_SCAN = 'full_scan'
+
+_SQLITE_FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+def find_missing_indexes(connection, table):
+    """模型中声明但数据库中不存在的索引"""
+    existing = {index['name'] for index in inspect(connection).get_indexes(table.name)}
+    return sorted((index for index in table.indexes if index.name not in existing), key=lambda index: index.name)
+
+
+def find_obsolete_indexes(connection, table, keep=()):
+    """数据库中存在但模型未声明的索引（例如旧版本的单列索引或init_db.py创建的索引），
+    唯一约束对应的索引和keep中的索引（如全文索引）除外"""
+    declared = {index.name for index in table.indexes}
+    declared |= {constraint.name for constraint in table.constraints if constraint.name}
+    declared |= set(keep)
+    existing = {index['name'] for index in inspect(connection).get_indexes(table.name)}
+    return sorted(existing - declared)
+
+
+def ensure_indexes(connection, table, drop_obsolete=False, keep=()):
+    """创建缺少的索引；drop_obsolete=True时删除模型未声明的索引。返回(新建的索引名, 删除的索引名)。
+    索引的列在数据库中还不存在时跳过，由添加该列的迁移脚本（如migrate_import_batches.py）创建"""
+    columns = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    created = []
+    for index in find_missing_indexes(connection, table):
+        if not {column.name for column in index.columns} <= columns:
+            continue
+        index.create(connection)
+        created.append(index.name)
+
+    dropped = []
+    if drop_obsolete:
+        quote = connection.dialect.identifier_preparer.quote
+        for name in find_obsolete_indexes(connection, table, keep):
+            if connection.dialect.name == 'mysql':
+                connection.exec_driver_sql(f'DROP INDEX {quote(name)} ON {quote(table.name)}')
+            else:
+                connection.exec_driver_sql(f'DROP INDEX {quote(name)}')
+            dropped.append(name)
+    return created, dropped
+
+
+def explain(connection, statement):
+    """对查询执行EXPLAIN，返回(分类, 执行计划文本列表)；不支持的数据库返回(None, [])"""
+    dialect = connection.dialect.name
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    if dialect == 'sqlite':
+        details = [row[3] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql)]
+        return classify_sqlite_plan(details), details
+    if dialect == 'mysql':
+        rows = [dict(row._mapping) for row in connection.exec_driver_sql('EXPLAIN ' + sql)]
+        details = [f"{row['table']}: type={row['type']} key={row['key']} extra={row.get('Extra')}" for row in rows]
+        return classify_mysql_plan(rows), details
+    return None, []
+
+
+def classify_sqlite_plan(details):
+    kinds = set()
+    for detail in details:
+        if _SQLITE_FULL_SCAN.match(detail):
+            kinds.add(FULL_SCAN)
+        elif detail.startswith('SCAN') and ('USING' in detail or 'VIRTUAL TABLE INDEX' in detail):
+            kinds.add(INDEX_SCAN)
+        elif detail.startswith('SEARCH'):
+            kinds.add(SEARCH)
+    return _worst(kinds)
+
+
+def classify_mysql_plan(rows):
+    kinds = set()
+    for row in rows:
+        if row.get('table') is None:
+            continue
+        if row['type'] == 'ALL':
+            kinds.add(FULL_SCAN)
+        elif row['type'] == 'index':
+            kinds.add(INDEX_SCAN)
+        else:
+            kinds.add(SEARCH)
+    return _worst(kinds)
+
+
+def _worst(kinds):
+    for kind in (FULL_SCAN, INDEX_SCAN, SEARCH):
+        if kind in kinds:
+            return kind
+    return SEARCH
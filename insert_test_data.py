@@ -1,6 +1,9 @@
-from app import app, db, InventoryData
+from app import create_app, db, InventoryData, InventoryDailySupplier, make_dimension_writer, bump_data_version
+from rollup import refresh_daily_rollup
 import datetime
 
+app = create_app()
+
 def insert_test_data():
     with app.app_context():
         # 创建测试数据
@@ -40,11 +43,21 @@ def insert_test_data():
             }
         ]
         
+        # 供应商名称换成维度表中的id（不存在时新建）
+        supplier_ids = make_dimension_writer().resolve_suppliers(data['supplier'] for data in test_data)
+        
         # 插入数据
         for data in test_data:
+            data['supplier_id'] = supplier_ids.get(data.pop('supplier'))
             record = InventoryData(**data)
             db.session.add(record)
         
+        # 同步刷新图表汇总表
+        db.session.flush()
+        refresh_daily_rollup(db.session.connection(), InventoryData.__table__,
+                             InventoryDailySupplier.__table__, {data['date'] for data in test_data})
+        # 与导入相同，更新数据版本使各进程缓存的查询结果失效
+        bump_data_version()
         db.session.commit()
         print(f"成功插入{len(test_data)}条测试数据")
 
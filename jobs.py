@@ -0,0 +1,85 @@
+import threading
+import uuid
+import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from importer import ImportProgress
+
+
+class ImportJob:
+    """后台导入任务的状态：pending → running → succeeded / failed"""
+
+    def __init__(self, filename, mode):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.mode = mode
+        self.status = 'pending'
+        self.progress = ImportProgress()
+        self.result = None
+        self.created_at = datetime.datetime.now()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        def fmt(value):
+            return value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'mode': self.mode,
+            'status': self.status,
+            'progress': self.progress.to_dict() if self.started_at else None,
+            'result': self.result,
+            'created_at': fmt(self.created_at),
+            'started_at': fmt(self.started_at),
+            'finished_at': fmt(self.finished_at)
+        }
+
+
+class JobManager:
+    """使用线程池执行导入任务，并保留最近的任务记录供进度查询"""
+
+    def __init__(self, max_workers=2, history_size=100):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='import-job')
+        self.history_size = history_size
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, job, func, *args):
+        """提交任务，func返回(响应数据, 状态码)，状态码200视为成功"""
+        with self.lock:
+            self.jobs[job.id] = job
+            self._trim()
+        self.executor.submit(self._run, job, func, *args)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return list(reversed(self.jobs.values()))
+
+    def _trim(self):
+        # 超出保留数量时优先丢弃最早的已结束任务
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.history_size:
+                break
+            if self.jobs[job_id].status in ('succeeded', 'failed'):
+                del self.jobs[job_id]
+
+    def _run(self, job, func, *args):
+        job.status = 'running'
+        job.progress = ImportProgress()
+        job.started_at = datetime.datetime.now()
+        try:
+            payload, status = func(*args)
+            job.result = payload
+            job.status = 'succeeded' if status == 200 else 'failed'
+        except Exception as e:
+            job.result = {'code': 500, 'message': f'导入失败：{str(e)}'}
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.datetime.now()
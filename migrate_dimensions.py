@@ -0,0 +1,105 @@
+from app import create_app, db, InventoryData, InventoryDailySupplier, Supplier, Product, DataVersion, bump_data_version
+from indexes import ensure_indexes
+from rollup import rebuild_daily_rollup
+from search import MYSQL_FULLTEXT_INDEX
+from sqlalchemy import inspect
+import sys
+
+app = create_app()
+
+# 将旧版本的 inventory_data.supplier（供应商名称）迁移为 suppliers 维度表 + supplier_id，
+# 并从明细数据回填 products 维度表。可以重复执行，已迁移的步骤会跳过
+
+
+def column_names(connection, table_name):
+    return {column['name'] for column in inspect(connection).get_columns(table_name)}
+
+
+def migrate_fact_suppliers(connection):
+    """明细表的供应商名称换成supplier_id，返回迁移的供应商数；已迁移时返回None"""
+    columns = column_names(connection, InventoryData.__tablename__)
+    if 'supplier' not in columns:
+        return None
+
+    connection.exec_driver_sql(
+        "INSERT INTO suppliers (name) "
+        "SELECT DISTINCT supplier FROM inventory_data "
+        "WHERE supplier IS NOT NULL AND supplier != '' "
+        "AND supplier NOT IN (SELECT name FROM suppliers)"
+    )
+    if 'supplier_id' not in columns:
+        # 已有表只能追加普通整数列，外键约束只存在于新建的表中
+        connection.exec_driver_sql('ALTER TABLE inventory_data ADD COLUMN supplier_id INTEGER')
+    connection.exec_driver_sql(
+        "UPDATE inventory_data SET supplier_id = "
+        "(SELECT id FROM suppliers WHERE suppliers.name = inventory_data.supplier)"
+    )
+
+    # 删除引用旧列的索引后才能删除列，新的索引由ensure_indexes按模型创建
+    quote = connection.dialect.identifier_preparer.quote
+    for index in inspect(connection).get_indexes(InventoryData.__tablename__):
+        if 'supplier' in index['column_names']:
+            if connection.dialect.name == 'mysql':
+                connection.exec_driver_sql(f"DROP INDEX {quote(index['name'])} ON inventory_data")
+            else:
+                connection.exec_driver_sql(f"DROP INDEX {quote(index['name'])}")
+    connection.exec_driver_sql('ALTER TABLE inventory_data DROP COLUMN supplier')
+    return connection.exec_driver_sql('SELECT COUNT(*) FROM suppliers').scalar()
+
+
+def backfill_products(connection):
+    """每个SKU取最近导入（id最大）的一行作为产品名称，已存在的SKU不覆盖"""
+    return connection.exec_driver_sql(
+        "INSERT INTO products (sku, product_name, updated_at) "
+        "SELECT sku, product_name, CURRENT_TIMESTAMP FROM inventory_data "
+        "WHERE id IN (SELECT MAX(id) FROM inventory_data GROUP BY sku) "
+        "AND sku NOT IN (SELECT sku FROM products)"
+    ).rowcount
+
+
+def migrate_rollup(connection):
+    """汇总表按供应商名称汇总的旧版本直接重建（汇总表可以随时从明细表重新计算）"""
+    table = InventoryDailySupplier.__table__
+    if inspect(connection).has_table(table.name) and 'supplier_id' not in column_names(connection, table.name):
+        table.drop(connection)
+    table.create(connection, checkfirst=True)
+    rebuild_daily_rollup(connection, InventoryData.__table__, table)
+
+
+def migrate():
+    with app.app_context():
+        try:
+            connection = db.session.connection()
+            if not inspect(connection).has_table(InventoryData.__tablename__):
+                print("inventory_data 表不存在，请先执行 python init_db.py")
+                sys.exit(1)
+            for table in (Supplier.__table__, Product.__table__, DataVersion.__table__):
+                table.create(connection, checkfirst=True)
+
+            supplier_count = migrate_fact_suppliers(connection)
+            if supplier_count is None:
+                print("inventory_data 已使用 supplier_id，跳过供应商迁移")
+            else:
+                print(f"供应商迁移完成，共{supplier_count}个供应商")
+
+            print(f"产品维度表新增{backfill_products(connection)}个SKU")
+
+            created, _ = ensure_indexes(connection, InventoryData.__table__, keep=(MYSQL_FULLTEXT_INDEX,))
+            print(f"inventory_data 新建索引 {created or '无'}")
+
+            migrate_rollup(connection)
+            # 查询结果的供应商来自维度表，各进程缓存的结果随版本失效
+            bump_data_version(connection)
+            db.session.commit()
+            print("图表汇总表已按 supplier_id 重建")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"维度表迁移失败: {str(e)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    print("开始迁移供应商/产品维度表...")
+    migrate()
+    print("迁移完成！")
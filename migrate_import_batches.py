@@ -0,0 +1,50 @@
+from app import create_app, db, InventoryData, ImportBatch
+from indexes import ensure_indexes
+from search import MYSQL_FULLTEXT_INDEX
+from sqlalchemy import inspect
+import sys
+
+app = create_app()
+
+# 为已有数据库创建 import_batches 表，并给 inventory_data 追加 batch_id 列及索引。
+# 迁移前导入的数据batch_id为空，不属于任何批次，不能按批次撤销。可以重复执行，已迁移的步骤会跳过
+
+
+def add_batch_column(connection):
+    """追加batch_id列，已存在时返回False"""
+    columns = {column['name'] for column in inspect(connection).get_columns(InventoryData.__tablename__)}
+    if 'batch_id' in columns:
+        return False
+    # 已有表只能追加普通整数列，外键约束只存在于新建的表中
+    connection.exec_driver_sql('ALTER TABLE inventory_data ADD COLUMN batch_id INTEGER')
+    return True
+
+
+def migrate():
+    with app.app_context():
+        try:
+            connection = db.session.connection()
+            if not inspect(connection).has_table(InventoryData.__tablename__):
+                print("inventory_data 表不存在，请先执行 python init_db.py")
+                sys.exit(1)
+            ImportBatch.__table__.create(connection, checkfirst=True)
+
+            if add_batch_column(connection):
+                print("inventory_data 已追加 batch_id 列")
+            else:
+                print("inventory_data 已有 batch_id 列，跳过")
+
+            created, _ = ensure_indexes(connection, InventoryData.__table__, keep=(MYSQL_FULLTEXT_INDEX,))
+            print(f"inventory_data 新建索引 {created or '无'}")
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"导入批次迁移失败: {str(e)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    print("开始迁移导入批次表...")
+    migrate()
+    print("迁移完成！")
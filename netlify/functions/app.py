@@ -5,9 +5,16 @@ from serverless_wsgi import handle_request
 # 将项目根目录添加到 Python 路径，确保可以导入你的 Flask app
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-# 从你的主应用文件中导入 Flask 应用对象
-from app import app
+# 函数实例处理完请求后可能被冻结或回收：不保留数据库连接（NullPool），上传文件写入唯一可写的/tmp
+os.environ.setdefault('DB_POOL_MODE', 'null')
+os.environ.setdefault('UPLOAD_FOLDER', '/tmp/uploads')
+
+# 从你的主应用文件中导入应用工厂；导入时不加载openpyxl、不连接数据库
+from app import create_app
+
+# 每个函数实例只创建一次应用，之后的调用复用
+app = create_app()
 
 def handler(event, context):
     """ Netlify Function 的入口处理程序 """
-    return handle_request(app, event, context)
\ No newline at end of file
+    return handle_request(app, event, context)
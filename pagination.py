@@ -0,0 +1,19 @@
+import base64
+import datetime
+import json
+
+
+def encode_cursor(date, record_id):
+    """把最后一行的(date, id)编码为不透明的分页游标"""
+    payload = json.dumps({'d': date.isoformat(), 'i': record_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """解析分页游标，返回(date, id)；游标无效时抛出ValueError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.date.fromisoformat(payload['d']), int(payload['i'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError('无效的分页游标') from e
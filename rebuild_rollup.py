@@ -0,0 +1,31 @@
+from app import create_app, db, InventoryData, InventoryDailySupplier, DataVersion, bump_data_version
+from rollup import rebuild_daily_rollup
+import sys
+
+app = create_app()
+
+def rebuild_rollup():
+    with app.app_context():
+        try:
+            # 确保汇总表存在
+            InventoryDailySupplier.__table__.create(db.engine, checkfirst=True)
+            
+            DataVersion.__table__.create(db.engine, checkfirst=True)
+            
+            rebuild_daily_rollup(db.session.connection(), InventoryData.__table__,
+                                 InventoryDailySupplier.__table__)
+            # 图表数据可能变化，各进程缓存的结果随版本失效
+            bump_data_version()
+            db.session.commit()
+            
+            count = InventoryDailySupplier.query.count()
+            print(f"汇总表重建完成，共{count}条 日期×供应商 汇总记录")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"汇总表重建失败: {str(e)}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    print("开始重建图表汇总表...")
+    rebuild_rollup()
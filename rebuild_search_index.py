@@ -0,0 +1,24 @@
+from app import create_app, db
+from search import install_search_index
+import sys
+
+app = create_app()
+
+def rebuild_search_index():
+    with app.app_context():
+        try:
+            # 已有数据库中创建产品名称全文索引（及同步触发器）并回填
+            if not install_search_index(db.session.connection()):
+                print(f"当前数据库（{db.engine.dialect.name}）不支持全文索引，product_name_like 将使用LIKE查询")
+                return
+            db.session.commit()
+            print("产品名称全文索引已创建并回填，重启应用后生效")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"全文索引创建失败: {str(e)}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    print("开始创建产品名称全文索引...")
+    rebuild_search_index()
@@ -1,6 +1,8 @@
-from app import app, db, InventoryData
+from app import create_app, db, InventoryData
 import sys
 
+app = create_app()
+
 def recreate_database():
     with app.app_context():
         try:
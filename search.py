@@ -0,0 +1,101 @@
+import threading
+from sqlalchemy import DDL, event, text, and_, Integer
+from sqlalchemy.sql import column
+
+# SQLite：外部内容FTS5表，trigram分词支持任意子串（含中文）匹配，由触发器与inventory_data保持同步
+FTS_TABLE = 'inventory_product_fts'
+SQLITE_SEARCH_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"product_name, content='inventory_data', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON inventory_data BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, product_name) VALUES (new.id, new.product_name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON inventory_data BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, product_name) VALUES ('delete', old.id, old.product_name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF product_name ON inventory_data BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, product_name) VALUES ('delete', old.id, old.product_name); "
+    f"INSERT INTO {FTS_TABLE}(rowid, product_name) VALUES (new.id, new.product_name); END",
+]
+
+# MySQL：InnoDB全文索引使用ngram解析器（支持中文），由数据库自动维护
+MYSQL_FULLTEXT_INDEX = 'ft_product_name'
+MYSQL_SEARCH_DDL = f'ALTER TABLE inventory_data ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} (product_name) WITH PARSER ngram'
+
+# 少于该长度的搜索词无法使用索引（trigram为3个字符，ngram_token_size默认为2），回退到LIKE
+MIN_TERM_LENGTH = {'sqlite': 3, 'mysql': 2}
+
+
+def register_search_index(table):
+    """让产品名称全文索引随inventory_data表一起创建和删除（db.create_all / drop_all）"""
+    for statement in SQLITE_SEARCH_DDL:
+        event.listen(table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+    event.listen(table, 'before_drop', DDL(f'DROP TABLE IF EXISTS {FTS_TABLE}').execute_if(dialect='sqlite'))
+    event.listen(table, 'after_create', DDL(MYSQL_SEARCH_DDL).execute_if(dialect='mysql'))
+
+
+def search_index_exists(connection):
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        return connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+        ), {'name': FTS_TABLE}).first() is not None
+    if dialect == 'mysql':
+        return connection.execute(text(
+            "SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() "
+            "AND table_name = 'inventory_data' AND index_name = :name"
+        ), {'name': MYSQL_FULLTEXT_INDEX}).first() is not None
+    return False
+
+
+def install_search_index(connection):
+    """为已有数据库创建全文索引并回填，返回是否支持当前数据库"""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+        # 外部内容表从inventory_data重建索引
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        return True
+    if dialect == 'mysql':
+        if not search_index_exists(connection):
+            connection.execute(text(MYSQL_SEARCH_DDL))
+        return True
+    return False
+
+
+def _phrase(term):
+    # 作为短语查询，双引号按FTS语法转义
+    return '"' + term.replace('"', '""') + '"'
+
+
+class ProductNameSearch:
+    """product_name_like 的查询条件：有全文索引时先用索引筛选候选行，再用LIKE校验，
+    结果与单独使用LIKE完全一致；索引不存在、数据库不支持、搜索词过短或包含通配符时直接使用LIKE"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.available = None
+        self.lock = threading.Lock()
+
+    def is_available(self, engine):
+        # 每个进程只检查一次；运行中新建索引后需重启应用才会使用
+        if self.available is None:
+            with self.lock:
+                if self.available is None:
+                    with engine.connect() as connection:
+                        self.available = search_index_exists(connection)
+        return self.available
+
+    def condition(self, id_column, name_column, term, engine):
+        like = name_column.like(f'%{term}%')
+        dialect = engine.dialect.name
+        if (not self.enabled or '%' in term or '_' in term
+                or len(term) < MIN_TERM_LENGTH.get(dialect, float('inf'))
+                or not self.is_available(engine)):
+            return like
+        if dialect == 'sqlite':
+            matched = text(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :product_name_query'
+            ).bindparams(product_name_query=_phrase(term)).columns(column('rowid', Integer))
+            return and_(id_column.in_(matched), like)
+        # MySQL上渲染为 MATCH (product_name) AGAINST (... IN BOOLEAN MODE)
+        return and_(name_column.match(_phrase(term)), like)
@@ -0,0 +1,65 @@
+import datetime
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时使用Flask默认的JSON编码
+    orjson = None
+
+
+def _format_date(value):
+    return value.isoformat() if value else None
+
+
+def _format_datetime(value):
+    return value.isoformat(sep=' ', timespec='seconds') if value else None
+
+
+def _identity(value):
+    return value
+
+
+def make_row_serializer(fields, columns):
+    """为列投影查询生成行序列化函数：columns为查询的列，fields为输出的字段（columns的前缀），
+    日期格式化函数按列类型预先确定，序列化时只做一次遍历"""
+    formatters = []
+    for column in columns[:len(fields)]:
+        python_type = column.type.python_type
+        if python_type is datetime.datetime:
+            formatters.append(_format_datetime)
+        elif python_type is datetime.date:
+            formatters.append(_format_date)
+        else:
+            formatters.append(_identity)
+    plan = list(zip(range(len(fields)), fields, formatters))
+
+    def serialize(row):
+        return {name: fmt(row[index]) for index, name, fmt in plan}
+
+    return serialize
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """使用orjson编码JSON响应，对不支持的类型回退到Flask默认实现"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """配置启用且安装了orjson时，替换应用的JSON编码器"""
+    if app.config.get('USE_FAST_JSON') and orjson is not None:
+        app.json = FastJSONProvider(app)
@@ -1,6 +1,9 @@
 // 全局变量
 let currentPage = 1;
 let currentFilters = {};
+// 游标分页：pageCursors[i] 为加载第 i+1 页所用的游标（第1页为null）
+let pageCursors = [null];
+let totalItems = null;
 let chart = null;
 
 // 页面加载完成后初始化
@@ -12,6 +15,7 @@ document.addEventListener('DOMContentLoaded', function() {
     document.getElementById('filterForm').addEventListener('submit', function(e) {
         e.preventDefault();
         currentPage = 1;
+        pageCursors = [null];
         currentFilters = getFormData();
         loadData();
         // 如果图表正在显示，也更新图表数据
@@ -25,6 +29,7 @@ document.addEventListener('DOMContentLoaded', function() {
     document.querySelector('button[type="reset"]')?.addEventListener('click', function() {
         document.getElementById('filterForm').reset();
         currentPage = 1;
+        pageCursors = [null];
         currentFilters = {};
         loadData();
         // 如果图表正在显示，也更新图表数据
@@ -77,15 +82,29 @@ async function loadData() {
     
     try {
         const params = new URLSearchParams({
-            page: currentPage,
+            pagination: 'cursor',
             per_page: 20,
+            // 总数只在第一页查询，翻页时沿用
+            with_total: currentPage === 1 ? 'true' : 'false',
             ...currentFilters
         });
+        const cursor = pageCursors[currentPage - 1];
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
         
         const response = await fetch(`/api/data?${params}`);
         const result = await response.json();
         
         if (result.code === 200) {
+            if (currentPage === 1) {
+                totalItems = result.data.total;
+            }
+            pageCursors[currentPage] = result.data.next_cursor;
+            result.data.page = currentPage;
+            result.data.total = totalItems;
+            result.data.pages = Math.max(1, Math.ceil(totalItems / result.data.per_page));
+            
             renderTable(result.data.items);
             renderPagination(result.data);
             updatePaginationInfo(result.data);
@@ -141,9 +160,10 @@ function renderPagination(data) {
     prevLi.innerHTML = `<a class="page-link" href="#" onclick="goToPage(${data.page - 1})">上一页</a>`;
     pagination.appendChild(prevLi);
     
-    // 页码
+    // 页码：游标分页只能跳转到已获得游标的页
+    const knownPages = Math.min(data.pages, pageCursors.filter((cursor, index) => index === 0 || cursor).length);
     const startPage = Math.max(1, data.page - 2);
-    const endPage = Math.min(data.pages, data.page + 2);
+    const endPage = Math.min(knownPages, data.page + 2);
     
     if (startPage > 1) {
         const firstLi = document.createElement('li');
@@ -167,22 +187,15 @@ function renderPagination(data) {
     }
     
     if (endPage < data.pages) {
-        if (endPage < data.pages - 1) {
-            const ellipsisLi = document.createElement('li');
-            ellipsisLi.className = 'page-item disabled';
-            ellipsisLi.innerHTML = '<span class="page-link">...</span>';
-            pagination.appendChild(ellipsisLi);
-        }
-        
-        const lastLi = document.createElement('li');
-        lastLi.className = 'page-item';
-        lastLi.innerHTML = `<a class="page-link" href="#" onclick="goToPage(${data.pages})">${data.pages}</a>`;
-        pagination.appendChild(lastLi);
+        const ellipsisLi = document.createElement('li');
+        ellipsisLi.className = 'page-item disabled';
+        ellipsisLi.innerHTML = `<span class="page-link">... 共${data.pages}页</span>`;
+        pagination.appendChild(ellipsisLi);
     }
     
     // 下一页
     const nextLi = document.createElement('li');
-    nextLi.className = `page-item ${data.page === data.pages ? 'disabled' : ''}`;
+    nextLi.className = `page-item ${!data.next_cursor ? 'disabled' : ''}`;
     nextLi.innerHTML = `<a class="page-link" href="#" onclick="goToPage(${data.page + 1})">下一页</a>`;
     pagination.appendChild(nextLi);
 }
@@ -198,6 +211,10 @@ function updatePaginationInfo(data) {
 
 // 跳转到指定页
 function goToPage(page) {
+    // 只能跳转到已知游标的页（第1页、已访问过的页及其下一页）
+    if (page < 1 || page > pageCursors.length || (page > 1 && !pageCursors[page - 1])) {
+        return;
+    }
     currentPage = page;
     loadData();
 }
@@ -237,6 +254,15 @@ function showAlert(message, type = 'info') {
     }, 3000);
 }
 
+// 按当前筛选条件导出全部数据
+function exportData() {
+    const params = new URLSearchParams({
+        ...currentFilters,
+        format: 'csv'
+    });
+    window.location.href = `/api/export?${params}`;
+}
+
 // 显示图表
 async function showChart() {
     const chartContainer = document.getElementById('chartContainer');
@@ -253,6 +279,10 @@ async function showChart() {
 async function loadChartData() {
     try {
         const params = new URLSearchParams(currentFilters);
+        // 按日期跨度自动选择粒度，点数不超过图表宽度可显示的数量
+        const chartWidth = document.getElementById('chart').clientWidth || 800;
+        params.set('granularity', 'auto');
+        params.set('max_points', Math.max(50, Math.floor(chartWidth / 3)));
         const response = await fetch(`/api/chart-data?${params}`);
         const result = await response.json();
         
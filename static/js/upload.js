@@ -1,6 +1,13 @@
 // 全局变量
 let selectedFile = null;
 
+// 文件大小上限（与服务器的RESUMABLE_MAX_FILE_SIZE一致）
+const MAX_FILE_SIZE = 500 * 1024 * 1024;
+// 单个分片失败时的重试次数
+const CHUNK_RETRIES = 3;
+// 支持导入的文件格式（与config.py中的ALLOWED_EXTENSIONS一致）
+const ALLOWED_EXTENSIONS = ['.xlsx', '.csv', '.parquet'];
+
 // 页面加载完成后初始化
 document.addEventListener('DOMContentLoaded', function() {
     const uploadArea = document.getElementById('uploadArea');
@@ -58,14 +65,15 @@ document.addEventListener('DOMContentLoaded', function() {
 // 处理文件选择
 function handleFileSelect(file) {
     // 验证文件类型
-    if (!file.name.toLowerCase().endsWith('.xlsx')) {
-        showAlert('请选择.xlsx格式的Excel文件', 'danger');
+    const name = file.name.toLowerCase();
+    if (!ALLOWED_EXTENSIONS.some(ext => name.endsWith(ext))) {
+        showAlert(`请选择${ALLOWED_EXTENSIONS.join('、')}格式的文件`, 'danger');
         return;
     }
     
-    // 验证文件大小（2MB）
-    if (file.size > 2 * 1024 * 1024) {
-        showAlert('文件大小不能超过2MB', 'danger');
+    // 验证文件大小
+    if (file.size > MAX_FILE_SIZE) {
+        showAlert(`文件大小不能超过${formatFileSize(MAX_FILE_SIZE)}`, 'danger');
         return;
     }
     
@@ -128,32 +136,33 @@ async function uploadFile() {
     progress.style.width = '0%';
     progress.textContent = '0%';
     
-    // 创建FormData
-    const formData = new FormData();
-    formData.append('file', selectedFile);
+    const sessionKey = uploadSessionKey(selectedFile);
+    let uploaded = false;
     
     try {
-        // 模拟进度
-        let progressValue = 0;
-        const progressInterval = setInterval(() => {
-            progressValue += Math.random() * 30;
-            if (progressValue >= 90) {
-                progressValue = 90;
-                clearInterval(progressInterval);
-            }
-            updateProgress(progressValue);
-        }, 200);
+        // 分片上传（中断后再次上传只发送缺少的分片），上传进度占90%
+        const uploadId = await uploadInChunks(selectedFile, sessionKey);
+        uploaded = true;
         
-        // 发送请求
-        const response = await fetch('/api/upload', {
+        // 所有分片上传完成，服务器校验并导入；是否在后台导入由服务器配置（UPLOAD_ASYNC）决定，
+        // 同步导入返回结果，后台导入返回任务ID（202）
+        const formData = new FormData();
+        formData.append('mode', document.getElementById('importMode').value);
+        const response = await fetch(`/api/upload/sessions/${uploadId}/complete`, {
             method: 'POST',
             body: formData
         });
         
-        clearInterval(progressInterval);
-        updateProgress(100);
+        // 服务器完成导入或校验失败后会删除会话，之后重新上传同一文件时创建新会话
+        localStorage.removeItem(sessionKey);
+        let result = await response.json();
         
-        const result = await response.json();
+        // 文件已上传，轮询后台导入任务直到结束
+        if (result.code === 202) {
+            result = await waitForImportJob(result.data.id);
+        }
+        
+        updateProgress(100);
         
         if (result.code === 200) {
             showAlert(result.message, 'success');
@@ -171,7 +180,11 @@ async function uploadFile() {
         
     } catch (error) {
         console.error('上传失败:', error);
-        showAlert('上传失败，请检查网络连接', 'danger');
+        if (uploaded || !localStorage.getItem(sessionKey)) {
+            showAlert(`上传失败：${error.message || '请检查网络连接'}`, 'danger');
+        } else {
+            showAlert('上传中断，请检查网络连接；再次点击上传将从中断处继续', 'danger');
+        }
     } finally {
         // 恢复按钮状态
         uploadBtn.disabled = false;
@@ -184,6 +197,108 @@ async function uploadFile() {
     }
 }
 
+// 同一文件（文件名、大小、修改时间相同）使用同一个上传会话，用于中断后续传
+function uploadSessionKey(file) {
+    return `upload-session:${file.name}:${file.size}:${file.lastModified}`;
+}
+
+// 按分片上传文件，返回上传会话ID；已有未完成的会话时只上传服务器缺少的分片
+async function uploadInChunks(file, sessionKey) {
+    let session = await resumeUploadSession(localStorage.getItem(sessionKey));
+    if (!session) {
+        const response = await fetch('/api/upload/sessions', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ filename: file.name, size: file.size })
+        });
+        const result = await response.json();
+        if (result.code !== 201) {
+            throw new Error(result.message);
+        }
+        session = result.data;
+        localStorage.setItem(sessionKey, session.id);
+    }
+    
+    const received = new Set(session.received);
+    updateProgress(received.size / session.total_chunks * 90);
+    for (let index = 0; index < session.total_chunks; index++) {
+        if (received.has(index)) continue;
+        const start = index * session.chunk_size;
+        await uploadChunk(session.id, index, file.slice(start, Math.min(start + session.chunk_size, file.size)));
+        received.add(index);
+        updateProgress(received.size / session.total_chunks * 90);
+    }
+    return session.id;
+}
+
+// 查询未完成的上传会话，会话不存在或已过期时返回null
+async function resumeUploadSession(uploadId) {
+    if (!uploadId) return null;
+    const response = await fetch(`/api/upload/sessions/${uploadId}`);
+    const result = await response.json();
+    return result.code === 200 ? result.data : null;
+}
+
+// 上传一个分片，失败时重试；浏览器支持时附带分片的SHA-256供服务器校验
+async function uploadChunk(uploadId, index, chunk) {
+    const headers = { 'Content-Type': 'application/octet-stream' };
+    if (window.crypto && window.crypto.subtle) {
+        headers['X-Chunk-SHA256'] = toHex(await crypto.subtle.digest('SHA-256', await chunk.arrayBuffer()));
+    }
+    
+    for (let attempt = 1; ; attempt++) {
+        let response = null;
+        let result = null;
+        try {
+            response = await fetch(`/api/upload/sessions/${uploadId}/chunks/${index}`, {
+                method: 'PUT',
+                headers: headers,
+                body: chunk
+            });
+            result = await response.json();
+        } catch (error) {
+            // 网络错误，稍后重试
+            if (attempt >= CHUNK_RETRIES) throw error;
+        }
+        if (result && result.code === 200) {
+            return result.data;
+        }
+        // 会话不存在（已过期）时重试无意义
+        if (result && (response.status === 404 || attempt >= CHUNK_RETRIES)) {
+            throw new Error(result.message);
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000 * attempt));
+    }
+}
+
+function toHex(buffer) {
+    return Array.from(new Uint8Array(buffer), byte => byte.toString(16).padStart(2, '0')).join('');
+}
+
+// 轮询导入任务进度，返回任务的最终结果
+async function waitForImportJob(jobId) {
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        
+        const response = await fetch(`/api/upload/jobs/${jobId}`);
+        const result = await response.json();
+        if (result.code !== 200) {
+            return result;
+        }
+        
+        const job = result.data;
+        if (job.status === 'succeeded' || job.status === 'failed') {
+            return job.result;
+        }
+        
+        if (job.progress) {
+            const progress = document.getElementById('progress');
+            progress.style.width = '95%';
+            progress.textContent = `已解析 ${job.progress.rows_parsed} 行，已写入 ${job.progress.rows_written} 行（${job.progress.rows_per_second} 行/秒）`;
+        }
+    }
+}
+
 // 重置上传
 function resetUpload() {
     selectedFile = null;
@@ -200,8 +315,8 @@ function resetUpload() {
     uploadArea.innerHTML = `
         <i class="bi bi-cloud-upload" style="font-size: 3rem; color: #6c757d;"></i>
         <h5 class="mt-3">拖拽文件到此处或点击选择文件</h5>
-        <p class="text-muted">支持.xlsx格式文件，最大2MB</p>
-        <input type="file" id="fileInput" accept=".xlsx" style="display: none;">
+        <p class="text-muted">支持.xlsx、.csv、.parquet格式文件，最大500MB</p>
+        <input type="file" id="fileInput" accept=".xlsx,.csv,.parquet" style="display: none;">
     `;
     
     // 重新绑定文件选择事件
@@ -0,0 +1,162 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+import openpyxl
+from config import Config
+from app import create_app, db, InventoryDailySupplier
+
+# 通过测试客户端调用接口：每个测试使用临时目录中的SQLite数据库与上传目录，数据通过 /api/upload 导入
+
+CSV_HEADER = "日期,SKU,产品名称,入库数量,出库数量,库存余额,供应商,操作员,备注"
+
+
+@contextmanager
+def temp_app(**config):
+    """创建使用临时数据库的应用并建表，config覆盖默认配置"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        settings = {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmpdir, 'test.db')}",
+            'UPLOAD_FOLDER': os.path.join(tmpdir, 'uploads'),
+            'UPLOAD_ASYNC': False,
+            'DB_POOL_MODE': 'null',
+        }
+        settings.update(config)
+        app = create_app(type('TestConfig', (Config,), settings))
+        with app.app_context():
+            # 只在主库建表：配置过读库的应用会在共用的db上留下read绑定，之后未配置读库的应用不能按它建表
+            db.create_all(bind_key=None)
+        try:
+            yield app
+        finally:
+            with app.app_context():
+                for engine in db.engines.values():
+                    engine.dispose()
+
+
+def csv_rows(row_count, day_count=10, supplier_count=2, balance=0, sku_prefix='SKU'):
+    """生成导入用的CSV内容：row_count行，日期在2025-01-01起的day_count天内循环"""
+    lines = [CSV_HEADER]
+    for i in range(row_count):
+        lines.append(f"2025-01-{i % day_count + 1:02d},{sku_prefix}{i:04d},产品{i},{i % 7},{i % 3},{i + balance},"
+                     f"供应商{i % supplier_count},张三,")
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def upload_csv(client, data, mode='reject', filename='库存.csv'):
+    return client.post('/api/upload', data={'file': (io.BytesIO(data), filename), 'mode': mode})
+
+
+def test_per_page_validation():
+    print("=== 测试每页条数校验 ===")
+    with temp_app() as app:
+        client = app.test_client()
+        assert upload_csv(client, csv_rows(25)).status_code == 200
+
+        for query in ('', '&pagination=cursor'):
+            response = client.get(f'/api/data?per_page=10{query}')
+            assert response.status_code == 200 and len(response.get_json()['data']['items']) == 10
+            # 每页条数为0或负数时返回400，而不是查询出错
+            for per_page in (0, -5):
+                response = client.get(f'/api/data?per_page={per_page}{query}')
+                print(f"per_page={per_page}{query}: {response.status_code} {response.get_json()['message']}")
+                assert response.status_code == 400
+
+
+def test_export_formats():
+    print("=== 测试流式导出 ===")
+    # 每批读取的行数小于结果行数，导出分多批生成
+    with temp_app(EXPORT_BATCH_SIZE=7) as app:
+        client = app.test_client()
+        assert upload_csv(client, csv_rows(60, supplier_count=3)).status_code == 200
+
+        filters = 'supplier=供应商1&start_date=2025-01-03&end_date=2025-01-08'
+        expected = client.get(f'/api/data?{filters}&per_page=100').get_json()['data']['items']
+        print(f"/api/data: {len(expected)}行")
+        assert 7 < len(expected) < 60
+
+        response = client.get(f'/api/export?{filters}&format=csv')
+        assert response.status_code == 200 and response.mimetype == 'text/csv'
+        text = response.get_data(as_text=True)
+        assert text.startswith('\ufeff')
+        rows = list(csv.DictReader(io.StringIO(text[1:])))
+        assert rows == [{name: '' if value is None else str(value) for name, value in item.items()} for item in expected]
+
+        response = client.get(f'/api/export?{filters}&format=ndjson')
+        assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+        assert [json.loads(line) for line in response.get_data(as_text=True).splitlines()] == expected
+
+        response = client.get(f'/api/export?{filters}&format=xlsx&fields=date,sku,inventory_balance,remarks')
+        assert response.status_code == 200 and 'attachment' in response.headers['Content-Disposition']
+        sheet = openpyxl.load_workbook(io.BytesIO(response.get_data())).active
+        rows = list(sheet.iter_rows(values_only=True))
+        assert rows[0] == ('date', 'sku', 'inventory_balance', 'remarks')
+        assert rows[1:] == [(item['date'], item['sku'], item['inventory_balance'], item['remarks']) for item in expected]
+
+        # 不支持的格式返回400
+        assert client.get('/api/export?format=xls').status_code == 400
+
+
+def test_chart_rollup_fallback():
+    print("=== 测试图表汇总表未回填时使用明细表 ===")
+    with temp_app(RESULT_CACHE_ENABLED=False) as app:
+        client = app.test_client()
+        assert upload_csv(client, csv_rows(40)).status_code == 200
+        rollup = client.get('/api/chart-data?supplier=供应商1').get_json()['data']
+        assert rollup['source'] == 'rollup'
+
+        # 模拟升级后未执行rebuild_rollup.py：汇总表为空
+        with app.app_context():
+            db.session.query(InventoryDailySupplier).delete()
+            db.session.commit()
+        raw = client.get('/api/chart-data?supplier=供应商1').get_json()['data']
+        print(f"汇总表为空时: source={raw['source']}")
+        assert raw['source'] == 'raw'
+        assert (raw['dates'], raw['balances']) == (rollup['dates'], rollup['balances'])
+
+        # 汇总表不存在时同样使用明细表
+        with app.app_context():
+            InventoryDailySupplier.__table__.drop(db.engine)
+        response = client.get('/api/chart-data?supplier=供应商1')
+        assert response.status_code == 200 and response.get_json()['data']['source'] == 'raw'
+
+
+def test_rollback_overwrite_batch():
+    print("=== 测试覆盖模式批次不能撤销 ===")
+    with temp_app() as app:
+        client = app.test_client()
+        first = upload_csv(client, csv_rows(20)).get_json()['data']['batch_id']
+        # 覆盖前20行并新增10行
+        response = upload_csv(client, csv_rows(30, balance=100), mode='overwrite', filename='覆盖.csv')
+        assert response.status_code == 200
+        overwrite = response.get_json()['data']['batch_id']
+        items = client.get('/api/data?per_page=100').get_json()['data']['items']
+
+        response = client.post(f'/api/imports/{overwrite}/rollback')
+        print(f"撤销覆盖批次: {response.status_code} {response.get_json()['message']}")
+        assert response.status_code == 409
+        assert client.get(f'/api/imports/{overwrite}').get_json()['data']['status'] == 'imported'
+        # 导入前已有的数据和覆盖后的值都保留
+        assert client.get('/api/data?per_page=100').get_json()['data']['items'] == items
+        assert len(items) == 30 and all(item['inventory_balance'] >= 100 for item in items)
+
+        # 被覆盖的行已归属覆盖批次，撤销原批次不会删除
+        response = client.post(f'/api/imports/{first}/rollback')
+        assert response.status_code == 200 and response.get_json()['data']['deleted'] == 0
+        assert client.get('/api/data').get_json()['data']['total'] == 30
+
+        # 非覆盖模式的批次正常撤销
+        response = upload_csv(client, csv_rows(5, sku_prefix='NEW'), mode='skip')
+        batch_id = response.get_json()['data']['batch_id']
+        response = client.post(f'/api/imports/{batch_id}/rollback')
+        assert response.status_code == 200 and response.get_json()['data']['deleted'] == 5
+        assert client.get('/api/data').get_json()['data']['total'] == 30
+
+
+if __name__ == '__main__':
+    test_per_page_validation()
+    test_export_formats()
+    test_chart_rollup_fallback()
+    test_rollback_overwrite_batch()
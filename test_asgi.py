@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import tempfile
+from urllib.parse import urlsplit
+from asgi import AsyncReadApp, create_read_engine
+from test_api import temp_app, csv_rows, upload_csv
+from test_read_write_routing import replicate
+
+# 测试ASGI服务模式：在进程内按ASGI协议调用应用，只读接口经异步引擎查询的响应与Flask视图相同，
+# 其余请求转发给WSGI应用
+
+
+async def asgi_request(asgi_app, url, headers=None):
+    """发送一个GET请求，返回(状态码, 响应头, 响应体)"""
+    parts = urlsplit(url)
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': parts.path,
+        'raw_path': parts.path.encode('utf-8'),
+        'query_string': parts.query.encode('utf-8'),
+        'root_path': '',
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                    for name, value in (headers or {}).items()],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 12345),
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    disconnected = asyncio.Event()
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        # 请求体已读完，之后只在响应结束时断开
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    await asyncio.wait_for(asgi_app(scope, receive, send), timeout=30)
+    disconnected.set()
+    start = sent[0]
+    response_headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in start['headers']}
+    body = b''.join(message.get('body', b'') for message in sent[1:])
+    return start['status'], response_headers, body
+
+
+def test_async_read_endpoints():
+    print("=== 测试ASGI只读接口 ===")
+    # 关闭结果缓存，ASGI请求都经异步引擎查询
+    with temp_app(RESULT_CACHE_ENABLED=False) as app:
+        client = app.test_client()
+        assert upload_csv(client, csv_rows(45, supplier_count=3)).status_code == 200
+        asgi_app = AsyncReadApp(app, create_read_engine(app.config), wsgi_workers=2)
+
+        urls = [
+            '/api/data?per_page=10&page=2&supplier=%E4%BE%9B%E5%BA%94%E5%95%861',
+            '/api/data?pagination=cursor&per_page=7&fields=date,sku,inventory_balance',
+            '/api/suppliers',
+            '/api/chart-data?granularity=week',
+            # 参数错误同样返回400
+            '/api/data?per_page=0',
+        ]
+
+        async def run():
+            try:
+                for url in urls:
+                    expected = client.get(url)
+                    status, headers, body = await asgi_request(asgi_app, url)
+                    print(f"{url}: WSGI {expected.status_code} / ASGI {status}")
+                    assert status == expected.status_code
+                    assert json.loads(body) == expected.get_json()
+                    if status == 200:
+                        assert headers['etag'] == expected.headers['ETag']
+
+                # 条件请求与压缩在ASGI模式下同样生效
+                url = '/api/data?per_page=50'
+                status, headers, _ = await asgi_request(asgi_app, url)
+                status, _, body = await asgi_request(asgi_app, url, {'If-None-Match': headers['etag']})
+                assert status == 304 and body == b''
+                status, headers, _ = await asgi_request(asgi_app, url, {'Accept-Encoding': 'gzip'})
+                assert status == 200 and headers['content-encoding'] == 'gzip'
+
+                # 其余请求转发给WSGI应用
+                url = '/api/export?format=ndjson&supplier=%E4%BE%9B%E5%BA%94%E5%95%862'
+                status, _, body = await asgi_request(asgi_app, url)
+                assert status == 200 and body == client.get(url).get_data()
+            finally:
+                await asgi_app.engine.dispose()
+
+        asyncio.run(run())
+
+
+def test_read_after_write():
+    print("=== 测试ASGI模式下数据变更后查询主库 ===")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        replica = os.path.join(tmpdir, 'replica.db')
+        with temp_app(DATABASE_READ_URL=f'sqlite:///{replica}', DATA_VERSION_TTL=0,
+                      RESULT_CACHE_ENABLED=False) as app:
+            client = app.test_client()
+            assert upload_csv(client, csv_rows(30)).status_code == 200
+            replicate(app, replica)
+            assert upload_csv(client, csv_rows(5, supplier_count=3, sku_prefix='NEW')).status_code == 200
+            asgi_app = AsyncReadApp(app, create_read_engine(app.config), wsgi_workers=2)
+
+            async def run():
+                try:
+                    # 异步引擎连接读库，窗口期内的请求交给Flask视图查询主库
+                    _, _, body = await asgi_request(asgi_app, '/api/suppliers')
+                    print(f"导入后: {json.loads(body)['data']}")
+                    assert json.loads(body)['data'] == ['供应商0', '供应商1', '供应商2']
+                    app.config['READ_AFTER_WRITE_SECONDS'] = 0
+                    _, _, body = await asgi_request(asgi_app, '/api/suppliers')
+                    assert json.loads(body)['data'] == ['供应商0', '供应商1']
+                finally:
+                    await asgi_app.engine.dispose()
+
+            asyncio.run(run())
+
+
+if __name__ == '__main__':
+    test_async_read_endpoints()
+    test_read_after_write()
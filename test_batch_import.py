@@ -0,0 +1,153 @@
+import os
+import tempfile
+import zipfile
+import openpyxl
+from sqlalchemy import create_engine, Column, Integer, String, Date, Text, UniqueConstraint
+from sqlalchemy.orm import declarative_base, Session
+from importer import run_batch_import, list_excel_sheets, iter_sheet_chunks, parse_sheet, load_sheet_chunks, \
+    extract_zip_workbooks
+from test_api import temp_app
+
+# 测试多文件、多工作表的批量导入
+
+Base = declarative_base()
+
+
+class Inventory(Base):
+    __tablename__ = 'inventory_data'
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    sku = Column(String(50), nullable=False)
+    product_name = Column(String(200))
+    inbound_quantity = Column(Integer)
+    outbound_quantity = Column(Integer)
+    inventory_balance = Column(Integer)
+    supplier = Column(String(100))
+    operator = Column(String(50))
+    remarks = Column(Text)
+    __table_args__ = (UniqueConstraint('date', 'sku', name='uq_date_sku'),)
+
+
+def _create_workbook(path, sheets):
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for name, rows in sheets.items():
+        ws = wb.create_sheet(name)
+        ws.append(["日期", "SKU", "产品名称", "入库数量", "出库数量", "库存余额", "供应商"])
+        for row in rows:
+            ws.append(row)
+    wb.save(path)
+
+
+def test_batch_import_all_sheets():
+    print("=== 测试多工作表并行解析与合并写入 ===")
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        first = os.path.join(tmpdir, 'a.xlsx')
+        second = os.path.join(tmpdir, 'b.xlsx')
+        _create_workbook(first, {
+            '北京': [[f"2025/1/{day}", 'SKU001', '产品A', 1, 0, day, '供应商A'] for day in range(1, 11)],
+            '上海': [[f"2025-01-{day:02d}", 'SKU002', '产品B', 1, 0, day, '供应商B'] for day in range(1, 11)],
+        })
+        _create_workbook(second, {'广州': [['2025.1.1', 'SKU003', '产品C', 5, 1, 4, '供应商C']]})
+        assert list_excel_sheets(first) == ['北京', '上海']
+
+        with Session(engine) as session:
+            result = run_batch_import([('a.xlsx', first), ('b.xlsx', second)], session, Inventory,
+                                      chunk_size=4, processes=2)
+            session.commit()
+
+        print(f"工作表报告: {[(s['file'], s['sheet'], s['written']) for s in result.sheets]}")
+        assert result.ok
+        assert [(s['sheet'], s['rows'], s['written']) for s in result.sheets] == [('北京', 10, 10), ('上海', 10, 10), ('广州', 1, 1)]
+        with Session(engine) as session:
+            assert session.query(Inventory).count() == 21
+
+
+def test_batch_import_cross_sheet_duplicates():
+    print("=== 测试跨工作表重复数据报告 ===")
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'dup.xlsx')
+        _create_workbook(path, {
+            '一号仓': [['2025-01-01', 'SKU001'], ['2025-01-02', 'SKU001']],
+            '二号仓': [['2025-01-03', 'SKU001'], ['2025-01-02', 'SKU001']],
+        })
+        with Session(engine) as session:
+            result = run_batch_import([('dup.xlsx', path)], session, Inventory, processes=1)
+            session.rollback()
+
+    for sheet in result.sheets:
+        print(sheet)
+    assert not result.ok
+    assert result.sheets[0]['file_duplicates'] == []
+    assert result.sheets[1]['file_duplicates'] == ['第3行与dup.xlsx/一号仓 第3行重复（SKU: SKU001, 日期: 2025-01-02）']
+    with Session(engine) as session:
+        assert session.query(Inventory).count() == 0
+
+
+def test_sheet_chunks():
+    print("=== 测试工作表逐批解析 ===")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'big.xlsx')
+        rows = [[f"2025-01-{i % 28 + 1:02d}", f"SKU{i:04d}", '产品', 1, 0, 1, '供应商A'] for i in range(2500)]
+        rows[1800][3] = 'abc'
+        _create_workbook(path, {'库存': rows})
+
+        # 每次只产出一批，错误行号按整个工作表计算
+        chunks = list(iter_sheet_chunks(path, '库存', chunk_size=1000))
+        assert [row_count for row_count, _, _ in chunks] == [1000, 1000, 500]
+        assert [len(records) for _, records, _ in chunks] == [1000, 999, 500]
+        assert chunks[1][2] == ['第1802行：入库数量必须为整数']
+
+        # 子进程写入临时文件的结果与直接解析相同，读完后删除
+        spool = parse_sheet(path, '库存', chunk_size=1000, spool_dir=tmpdir)
+        loaded = list(load_sheet_chunks(spool))
+        assert [(n, [r.sku for r in records], errors) for n, records, errors in loaded] == \
+            [(n, [r.sku for r in records], errors) for n, records, errors in chunks]
+        assert not os.path.exists(spool)
+
+
+def test_zip_limits():
+    print("=== 测试压缩包解压限制 ===")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workbook = os.path.join(tmpdir, 'a.xlsx')
+        _create_workbook(workbook, {'库存': [["2025-01-05", "SKU1", '产品', 1, 0, 1, '供应商A']]})
+        # 压缩后很小、解压后8MB的条目
+        bomb = os.path.join(tmpdir, 'bomb.zip')
+        with zipfile.ZipFile(bomb, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.write(workbook, '正常.xlsx')
+            archive.writestr('大文件.xlsx', b'\0' * (8 * 1024 * 1024))
+            for i in range(5):
+                archive.writestr(f'说明{i}.txt', b'')
+        print(f"压缩包 {os.path.getsize(bomb)} 字节")
+
+        target = os.path.join(tmpdir, 'out')
+        os.makedirs(target)
+        for limits in ({'max_size': 4 * 1024 * 1024}, {'max_entries': 5}):
+            try:
+                extract_zip_workbooks(bomb, target, **limits)
+                assert False, f'超过限制时应抛出ValueError：{limits}'
+            except ValueError as e:
+                print(e)
+            # 检查在解压前完成，不写入任何文件
+            assert os.listdir(target) == []
+        sources = extract_zip_workbooks(bomb, target, max_size=16 * 1024 * 1024, max_entries=7)
+        assert [name for name, _ in sources] == ['正常.xlsx', '大文件.xlsx']
+
+        with temp_app(BATCH_ZIP_MAX_UNCOMPRESSED=4 * 1024 * 1024) as app:
+            with open(bomb, 'rb') as f:
+                response = app.test_client().post('/api/upload/batch', data={'files': (f, 'bomb.zip')})
+            print(response.get_json()['message'])
+            assert response.status_code == 400
+            # 上传的压缩包与批次目录已删除
+            assert os.listdir(app.config['UPLOAD_FOLDER']) == []
+
+
+if __name__ == '__main__':
+    test_batch_import_all_sheets()
+    test_batch_import_cross_sheet_duplicates()
+    test_sheet_chunks()
+    test_zip_limits()
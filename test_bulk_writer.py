@@ -0,0 +1,101 @@
+import datetime
+from types import SimpleNamespace
+from sqlalchemy import create_engine, create_mock_engine, MetaData, Table, Column, Integer, String, Date, DateTime, UniqueConstraint, select, func
+from sqlalchemy.exc import IntegrityError
+from importer import BulkWriter
+
+# 测试批量写入的三种导入模式
+
+metadata = MetaData()
+inventory_data = Table(
+    'inventory_data', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('date', Date, nullable=False),
+    Column('sku', String(50), nullable=False),
+    Column('inventory_balance', Integer),
+    Column('created_at', DateTime, default=func.now()),
+    Column('updated_at', DateTime, default=func.now(), onupdate=func.now()),
+    UniqueConstraint('date', 'sku', name='uq_date_sku'),
+)
+
+DAY = datetime.date(2025, 1, 5)
+
+
+def _records(skus, balance):
+    return [{'date': DAY, 'sku': sku, 'inventory_balance': balance} for sku in skus]
+
+
+def _setup():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        BulkWriter(conn, inventory_data).write(_records(['SKU001', 'SKU002'], 10))
+    return engine
+
+
+def test_reject_mode():
+    print("=== 测试reject模式 ===")
+    engine = _setup()
+    with engine.connect() as conn:
+        writer = BulkWriter(conn, inventory_data, 'reject')
+        try:
+            writer.write(_records(['SKU002', 'SKU003'], 20))
+            assert False, "重复数据应导致写入失败"
+        except IntegrityError:
+            print("✓ 重复数据被拒绝")
+
+
+def test_skip_mode():
+    print("=== 测试skip模式 ===")
+    engine = _setup()
+    with engine.begin() as conn:
+        writer = BulkWriter(conn, inventory_data, 'skip')
+        writer.write(_records(['SKU002', 'SKU003'], 20))
+        print(f"写入: {writer.written_count}, 跳过: {writer.skipped_count}")
+        assert (writer.written_count, writer.skipped_count) == (1, 1)
+        balances = dict(conn.execute(select(inventory_data.c.sku, inventory_data.c.inventory_balance)).all())
+    assert balances == {'SKU001': 10, 'SKU002': 10, 'SKU003': 20}
+
+
+def test_overwrite_mode():
+    print("=== 测试overwrite模式 ===")
+    engine = _setup()
+    with engine.begin() as conn:
+        writer = BulkWriter(conn, inventory_data, 'overwrite')
+        writer.write(_records(['SKU002', 'SKU003'], 20))
+        assert len(writer.chunk_stats) == 1 and writer.chunk_stats[0]['rows'] == 2
+        balances = dict(conn.execute(select(inventory_data.c.sku, inventory_data.c.inventory_balance)).all())
+    print(f"覆盖后余额: {balances}")
+    assert balances == {'SKU001': 10, 'SKU002': 20, 'SKU003': 20}
+
+
+def test_mysql_statements():
+    print("=== 测试MySQL写入语句 ===")
+    executed = []
+
+    def executor(statement, parameters=None):
+        executed.append(str(statement.compile(dialect=engine.dialect)))
+        # CLIENT.FOUND_ROWS：重复行的无操作更新同样计入受影响行数；已存在的行数查询返回1
+        return SimpleNamespace(rowcount=2, scalar=lambda: 1)
+
+    engine = create_mock_engine('mysql+pymysql://', executor)
+    writer = BulkWriter(engine, inventory_data, 'skip')
+    writer.write(_records(['SKU002', 'SKU003'], 20))
+    print(executed[-1])
+    assert executed[-2].startswith('SELECT count(*)') and '(inventory_data.date, inventory_data.sku) IN' in executed[-2]
+    # 只跳过唯一键冲突，不使用会把截断等错误降为警告的INSERT IGNORE
+    assert 'IGNORE' not in executed[-1]
+    assert executed[-1].endswith('ON DUPLICATE KEY UPDATE id = inventory_data.id')
+    assert (writer.written_count, writer.skipped_count) == (1, 1)
+
+    writer = BulkWriter(engine, inventory_data, 'overwrite')
+    writer.write(_records(['SKU002', 'SKU003'], 20))
+    assert 'ON DUPLICATE KEY UPDATE' in executed[-1] and 'created_at' not in executed[-1].split('UPDATE')[-1]
+    assert writer.written_count == 2
+
+
+if __name__ == '__main__':
+    test_reject_mode()
+    test_skip_mode()
+    test_overwrite_mode()
+    test_mysql_statements()
@@ -0,0 +1,64 @@
+import datetime
+import math
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, Date, select, insert, func
+from charting import bucket_expression, resolve_granularity, lttb
+
+# 测试图表时间桶SQL表达式、自动粒度选择与LTTB降采样
+
+metadata = MetaData()
+daily = Table(
+    'daily', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('date', Date, nullable=False),
+    Column('balance', Integer),
+)
+
+
+def test_sqlite_buckets():
+    print("=== 测试SQLite时间桶 ===")
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    start = datetime.date(2024, 1, 1)  # 周一
+    with engine.begin() as conn:
+        conn.execute(insert(daily), [{'date': start + datetime.timedelta(days=i), 'balance': 1}
+                                     for i in range(70)])
+        for granularity in ('week', 'month'):
+            bucket = bucket_expression(daily.c.date, granularity, 'sqlite').label('bucket')
+            rows = conn.execute(select(bucket, func.count()).group_by(bucket).order_by(bucket)).all()
+            print(granularity, rows[:3])
+            for day, _ in rows:
+                assert isinstance(day, datetime.date)
+                assert day.weekday() == 0 if granularity == 'week' else day.day == 1
+            assert sum(count for _, count in rows) == 70
+        weeks = conn.execute(select(bucket_expression(daily.c.date, 'week', 'sqlite')).distinct()).all()
+        assert len(weeks) == 10
+
+
+def test_resolve_granularity():
+    print("=== 测试自动粒度 ===")
+    first = datetime.date(2022, 1, 1)
+    assert resolve_granularity('month', first, first, 10) == 'month'
+    assert resolve_granularity('auto', None, None, 10) == 'day'
+    assert resolve_granularity('auto', first, first + datetime.timedelta(days=99), 100) == 'day'
+    assert resolve_granularity('auto', first, first + datetime.timedelta(days=500), 100) == 'week'
+    assert resolve_granularity('auto', first, first + datetime.timedelta(days=1000), 100) == 'month'
+
+
+def test_lttb():
+    print("=== 测试LTTB降采样 ===")
+    xs = list(range(1000))
+    ys = [math.sin(x / 50) * 100 for x in xs]
+    ys[437] = 500  # 尖峰必须保留
+    keep = lttb(xs, ys, 100)
+    print(f"保留 {len(keep)} 个点")
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert keep == sorted(set(keep))
+    assert 437 in keep
+    assert lttb(xs[:10], ys[:10], 20) == list(range(10))
+
+
+if __name__ == '__main__':
+    test_sqlite_buckets()
+    test_resolve_granularity()
+    test_lttb()
@@ -113,4 +113,43 @@ test_dates = [
 print("测试日期解析功能：")
 for date_str in test_dates:
     result = parse_date_flexible(date_str)
-    print(f"{date_str} -> {result}")
\ No newline at end of file
+    print(f"{date_str} -> {result}")
+
+# 验证预编译正则 + 缓存的解析实现与上面的原始实现结果一致
+def test_fast_parser_matches_reference():
+    import itertools
+    from date_parser import parse_date_flexible as parse_date_fast
+
+    years = ['2025', '1999', '0000', '25']
+    months = ['0', '1', '01', '12', '13']
+    days = ['0', '5', '05', '29', '31', '32']
+    cases = set(test_dates)
+    for year, month, day, sep in itertools.product(years, months, days, ['-', '/', '.', '', ' ']):
+        parts = {'y': year, 'm': month, 'd': day}
+        for order in ('ymd', 'dmy', 'mdy'):
+            cases.add(sep.join(parts[c] for c in order))
+
+    mismatches = [c for c in cases if parse_date_fast(c) != parse_date_flexible(c)]
+    print(f"对比用例数: {len(cases)}, 不一致: {mismatches[:10]}")
+    assert not mismatches
+
+
+def test_native_and_column_dates():
+    from date_parser import parse_date_flexible as parse_date_fast, make_column_date_parser
+
+    # openpyxl读取的原生日期单元格直接返回
+    assert parse_date_fast(datetime.datetime(2025, 1, 5, 8, 30)) == datetime.date(2025, 1, 5)
+    assert parse_date_fast(datetime.date(2025, 1, 5)) == datetime.date(2025, 1, 5)
+    assert parse_date_fast(None) is None
+
+    # 主要格式为 月/日/年 的列中，有歧义的日期也按 月/日/年 解析
+    parse_column = make_column_date_parser(['12/31/2025', '11/20/2025', '10/15/2025'])
+    assert parse_column('05/01/2025') == datetime.date(2025, 5, 1)
+    # 不符合主要格式的值回退到灵活解析
+    assert parse_column('2025-1-5') == datetime.date(2025, 1, 5)
+    assert parse_column('not a date') is None
+
+
+if __name__ == '__main__':
+    test_fast_parser_matches_reference()
+    test_native_and_column_dates()
@@ -0,0 +1,105 @@
+import datetime
+from sqlalchemy import create_engine, Column, Integer, String, Date, DateTime, ForeignKey, UniqueConstraint, \
+    select, func
+from sqlalchemy.orm import declarative_base, Session
+from importer import DimensionWriter, InventoryRecord, run_import
+
+# 测试导入时维护供应商/产品维度表
+
+Base = declarative_base()
+
+
+class Supplier(Base):
+    __tablename__ = 'suppliers'
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False, unique=True)
+
+
+class Product(Base):
+    __tablename__ = 'products'
+    id = Column(Integer, primary_key=True)
+    sku = Column(String(50), nullable=False, unique=True)
+    product_name = Column(String(200))
+    updated_at = Column(DateTime, default=func.now())
+
+
+class Inventory(Base):
+    __tablename__ = 'inventory_data'
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    sku = Column(String(50), nullable=False)
+    product_name = Column(String(200))
+    inbound_quantity = Column(Integer)
+    outbound_quantity = Column(Integer)
+    inventory_balance = Column(Integer)
+    supplier_id = Column(Integer, ForeignKey('suppliers.id'))
+    operator = Column(String(50))
+    remarks = Column(String(200))
+    __table_args__ = (UniqueConstraint('date', 'sku', name='uq_date_sku'),)
+
+
+def _record(sku, name, supplier):
+    return InventoryRecord(datetime.date(2025, 1, 5), sku, name, 0, 0, 1, supplier, None, None, 2, '2025-01-05')
+
+
+def test_dimension_writer():
+    print("=== 测试供应商键解析与产品维度表 ===")
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Supplier.__table__.insert(), [{'id': 7, 'name': '供应商A'}])
+        writer = DimensionWriter(conn, Supplier.__table__, Product.__table__)
+        params = writer.apply([
+            _record('SKU001', '产品A', '供应商A'),
+            _record('SKU002', '产品B', '供应商B'),
+            _record('SKU003', None, None),
+            _record('SKU003', '产品C', ''),
+        ])
+        print(params)
+        assert 'supplier' not in params[0]
+        assert params[0]['supplier_id'] == 7
+        assert params[1]['supplier_id'] == writer.supplier_ids['供应商B']
+        assert params[2]['supplier_id'] is None and params[3]['supplier_id'] is None
+
+        # 已解析的供应商不再写入，空名称不产生供应商
+        assert writer.resolve_suppliers(['供应商A', '供应商B', '']) == {'供应商A': 7, '供应商B': params[1]['supplier_id']}
+        assert conn.execute(select(func.count()).select_from(Supplier.__table__)).scalar() == 2
+
+        # 产品名称：同批次取最后一个非空名称，之后的空名称不覆盖已有名称
+        writer.apply([_record('SKU001', None, '供应商A'), _record('SKU002', '产品B2', '供应商B')])
+        products = dict(conn.execute(select(Product.sku, Product.product_name)).all())
+        print(products)
+        assert products == {'SKU001': '产品A', 'SKU002': '产品B2', 'SKU003': '产品C'}
+
+        # 其他导入（新的DimensionWriter）遇到已存在的供应商时使用已有id
+        other = DimensionWriter(conn, Supplier.__table__)
+        assert other.resolve_suppliers(['供应商B']) == {'供应商B': params[1]['supplier_id']}
+
+
+def test_run_import_with_dimensions():
+    print("=== 测试导入写入supplier_id ===")
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    rows = [
+        ('2025-01-05', 'SKU001', '产品A', 1, 0, 1, '供应商A'),
+        ('2025-01-05', 'SKU002', '产品B', 1, 0, 2, '供应商B'),
+        ('2025-01-06', 'SKU001', '产品A', 1, 0, 3, '供应商A'),
+    ]
+    with Session(engine) as session:
+        dimensions = DimensionWriter(session.connection(), Supplier.__table__, Product.__table__)
+        result = run_import(iter(rows), session, Inventory, chunk_size=2, dimensions=dimensions)
+        session.commit()
+        assert result.ok and result.writer.written_count == 3
+
+        stored = session.query(Inventory.sku, Supplier.name)\
+            .join(Supplier, Inventory.supplier_id == Supplier.id)\
+            .order_by(Inventory.id).all()
+        print(stored)
+        assert stored == [('SKU001', '供应商A'), ('SKU002', '供应商B'), ('SKU001', '供应商A')]
+        assert session.query(Supplier).count() == 2
+        assert session.query(Product).count() == 2
+
+
+if __name__ == '__main__':
+    test_dimension_writer()
+    test_run_import_with_dimensions()
@@ -0,0 +1,49 @@
+import datetime
+from sqlalchemy import create_engine, Column, Integer, String, Date, UniqueConstraint
+from sqlalchemy.orm import declarative_base, Session
+from importer import DuplicateDetector, InventoryRecord
+
+# 测试批量重复数据检测
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = 'inventory_data'
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    sku = Column(String(50), nullable=False)
+    __table_args__ = (UniqueConstraint('date', 'sku', name='uq_date_sku'),)
+
+
+def test_duplicate_detector():
+    print("=== 测试批量重复数据检测 ===")
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    day = datetime.date(2025, 1, 5)
+
+    def record(row_no, sku, raw_date):
+        return InventoryRecord(day, sku, None, 0, 0, 0, None, None, None, row_no, raw_date)
+
+    with Session(engine) as session:
+        # 数据库中已有 SKU0000 ~ SKU0998 中的偶数编号（共500个）
+        session.add_all(Item(date=day, sku=f"SKU{i:04d}") for i in range(0, 1000, 2))
+        session.commit()
+
+        detector = DuplicateDetector(session, Item)
+        records = [record(i + 2, f"SKU{i:04d}", '2025/1/5') for i in range(1000)]
+        file_duplicates, db_duplicates = detector.check(records)
+        print(f"数据库重复: {len(db_duplicates)}, 文件内重复: {len(file_duplicates)}")
+        assert len(db_duplicates) == 500
+        assert db_duplicates[0] == "SKU: SKU0000, 日期: 2025/1/5"
+        assert file_duplicates == []
+
+        # 后续批次中与前面行重复的数据应报告为文件内重复
+        file_duplicates, db_duplicates = detector.check([record(1002, 'SKU0001', '2025-01-05')])
+        print(f"文件内重复: {file_duplicates}")
+        assert file_duplicates == ["第1002行与第3行重复（SKU: SKU0001, 日期: 2025-01-05）"]
+        assert db_duplicates == []
+
+
+if __name__ == '__main__':
+    test_duplicate_detector()
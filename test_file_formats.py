@@ -0,0 +1,158 @@
+import io
+import os
+import datetime
+import tempfile
+from sqlalchemy import create_engine, Column, Integer, String, Date, UniqueConstraint
+from sqlalchemy.orm import declarative_base, Session
+from test_api import temp_app, upload_csv
+from importer import iter_csv_rows, iter_parquet_rows, iter_file_rows, detect_csv_encoding, file_format, run_import
+
+# 测试CSV/Parquet导入：编码识别（UTF-8、带BOM的UTF-8、GBK）、分隔符识别，与Excel使用同一个验证与写入流程
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = 'inventory_data'
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    sku = Column(String(50), nullable=False)
+    product_name = Column(String(200))
+    inbound_quantity = Column(Integer)
+    outbound_quantity = Column(Integer)
+    inventory_balance = Column(Integer)
+    supplier = Column(String(100))
+    operator = Column(String(50))
+    remarks = Column(String(200))
+    __table_args__ = (UniqueConstraint('date', 'sku', name='uq_date_sku'),)
+
+
+def _csv_text(row_count, delimiter=','):
+    lines = [delimiter.join(["日期", "SKU", "产品名称", "入库数量", "出库数量", "库存余额", "供应商", "操作员", "备注"])]
+    for i in range(row_count):
+        lines.append(delimiter.join([f"2025/1/{i % 28 + 1}", f"SKU{i:05d}", f"产品{i}", "10", "5", "",
+                                     "供应商甲", "张三", '"备注，含分隔符"']))
+    # 没有日期的行应被跳过
+    lines.append(delimiter.join(["", "SKU-EMPTY", "空行"]))
+    return '\r\n'.join(lines) + '\r\n'
+
+
+def test_csv_encodings():
+    print("=== 测试CSV编码与分隔符识别 ===")
+    text = _csv_text(3000)
+    for encoding, expected in (('utf-8', 'utf-8-sig'), ('utf-8-sig', 'utf-8-sig'), ('gbk', 'gb18030')):
+        data = text.encode(encoding)
+        stream = io.BytesIO(data)
+        assert detect_csv_encoding(stream) == expected
+        assert stream.tell() == 0
+
+        rows = list(iter_csv_rows(stream))
+        print(f"{encoding}: {len(rows)}行，识别为{expected}")
+        assert len(rows) == 3000
+        assert rows[0] == ['2025/1/1', 'SKU00000', '产品0', '10', '5', '', '供应商甲', '张三', '备注，含分隔符']
+        # 不关闭调用方传入的文件
+        assert not stream.closed
+
+    rows = list(iter_csv_rows(io.BytesIO(_csv_text(10, ';').encode('gbk'))))
+    assert len(rows) == 10 and rows[-1][1] == 'SKU00009' and rows[-1][8] == '备注，含分隔符'
+
+    # 无法按支持的编码解码时报错
+    try:
+        list(iter_csv_rows(io.BytesIO(b'\xff\xfe\x00\x00' * 10)))
+        assert False, '无法识别编码时应抛出ValueError'
+    except ValueError as e:
+        print(e)
+
+
+def test_csv_import():
+    print("=== 测试CSV导入 ===")
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, '库存.CSV')
+        with open(path, 'wb') as f:
+            f.write(_csv_text(2500).encode('gbk'))
+        assert file_format(path) == 'csv'
+
+        with Session(engine) as session:
+            result = run_import(iter_file_rows(path, file_format(path)), session, Item, chunk_size=1000)
+            session.commit()
+            print(f"写入: {result.writer.written_count}")
+            assert result.ok and result.writer.written_count == 2500
+            item = session.query(Item).filter_by(sku='SKU00030').one()
+            assert item.date == datetime.date(2025, 1, 3)
+            assert (item.inbound_quantity, item.inventory_balance, item.supplier) == (10, 0, '供应商甲')
+
+    # 验证错误的行号与Excel相同（第1行是标题）
+    bad = "日期,SKU,产品名称,入库数量\n2025-01-05,SKU1,产品,10\n2025-01-06,SKU2,产品,十\n"
+    with Session(engine) as session:
+        result = run_import(iter_csv_rows(io.BytesIO(bad.encode('utf-8'))), session, Item)
+        session.rollback()
+        print(result.validation_errors)
+        assert result.validation_errors == ['第3行：入库数量必须为整数']
+
+
+class LegacySpooledFile(tempfile.SpooledTemporaryFile):
+    """Python 3.9/3.10的SpooledTemporaryFile：没有readable/writable/seekable"""
+
+    def __getattribute__(self, name):
+        if name in ('readable', 'writable', 'seekable'):
+            raise AttributeError(name)
+        return super().__getattribute__(name)
+
+
+def test_csv_upload():
+    print("=== 测试通过上传接口导入CSV ===")
+    data = _csv_text(300).encode('gbk')
+    # 上传的文件流是SpooledTemporaryFile：内存中（BytesIO）与超过阈值后写入的临时文件
+    for max_memory in (len(data) * 2, 1024):
+        stream = LegacySpooledFile(max_size=max_memory, mode='w+b')
+        stream.write(data)
+        stream.seek(0)
+        assert len(list(iter_csv_rows(stream))) == 300 and not stream.closed
+
+        with temp_app(UPLOAD_SPOOL_MAX_MEMORY=max_memory) as app:
+            response = upload_csv(app.test_client(), data)
+            print(f"内存阈值{max_memory}字节: {response.get_json()['message']}")
+            assert response.status_code == 200 and response.get_json()['data']['written'] == 300
+
+
+def test_unsupported_formats():
+    print("=== 测试不支持的格式 ===")
+    try:
+        iter_file_rows(io.BytesIO(b''), 'xls')
+        assert False, '不支持的格式应抛出ValueError'
+    except ValueError as e:
+        print(e)
+
+    try:
+        import pyarrow
+        import pyarrow.parquet as pq
+    except ImportError:
+        # 没有安装pyarrow时提示安装，而不是导入失败
+        try:
+            list(iter_parquet_rows(io.BytesIO(b'')))
+            assert False, '没有安装pyarrow时应抛出ValueError'
+        except ValueError as e:
+            print(e)
+        return
+
+    print("=== 测试Parquet读取 ===")
+    table = pyarrow.table({
+        '日期': [datetime.date(2025, 1, 5), None, datetime.date(2025, 1, 6)],
+        'SKU': ['SKU1', 'SKU-EMPTY', 'SKU2'],
+        '产品名称': ['产品A', None, '产品B'],
+        '入库数量': [10, 0, 20],
+    })
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    buffer.seek(0)
+    rows = list(iter_parquet_rows(buffer, batch_size=1))
+    assert rows == [(datetime.date(2025, 1, 5), 'SKU1', '产品A', 10), (datetime.date(2025, 1, 6), 'SKU2', '产品B', 20)]
+
+
+if __name__ == '__main__':
+    test_csv_encodings()
+    test_csv_import()
+    test_csv_upload()
+    test_unsupported_formats()
@@ -0,0 +1,155 @@
+import gzip
+import json
+import time
+from email.utils import formatdate
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request, Response
+from http_cache import make_etag, is_not_modified, set_validators, compress_response, brotli
+from config import Config
+from app import create_app, db, bump_data_version
+from test_api import temp_app, csv_rows, upload_csv
+
+# 测试读接口的ETag/Last-Modified条件请求与响应压缩
+
+
+def make_request(headers=None):
+    return Request(EnvironBuilder(path='/api/data', headers=headers or {}).get_environ())
+
+
+def test_etag():
+    print("=== 测试ETag ===")
+    etag = make_etag('1.1000', '/api/data', [('supplier', 'A'), ('page', '1')])
+    assert etag == make_etag('1.1000', '/api/data', [('page', '1'), ('supplier', 'A')])
+    assert etag != make_etag('2.2000', '/api/data', [('page', '1'), ('supplier', 'A')])
+    assert etag != make_etag('1.1000', '/api/data', [('page', '2'), ('supplier', 'A')])
+
+    changed_at = time.time() - 10
+    response = set_validators(Response('{}'), etag, changed_at)
+    assert response.headers['ETag'] == f'W/"{etag}"'
+    assert is_not_modified(make_request({'If-None-Match': response.headers['ETag']}), etag, changed_at)
+    assert not is_not_modified(make_request({'If-None-Match': 'W/"other"'}), etag, changed_at)
+    assert not is_not_modified(make_request(), etag, changed_at)
+
+    last_modified = response.headers['Last-Modified']
+    assert is_not_modified(make_request({'If-Modified-Since': last_modified}), etag, changed_at)
+    assert not is_not_modified(make_request({'If-Modified-Since': formatdate(changed_at - 60, usegmt=True)}),
+                               etag, changed_at)
+
+
+def test_compress():
+    print("=== 测试响应压缩 ===")
+    body = json.dumps({'items': [{'sku': f'SKU{i}', 'supplier': '供应商A'} for i in range(200)]})
+    response = Response(body, mimetype='application/json')
+    compress_response(response, make_request({'Accept-Encoding': 'gzip'}).accept_encodings)
+    print(f"原始 {len(body.encode())} 字节，gzip后 {len(response.get_data())} 字节")
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()).decode('utf-8') == body
+
+    small = Response('{"code":200}', mimetype='application/json')
+    compress_response(small, make_request({'Accept-Encoding': 'gzip'}).accept_encodings)
+    assert 'Content-Encoding' not in small.headers
+
+    plain = Response(body, mimetype='application/json')
+    compress_response(plain, make_request().accept_encodings)
+    assert 'Content-Encoding' not in plain.headers and plain.get_data(as_text=True) == body
+
+
+def test_conditional_requests():
+    print("=== 测试读接口的条件请求 ===")
+    with temp_app() as app:
+        client = app.test_client()
+        assert upload_csv(client, csv_rows(30)).status_code == 200
+
+        for url in ('/api/data?supplier=供应商1', '/api/suppliers', '/api/chart-data'):
+            response = client.get(url)
+            assert response.status_code == 200 and response.headers['Cache-Control'] == 'no-cache'
+            etag, last_modified = response.headers['ETag'], response.headers['Last-Modified']
+
+            cached = client.get(url, headers={'If-None-Match': etag})
+            print(f"{url}: If-None-Match → {cached.status_code}")
+            assert cached.status_code == 304 and not cached.get_data()
+            assert cached.headers['ETag'] == etag
+            assert client.get(url, headers={'If-Modified-Since': last_modified}).status_code == 304
+            assert client.get(url, headers={'If-Modified-Since': formatdate(time.time() - 3600, usegmt=True)}
+                              ).status_code == 200
+
+        # 导入提交后数据版本变化，旧ETag失效
+        url = '/api/data?supplier=供应商1'
+        etag = client.get(url).headers['ETag']
+        assert upload_csv(client, csv_rows(5, balance=100, sku_prefix='NEW')).status_code == 200
+        response = client.get(url, headers={'If-None-Match': etag})
+        print(f"导入后: {response.status_code}")
+        assert response.status_code == 200 and response.headers['ETag'] != etag
+        assert response.get_json()['data']['total'] == 17
+
+
+def test_response_encoding():
+    print("=== 测试读接口的压缩协商 ===")
+    with temp_app() as app:
+        client = app.test_client()
+        assert upload_csv(client, csv_rows(60)).status_code == 200
+        url = '/api/data?per_page=50'
+        plain = client.get(url)
+        assert 'Content-Encoding' not in plain.headers and 'Accept-Encoding' in plain.headers['Vary']
+        body = plain.get_data()
+        assert len(body) > app.config['COMPRESS_MIN_SIZE']
+
+        response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.get_data()) == body
+
+        response = client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+        print(f"Accept-Encoding: gzip, br → {response.headers['Content-Encoding']}")
+        if brotli is None:
+            assert response.headers['Content-Encoding'] == 'gzip'
+        else:
+            assert response.headers['Content-Encoding'] == 'br'
+            assert brotli.decompress(response.get_data()) == body
+
+        # 较小的响应不压缩
+        response = client.get('/api/suppliers', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200 and 'Content-Encoding' not in response.headers
+
+
+def test_shared_database():
+    print("=== 测试多个进程共用数据库时的ETag ===")
+    # 两个应用实例模拟共用同一数据库的两个进程，各自有独立的结果缓存
+    with temp_app(DATA_VERSION_TTL=0) as app:
+        other = create_app(type('OtherConfig', (Config,), {
+            'SQLALCHEMY_DATABASE_URI': app.config['SQLALCHEMY_DATABASE_URI'],
+            'DATA_VERSION_TTL': 0,
+            'DB_POOL_MODE': 'null',
+        }))
+        client, other_client = app.test_client(), other.test_client()
+        assert upload_csv(client, csv_rows(30)).status_code == 200
+
+        url = '/api/suppliers'
+        response = other_client.get(url)
+        etag = response.headers['ETag']
+        assert response.get_json()['data'] == ['供应商0', '供应商1']
+        assert other_client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+        # 经另一个实例导入后，旧ETag失效且不返回缓存的旧结果
+        assert upload_csv(client, csv_rows(5, supplier_count=3, sku_prefix='NEW')).status_code == 200
+        response = other_client.get(url, headers={'If-None-Match': etag})
+        print(f"另一实例导入后: {response.status_code} {response.get_json()['data']}")
+        assert response.status_code == 200 and response.headers['ETag'] != etag
+        assert response.get_json()['data'] == ['供应商0', '供应商1', '供应商2']
+
+        # 脚本直接修改数据后更新版本，同样使各实例的缓存失效
+        etag = response.headers['ETag']
+        with app.app_context():
+            bump_data_version()
+            db.session.commit()
+        response = other_client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200 and response.headers['ETag'] != etag
+        with other.app_context():
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    test_etag()
+    test_compress()
+    test_conditional_requests()
+    test_response_encoding()
+    test_shared_database()
@@ -0,0 +1,92 @@
+import io
+import os
+import datetime
+import hashlib
+import tempfile
+from sqlalchemy import create_engine, Column, Integer, String, Date, DateTime, UniqueConstraint, Index, select, func
+from sqlalchemy.orm import declarative_base, Session
+from importer import run_import, rollback_batch
+from uploads import file_sha256
+
+# 测试导入批次：文件内容哈希、每行记录batch_id、按批次撤销
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = 'inventory_data'
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    sku = Column(String(50), nullable=False)
+    product_name = Column(String(200))
+    inbound_quantity = Column(Integer)
+    outbound_quantity = Column(Integer)
+    inventory_balance = Column(Integer)
+    supplier = Column(String(100))
+    operator = Column(String(50))
+    remarks = Column(String(200))
+    batch_id = Column(Integer)
+    updated_at = Column(DateTime, default=func.now())
+    __table_args__ = (
+        UniqueConstraint('date', 'sku', name='uq_date_sku'),
+        Index('idx_batch_id', 'batch_id', 'date'),
+    )
+
+
+def test_file_sha256():
+    print("=== 测试文件内容哈希 ===")
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'a.xlsx')
+        with open(path, 'wb') as f:
+            f.write(data)
+        stream = io.BytesIO(data)
+        stream.seek(100)
+        # 文件路径与文件流结果相同，读取后文件流回到开头
+        assert file_sha256(path) == file_sha256(stream) == hashlib.sha256(data).hexdigest()
+        assert stream.tell() == 0
+        # 多个文件按顺序连续计算
+        assert file_sha256(path, io.BytesIO(b'tail')) == hashlib.sha256(data + b'tail').hexdigest()
+
+
+def _rows(skus, day, balance):
+    return [(f'2025-01-{day:02d}', sku, '产品', 1, 0, balance, '供应商A') for sku in skus]
+
+
+def test_batch_rollback():
+    print("=== 测试按批次撤销导入 ===")
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    table = Item.__table__
+    with Session(engine) as session:
+        run_import(iter(_rows(['A', 'B', 'C'], 5, 1) + _rows(['A'], 6, 1)), session, Item, batch_id=1)
+        run_import(iter(_rows(['D', 'E'], 6, 2)), session, Item, batch_id=2)
+        # 覆盖模式更新的行改为属于新批次
+        result = run_import(iter(_rows(['C', 'F'], 5, 3)), session, Item, mode='overwrite', batch_id=3)
+        assert result.ok
+        session.commit()
+
+        counts = dict(session.execute(select(Item.batch_id, func.count()).group_by(Item.batch_id)).all())
+        print(counts)
+        assert counts == {1: 3, 2: 2, 3: 2}
+
+        deleted, dates = rollback_batch(session.connection(), table, 1)
+        session.commit()
+        print(f"删除: {deleted}, 日期: {sorted(dates)}")
+        assert deleted == 3
+        assert dates == {datetime.date(2025, 1, 5), datetime.date(2025, 1, 6)}
+        assert sorted(session.scalars(select(Item.sku)).all()) == ['C', 'D', 'E', 'F']
+
+        # 已撤销的批次没有数据，再次撤销不影响其他批次
+        assert rollback_batch(session.connection(), table, 1) == (0, set())
+        assert session.scalar(select(func.count()).select_from(table)) == 4
+
+    # 不指定批次时不写入batch_id（兼容没有该列的表）
+    with Session(engine) as session:
+        run_import(iter(_rows(['G'], 7, 1)), session, Item)
+        assert session.scalar(select(Item.batch_id).where(Item.sku == 'G')) is None
+
+
+if __name__ == '__main__':
+    test_file_sha256()
+    test_batch_rollback()
@@ -0,0 +1,88 @@
+import io
+import time
+from jobs import ImportJob, JobManager
+from test_api import temp_app, csv_rows, upload_csv
+
+# 测试后台导入任务队列
+
+
+def _wait(job, timeout=5):
+    deadline = time.time() + timeout
+    while job.status not in ('succeeded', 'failed') and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_job_lifecycle():
+    print("=== 测试导入任务状态流转 ===")
+    manager = JobManager(max_workers=2)
+
+    def fake_import(job, rows):
+        job.progress.rows_parsed = rows
+        job.progress.rows_written = rows
+        job.progress.finish()
+        return {'code': 200, 'message': f'导入成功，共导入{rows}条数据。'}, 200
+
+    job = ImportJob('a.xlsx', 'reject')
+    manager.submit(job, fake_import, job, 10)
+    _wait(job)
+    info = job.to_dict()
+    print(info)
+    assert info['status'] == 'succeeded'
+    assert info['progress']['rows_written'] == 10
+    assert manager.get(job.id) is job
+
+    def failing_import():
+        raise RuntimeError('磁盘已满')
+
+    failed = manager.submit(ImportJob('b.xlsx', 'skip'), failing_import)
+    _wait(failed)
+    assert failed.status == 'failed'
+    assert '磁盘已满' in failed.result['message']
+    assert [j.id for j in manager.list()] == [failed.id, job.id]
+
+
+def test_job_history_limit():
+    print("=== 测试任务记录数量上限 ===")
+    manager = JobManager(max_workers=1, history_size=3)
+    jobs = [manager.submit(ImportJob(f'{i}.xlsx', 'reject'), lambda: ({'code': 200}, 200)) for i in range(5)]
+    for job in jobs:
+        _wait(job)
+    manager.submit(ImportJob('last.xlsx', 'reject'), lambda: ({'code': 200}, 200))
+    assert len(manager.list()) <= 3
+
+
+def test_concurrent_sqlite_imports():
+    print("=== 测试SQLite上的并发导入 ===")
+    # 等待写锁的时间很短：没有按进程串行导入时，重叠的导入会立即报database is locked
+    with temp_app(IMPORT_WORKERS=2, SQLITE_BUSY_TIMEOUT=50) as app:
+        client = app.test_client()
+        jobs = []
+        for prefix in ('A', 'B'):
+            response = client.post('/api/upload', data={
+                'file': (io.BytesIO(csv_rows(20000, day_count=28, sku_prefix=prefix)), f'{prefix}.csv'),
+                'async': '1'
+            })
+            assert response.status_code == 202
+            jobs.append(response.get_json()['data']['id'])
+        # 后台任务进行中的同步导入
+        response = upload_csv(client, csv_rows(3000, sku_prefix='C'))
+        print(f"同步导入: {response.get_json()['message']}")
+        assert response.status_code == 200
+
+        for job_id in jobs:
+            deadline = time.time() + 60
+            while True:
+                job = client.get(f'/api/upload/jobs/{job_id}').get_json()['data']
+                if job['status'] in ('succeeded', 'failed') or time.time() > deadline:
+                    break
+                time.sleep(0.05)
+            print(f"{job['filename']}: {job['status']} {job['result']['message']}")
+            assert job['status'] == 'succeeded'
+        assert client.get('/api/data?per_page=1').get_json()['data']['total'] == 43000
+
+
+if __name__ == '__main__':
+    test_job_lifecycle()
+    test_job_history_limit()
+    test_concurrent_sqlite_imports()
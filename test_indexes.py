@@ -0,0 +1,67 @@
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Date, Index, select
+from indexes import ensure_indexes, find_missing_indexes, find_obsolete_indexes, explain, \
+    classify_sqlite_plan, classify_mysql_plan, SEARCH, INDEX_SCAN, FULL_SCAN
+
+# 测试按模型补齐/删除索引与EXPLAIN执行计划分类
+
+
+def make_table(metadata, *indexes):
+    return Table(
+        'inventory_data', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('date', Date, nullable=False),
+        Column('sku', String(50), nullable=False),
+        Column('supplier', String(100)),
+        *indexes
+    )
+
+
+def test_ensure_indexes():
+    print("=== 测试补齐索引 ===")
+    engine = create_engine('sqlite://')
+    # 旧版本的表结构：单列索引
+    legacy = make_table(MetaData(), Index('ix_inventory_data_sku', 'sku'))
+    legacy.create(engine)
+
+    table = make_table(MetaData(), Index('idx_date_id', 'date', 'id'), Index('idx_sku_date', 'sku', 'date'))
+    with engine.begin() as conn:
+        assert [index.name for index in find_missing_indexes(conn, table)] == ['idx_date_id', 'idx_sku_date']
+        assert find_obsolete_indexes(conn, table) == ['ix_inventory_data_sku']
+
+        created, dropped = ensure_indexes(conn, table)
+        assert created == ['idx_date_id', 'idx_sku_date'] and dropped == []
+        assert find_obsolete_indexes(conn, table, keep=('ix_inventory_data_sku',)) == []
+
+        created, dropped = ensure_indexes(conn, table, drop_obsolete=True)
+        print(created, dropped)
+        assert created == [] and dropped == ['ix_inventory_data_sku']
+
+        # 列尚未迁移的索引跳过，不影响其他索引
+        pending = make_table(MetaData(), Column('batch_id', Integer), Index('idx_date_id', 'date', 'id'),
+                             Index('idx_batch_id', 'batch_id'))
+        assert ensure_indexes(conn, pending) == ([], [])
+        conn.exec_driver_sql('ALTER TABLE inventory_data ADD COLUMN batch_id INTEGER')
+        assert ensure_indexes(conn, pending) == (['idx_batch_id'], [])
+
+        kind, details = explain(conn, select(table.c.id).where(table.c.sku == 'A').order_by(table.c.date))
+        print(kind, details)
+        assert kind == SEARCH
+        kind, _ = explain(conn, select(table.c.id).where(table.c.supplier == 'A'))
+        assert kind == FULL_SCAN
+
+
+def test_classify_plans():
+    print("=== 测试执行计划分类 ===")
+    assert classify_sqlite_plan(['SCAN inventory_data']) == FULL_SCAN
+    assert classify_sqlite_plan(['SCAN inventory_data USING INDEX idx_date_id']) == INDEX_SCAN
+    assert classify_sqlite_plan(['SEARCH inventory_data USING INDEX idx_sku_date (sku=?)',
+                                 'USE TEMP B-TREE FOR ORDER BY']) == SEARCH
+    assert classify_sqlite_plan(['SEARCH inventory_data USING INTEGER PRIMARY KEY (rowid=?)',
+                                 'SCAN inventory_product_fts VIRTUAL TABLE INDEX 0:M1']) == INDEX_SCAN
+    assert classify_mysql_plan([{'table': 'inventory_data', 'type': 'ref', 'key': 'idx_sku_date'}]) == SEARCH
+    assert classify_mysql_plan([{'table': 'inventory_data', 'type': 'ALL', 'key': None}]) == FULL_SCAN
+
+
+if __name__ == '__main__':
+    test_ensure_indexes()
+    test_classify_plans()
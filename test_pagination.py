@@ -0,0 +1,23 @@
+import datetime
+from pagination import encode_cursor, decode_cursor
+
+# 测试游标分页的游标编码
+
+
+def test_cursor_round_trip():
+    print("=== 测试游标编码 ===")
+    cursor = encode_cursor(datetime.date(2025, 1, 5), 12345)
+    print(f"游标: {cursor}")
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (datetime.date(2025, 1, 5), 12345)
+
+    for invalid in ('', 'garbage', encode_cursor(datetime.date(2025, 1, 5), 1)[:-3]):
+        try:
+            decode_cursor(invalid)
+            assert False, f"无效游标未报错: {invalid}"
+        except ValueError:
+            pass
+
+
+if __name__ == '__main__':
+    test_cursor_round_trip()
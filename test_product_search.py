@@ -0,0 +1,90 @@
+import datetime
+import os
+import tempfile
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Date, select, insert, update, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from search import ProductNameSearch, register_search_index, install_search_index, search_index_exists
+
+# 测试产品名称全文索引：与LIKE结果一致、导入（插入/覆盖/删除）时保持同步、无索引时回退
+
+
+def make_table(metadata):
+    return Table(
+        'inventory_data', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('date', Date, nullable=False),
+        Column('sku', String(50), nullable=False),
+        Column('product_name', String(200)),
+    )
+
+
+NAMES = ['苹果手机壳', '华为手机充电器', 'USB-C Cable', 'usb hub', '蓝牙耳机', None, '手机支架 100%', '机械键盘']
+TERMS = ['手机', '手机壳', '充电器', 'usb', 'USB-C', 'cable', '100%', '蓝牙耳机', '不存在的产品', '机', '_']
+
+
+def make_engine(tmpdir):
+    # 使用文件数据库：内存数据库的所有连接共用同一个连接，检查索引时会回滚测试中的事务
+    return create_engine(f"sqlite:///{os.path.join(tmpdir, 'search.db')}")
+
+
+def ids(conn, table, condition):
+    return [row[0] for row in conn.execute(select(table.c.id).where(condition).order_by(table.c.id))]
+
+
+def test_matches_like_and_stays_in_sync():
+    print("=== 测试全文索引与LIKE结果一致 ===")
+    metadata = MetaData()
+    table = make_table(metadata)
+    register_search_index(table)
+    engine = make_engine(tempfile.mkdtemp())
+    metadata.create_all(engine)
+    search = ProductNameSearch()
+    day = datetime.date(2025, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(insert(table), [{'date': day, 'sku': f'S{i}', 'product_name': name}
+                                     for i, name in enumerate(NAMES)])
+        assert search_index_exists(conn)
+
+        def check():
+            for term in TERMS:
+                expected = ids(conn, table, table.c.product_name.like(f'%{term}%'))
+                actual = ids(conn, table, search.condition(table.c.id, table.c.product_name, term, engine))
+                assert actual == expected, (term, actual, expected)
+
+        check()
+        # 覆盖导入（upsert）与修改、删除后索引同步
+        statement = sqlite_insert(table).values(id=1, date=day, sku='S0', product_name='小米手机')
+        conn.execute(statement.on_conflict_do_update(index_elements=['id'], set_={'product_name': '小米手机'}))
+        conn.execute(update(table).where(table.c.sku == 'S1').values(product_name='无线鼠标'))
+        conn.execute(delete(table).where(table.c.sku == 'S4'))
+        check()
+        print(ids(conn, table, search.condition(table.c.id, table.c.product_name, '手机', engine)))
+        assert ids(conn, table, search.condition(table.c.id, table.c.product_name, '手机', engine)) == [1, 7]
+
+    # 条件中确实使用了FTS表
+    compiled = str(search.condition(table.c.id, table.c.product_name, '手机壳', engine))
+    assert 'inventory_product_fts' in compiled
+
+
+def test_fallback_without_index():
+    print("=== 测试无全文索引时回退到LIKE ===")
+    metadata = MetaData()
+    table = make_table(metadata)
+    engine = make_engine(tempfile.mkdtemp())
+    metadata.create_all(engine)
+    search = ProductNameSearch()
+    condition = search.condition(table.c.id, table.c.product_name, '手机壳', engine)
+    assert 'inventory_product_fts' not in str(condition)
+
+    # 为已有数据库补建索引并回填
+    with engine.begin() as conn:
+        conn.execute(insert(table), [{'date': datetime.date(2025, 1, 1), 'sku': 'S1', 'product_name': '苹果手机壳'}])
+        assert install_search_index(conn)
+        search.available = None
+        assert ids(conn, table, search.condition(table.c.id, table.c.product_name, '手机壳', engine)) == [1]
+
+
+if __name__ == '__main__':
+    test_matches_like_and_stays_in_sync()
+    test_fallback_without_index()
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import tempfile
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import create_engine, text
+from db_config import build_binds, RoutingSession, READ_BIND
+from test_api import temp_app, csv_rows, upload_csv
+
+# 测试读写分离：只读请求的查询使用读库，写入（flush）始终使用主库
+
+
+def test_routing():
+    print("=== 测试读写库路由 ===")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        primary = os.path.join(tmpdir, 'primary.db')
+        replica = os.path.join(tmpdir, 'replica.db')
+
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{primary}'
+        app.config['SQLALCHEMY_BINDS'] = build_binds({'DATABASE_READ_URL': f'sqlite:///{replica}'})
+        db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+
+        class Item(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(50))
+
+        with app.app_context():
+            assert READ_BIND in db.engines
+            db.create_all()
+            db.session.add(Item(name='主库'))
+            db.session.commit()
+            # 读库中放入不同的数据，用于区分查询来自哪个库
+            replica_engine = create_engine(f'sqlite:///{replica}')
+            Item.__table__.create(replica_engine)
+            with replica_engine.begin() as conn:
+                conn.execute(text("INSERT INTO item (name) VALUES ('读库')"))
+            replica_engine.dispose()
+
+        with app.app_context():
+            db.session.info['read_only'] = True
+            names = [item.name for item in Item.query.all()]
+            print(names)
+            assert names == ['读库']
+
+            # 只读标记下的写入仍然flush到主库
+            db.session.add(Item(name='新数据'))
+            db.session.commit()
+            db.session.info['read_only'] = False
+            assert [item.name for item in Item.query.order_by(Item.id)] == ['主库', '新数据']
+
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+def test_without_read_url():
+    assert build_binds({'DATABASE_READ_URL': None}) == {}
+
+
+def replicate(app, replica):
+    """把主库复制到读库文件，之后的写入只在主库中，模拟复制延迟"""
+    source = sqlite3.connect(app.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):])
+    target = sqlite3.connect(replica)
+    source.backup(target)
+    source.close()
+    target.close()
+
+
+def test_read_after_write():
+    print("=== 测试数据变更后只读接口使用主库 ===")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        replica = os.path.join(tmpdir, 'replica.db')
+        with temp_app(DATABASE_READ_URL=f'sqlite:///{replica}', DATA_VERSION_TTL=0) as app:
+            client = app.test_client()
+            assert upload_csv(client, csv_rows(30)).status_code == 200
+            replicate(app, replica)
+            assert upload_csv(client, csv_rows(5, supplier_count=3, sku_prefix='NEW')).status_code == 200
+
+            # 读库还没有同步新导入的数据，变更后的窗口期内查询主库，缓存和ETag对应新数据
+            suppliers = client.get('/api/suppliers').get_json()['data']
+            print(f"导入后: {suppliers}")
+            assert suppliers == ['供应商0', '供应商1', '供应商2']
+            assert client.get('/api/suppliers').get_json()['data'] == suppliers
+
+            # 窗口期过后使用读库
+            app.config['READ_AFTER_WRITE_SECONDS'] = 0
+            assert client.get('/api/data?supplier=供应商2').get_json()['data']['total'] == 0
+
+
+if __name__ == '__main__':
+    test_routing()
+    test_without_read_url()
+    test_read_after_write()
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from cache import MemoryCacheBackend, ResultCache
+
+# 测试查询结果缓存：LRU/过期淘汰、数据版本失效、命中统计与可替换的存储后端
+
+
+class DictBackend:
+    """测试用的字典存储，代替Redis验证后端接口"""
+
+    name = 'dict'
+
+    def __init__(self):
+        self.values = {}
+        self.counters = {}
+        self.meta = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ttl):
+        self.values[key] = value
+
+    def get_counter(self, key):
+        return self.counters.get(key, 0)
+
+    def incr(self, key):
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    def get_meta(self, key):
+        return self.meta.get(key)
+
+    def set_meta(self, key, value, only_if_missing=False):
+        if not only_if_missing or key not in self.meta:
+            self.meta[key] = value
+
+    def size(self):
+        return len(self.values)
+
+    def clear(self):
+        self.values.clear()
+
+
+def test_memory_backend_eviction():
+    print("=== 测试LRU与过期淘汰 ===")
+    backend = MemoryCacheBackend(max_size=2)
+    backend.set('a', 1, 60)
+    backend.set('b', 2, 60)
+    assert backend.get('a') == 1  # a变为最近使用
+    backend.set('c', 3, 60)
+    assert backend.get('b') is None and backend.get('a') == 1 and backend.get('c') == 3
+
+    backend.set('d', 4, 0.05)  # 淘汰最久未使用的a
+    assert backend.get('a') is None
+    time.sleep(0.1)
+    assert backend.get('d') is None
+    assert backend.size() == 1
+
+
+def test_version_invalidation_and_stats():
+    print("=== 测试数据版本失效与命中统计 ===")
+    cache = ResultCache(DictBackend(), ttl=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'code': 200, 'data': len(calls)}
+
+    # 参数顺序不同视为同一查询
+    assert cache.get_or_compute('suppliers', [('a', '1'), ('b', '2')], compute)['data'] == 1
+    assert cache.get_or_compute('suppliers', [('b', '2'), ('a', '1')], compute)['data'] == 1
+    assert cache.get_or_compute('chart-data', [('a', '1'), ('b', '2')], compute)['data'] == 2
+
+    tag, changed_at = cache.version_info()
+    cache.bump_version()
+    new_tag, new_changed_at = cache.version_info()
+    # 同一秒内的变更也要使秒级的Last-Modified前进
+    assert new_tag != tag and int(new_changed_at) > int(changed_at)
+    assert cache.get_or_compute('suppliers', [('a', '1'), ('b', '2')], compute)['data'] == 3
+
+    stats = cache.stats()
+    print(stats)
+    assert stats['backend'] == 'dict' and stats['data_version'] == 1
+    assert stats['hits'] == 1 and stats['misses'] == 3
+
+
+def test_disabled_cache():
+    cache = ResultCache(MemoryCacheBackend(), enabled=False)
+    calls = []
+    for _ in range(2):
+        cache.get_or_compute('suppliers', [], lambda: calls.append(1) or ['A'])
+    assert len(calls) == 2
+
+
+def test_get_or_compute_async():
+    print("=== 测试异步查询的结果缓存 ===")
+    cache = ResultCache(DictBackend(), ttl=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return {'code': 200, 'data': len(calls)}
+
+    async def run():
+        first = await cache.get_or_compute_async('data', [('page', '1')], compute)
+        second = await cache.get_or_compute_async('data', [('page', '1')], compute)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == {'code': 200, 'data': 1}
+    # 与同步接口共用缓存和统计
+    assert cache.get_or_compute('data', [('page', '1')], lambda: None)['data'] == 1
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 1
+
+
+if __name__ == '__main__':
+    test_memory_backend_eviction()
+    test_version_invalidation_and_stats()
+    test_disabled_cache()
+    test_get_or_compute_async()
@@ -0,0 +1,95 @@
+import hashlib
+import io
+import os
+import tempfile
+import time
+from uploads import ResumableUploadStore
+
+# 测试分片续传：乱序上传、中断后按已接收分片续传、分片大小与校验值检查、整个文件校验、过期会话清理
+
+
+def _chunks(data, chunk_size):
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def test_resumable_upload():
+    print("=== 测试分片续传 ===")
+    data = os.urandom(10 * 1024 + 123)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ResumableUploadStore(os.path.join(tmpdir, 'sessions'), chunk_size=1024, max_size=1024 * 1024, ttl=3600)
+        meta = store.create('库存.xlsx', len(data), hashlib.sha256(data).hexdigest())
+        assert meta['total_chunks'] == 11
+        chunks = _chunks(data, 1024)
+
+        # 乱序上传一部分后中断
+        for index in (3, 0, 10):
+            store.write_chunk(store.load(meta['id']), index, io.BytesIO(chunks[index]),
+                              hashlib.sha256(chunks[index]).hexdigest())
+        resumed = store.describe(store.load(meta['id']))
+        print(resumed)
+        assert resumed['received'] == [0, 3, 10]
+        try:
+            store.complete(meta)
+            assert False, '缺少分片时不能完成'
+        except ValueError as e:
+            print(e)
+        assert store.load(meta['id']) is not None
+
+        # 校验值不一致、大小不正确的分片不会标记为已接收
+        for body, checksum in ((chunks[1], hashlib.sha256(b'other').hexdigest()), (chunks[1][:100], None),
+                               (chunks[1] + b'x', None)):
+            try:
+                store.write_chunk(meta, 1, io.BytesIO(body), checksum)
+                assert False, '错误的分片应抛出ValueError'
+            except ValueError as e:
+                print(e)
+        assert 1 not in store.received(meta)
+
+        # 续传缺少的分片，已接收的分片可以重传
+        for index in resumed['received'] + [i for i in range(11) if i not in resumed['received']]:
+            store.write_chunk(meta, index, io.BytesIO(chunks[index]))
+        path = store.complete(meta)
+        with open(path, 'rb') as f:
+            assert f.read() == data
+        store.discard(meta['id'])
+        assert store.load(meta['id']) is None
+
+
+def test_file_checksum_and_limits():
+    print("=== 测试整个文件校验与会话限制 ===")
+    data = b'0123456789' * 300
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ResumableUploadStore(os.path.join(tmpdir, 'sessions'), chunk_size=1000, max_size=2000, ttl=3600)
+        for size in (0, 2001):
+            try:
+                store.create('a.xlsx', size)
+                assert False, '文件大小超出范围应抛出ValueError'
+            except ValueError as e:
+                print(e)
+
+        store.max_size = 1024 * 1024
+        meta = store.create('a.xlsx', len(data), hashlib.sha256(b'different').hexdigest())
+        for index, chunk in enumerate(_chunks(data, 1000)):
+            store.write_chunk(meta, index, io.BytesIO(chunk))
+        try:
+            store.complete(meta)
+            assert False, '文件校验失败应抛出ValueError'
+        except ValueError as e:
+            print(e)
+        # 校验失败的会话被删除，需要重新上传
+        assert store.load(meta['id']) is None
+
+        # 非法的会话ID（路径穿越）视为不存在
+        assert store.load('../sessions') is None
+
+        # 超过ttl没有上传分片的会话在创建新会话时清理
+        stale = store.create('b.xlsx', 10)
+        past = time.time() - 7200
+        os.utime(os.path.join(store.root, stale['id'], 'meta.json'), (past, past))
+        store.create('c.xlsx', 10)
+        assert store.load(stale['id']) is None
+
+
+if __name__ == '__main__':
+    test_resumable_upload()
+    test_file_checksum_and_limits()
@@ -0,0 +1,81 @@
+import datetime
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, BigInteger, String, Date, select, insert, update
+from rollup import refresh_daily_rollup, rebuild_daily_rollup, rollup_available
+
+# 测试 日期 × 供应商 汇总表的刷新与重建
+
+metadata = MetaData()
+inventory_data = Table(
+    'inventory_data', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('date', Date, nullable=False),
+    Column('sku', String(50), nullable=False),
+    Column('inventory_balance', Integer),
+    Column('supplier_id', Integer),
+)
+daily_supplier = Table(
+    'inventory_daily_supplier', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('date', Date, nullable=False),
+    Column('supplier_id', Integer),
+    Column('total_balance', BigInteger),
+    Column('row_count', Integer, nullable=False, default=0),
+)
+
+DAY1 = datetime.date(2025, 1, 1)
+DAY2 = datetime.date(2025, 1, 2)
+
+
+def _rollup(conn):
+    rows = conn.execute(select(daily_supplier.c.date, daily_supplier.c.supplier_id,
+                               daily_supplier.c.total_balance, daily_supplier.c.row_count)).all()
+    return sorted(rows, key=lambda row: (row[0], row[1] or 0))
+
+
+def test_refresh_and_rebuild():
+    print("=== 测试汇总表刷新与重建 ===")
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(inventory_data), [
+            {'date': DAY1, 'sku': 'A', 'inventory_balance': 10, 'supplier_id': 1},
+            {'date': DAY1, 'sku': 'B', 'inventory_balance': 5, 'supplier_id': 1},
+            {'date': DAY1, 'sku': 'C', 'inventory_balance': 7, 'supplier_id': None},
+            {'date': DAY2, 'sku': 'A', 'inventory_balance': 8, 'supplier_id': 2},
+        ])
+        rebuild_daily_rollup(conn, inventory_data, daily_supplier)
+        print(_rollup(conn))
+        assert _rollup(conn) == [(DAY1, None, 7, 1), (DAY1, 1, 15, 2), (DAY2, 2, 8, 1)]
+
+        # 覆盖导入改变了供应商和余额，只刷新受影响的日期
+        conn.execute(update(inventory_data).where(inventory_data.c.sku == 'B')
+                     .values(supplier_id=2, inventory_balance=50))
+        refresh_daily_rollup(conn, inventory_data, daily_supplier, {DAY1})
+        print(_rollup(conn))
+        assert _rollup(conn) == [(DAY1, None, 7, 1), (DAY1, 1, 10, 1), (DAY1, 2, 50, 1), (DAY2, 2, 8, 1)]
+
+
+def test_rollup_available():
+    print("=== 测试汇总表是否可用 ===")
+    engine = create_engine('sqlite://')
+    inventory_data.create(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(inventory_data), [
+            {'date': DAY1, 'sku': 'A', 'inventory_balance': 10, 'supplier_id': 1},
+            {'date': DAY2, 'sku': 'A', 'inventory_balance': 8, 'supplier_id': 1},
+        ])
+        # 汇总表不存在
+        assert not rollup_available(conn, inventory_data, daily_supplier)
+        # 汇总表为空
+        daily_supplier.create(conn)
+        assert not rollup_available(conn, inventory_data, daily_supplier)
+        # 只汇总了升级后导入的日期，历史数据未回填
+        refresh_daily_rollup(conn, inventory_data, daily_supplier, {DAY2})
+        assert not rollup_available(conn, inventory_data, daily_supplier)
+        rebuild_daily_rollup(conn, inventory_data, daily_supplier)
+        assert rollup_available(conn, inventory_data, daily_supplier)
+
+
+if __name__ == '__main__':
+    test_refresh_and_rebuild()
+    test_rollup_available()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+from bench_cold_start import measure_startup, LAZY_MODULES
+
+# 测试应用冷启动开销：导入app与create_app()不加载只在上传/导出等场景使用的模块、不连接数据库、
+# 不创建上传目录，导入耗时不超过预算（机器较慢时可通过环境变量调整预算）
+
+# 项目模块自身的导入耗时（不含Flask、SQLAlchemy等依赖），单位毫秒
+PROJECT_IMPORT_BUDGET_MS = float(os.getenv('PROJECT_IMPORT_BUDGET_MS', 100))
+# 导入app（含依赖）的总耗时
+APP_IMPORT_BUDGET_MS = float(os.getenv('APP_IMPORT_BUDGET_MS', 2000))
+
+
+def test_cold_start():
+    print("=== 测试应用冷启动 ===")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = os.path.join(tmpdir, 'startup.db')
+        upload_dir = os.path.join(tmpdir, 'uploads')
+        result = measure_startup({
+            'DATABASE_URL': f'sqlite:///{database}',
+            'DB_POOL_MODE': 'null',
+            'UPLOAD_FOLDER': upload_dir,
+        })
+        print(f"导入app {result['import_ms']:.0f}ms，项目模块 {result['project_ms']:.1f}ms，"
+              f"create_app() {result['create_ms']:.1f}ms")
+
+        loaded = [name for name in LAZY_MODULES if name in result['loaded']]
+        assert not loaded, f'启动时加载了可延迟的模块：{loaded}'
+        # 创建应用不连接数据库（SQLite文件在第一次连接时才创建），也不创建上传目录
+        assert not os.path.exists(database)
+        assert not os.path.exists(upload_dir)
+
+        assert result['project_ms'] <= PROJECT_IMPORT_BUDGET_MS, \
+            f"项目模块导入耗时 {result['project_ms']:.1f}ms 超过预算 {PROJECT_IMPORT_BUDGET_MS}ms"
+        assert result['import_ms'] <= APP_IMPORT_BUDGET_MS, \
+            f"导入app耗时 {result['import_ms']:.0f}ms 超过预算 {APP_IMPORT_BUDGET_MS}ms"
+
+
+if __name__ == '__main__':
+    test_cold_start()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import datetime
+import openpyxl
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Text
+from date_parser import parse_date_flexible
+from importer import iter_excel_rows, iter_chunks, convert_rows, text_field_lengths, DimensionWriter
+
+# 测试流式读取Excel与分批处理
+
+
+def _create_excel(path, row_count):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("库存数据")
+    ws.append(["日期", "SKU", "产品名称", "入库数量", "出库数量", "库存余额", "供应商", "操作员", "备注"])
+    for i in range(row_count):
+        ws.append([f"2025-01-{i % 28 + 1:02d}", f"SKU{i:05d}", f"产品{i}", 10, 5, 5, "供应商A", "张三", None])
+    # 没有日期的行应被跳过
+    ws.append([None, "SKU-EMPTY", "空行", 0, 0, 0, None, None, None])
+    wb.save(path)
+
+
+def test_iter_excel_rows():
+    print("=== 测试流式读取Excel ===")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'stream.xlsx')
+        _create_excel(path, 2500)
+
+        rows = list(iter_excel_rows(path))
+        print(f"读取行数: {len(rows)}")
+        assert len(rows) == 2500
+        assert rows[0][1] == 'SKU00000'
+        assert rows[-1][1] == 'SKU02499'
+
+
+def test_iter_chunks():
+    print("=== 测试分批切分 ===")
+    chunks = list(iter_chunks(iter(range(2500)), 1000))
+    print(f"批次大小: {[len(c) for c in chunks]}")
+    assert [len(c) for c in chunks] == [1000, 1000, 500]
+    assert list(iter_chunks(iter([]), 1000)) == []
+
+
+def test_convert_rows():
+    print("=== 测试单次遍历的行转换与验证 ===")
+    rows = [
+        ('2025/1/5', 'SKU001', '产品A', 100, None, '80', '供应商A', None, None),
+        ('2025-13-40', '', None, 'abc', 1, 2),
+        ('2025.1.6', 'SKU002'),
+        ('2025-01-07',),
+    ]
+    records, errors = convert_rows(rows, 2, parse_date_flexible)
+    for error in errors:
+        print(error)
+
+    assert [r.sku for r in records] == ['SKU001', 'SKU002']
+    first = records[0]
+    assert first.date == datetime.date(2025, 1, 5)
+    assert (first.inbound_quantity, first.outbound_quantity, first.inventory_balance) == (100, 0, 80)
+    assert first.to_params()['supplier'] == '供应商A'
+    assert first.row_no == 2 and first.raw_date == '2025/1/5'
+    assert records[1].product_name is None and records[1].row_no == 4
+
+    assert len(errors) == 4
+    assert errors[0].startswith("第3行：日期格式错误")
+    assert errors[1] == "第3行：SKU不能为空"
+    assert errors[2] == "第3行：入库数量必须为整数"
+    assert errors[3] == "第5行：数据不完整，至少需要日期和SKU"
+
+
+def test_text_lengths():
+    print("=== 测试文本字段长度验证 ===")
+    metadata = MetaData()
+    inventory = Table('inventory_data', metadata, Column('id', Integer, primary_key=True),
+                      Column('sku', String(10)), Column('product_name', String(20)), Column('supplier_id', Integer),
+                      Column('operator', String(5)), Column('remarks', Text))
+    suppliers = Table('suppliers', metadata, Column('id', Integer, primary_key=True), Column('name', String(8)))
+    products = Table('products', metadata, Column('id', Integer, primary_key=True),
+                     Column('sku', String(10)), Column('product_name', String(12)))
+    # 供应商名称与产品名称按维度表中较小的长度，Text列不检查
+    with create_engine('sqlite://').connect() as conn:
+        lengths = text_field_lengths(inventory, DimensionWriter(conn, suppliers, products))
+    assert lengths == {'sku': 10, 'product_name': 12, 'supplier': 8, 'operator': 5}
+    assert text_field_lengths(inventory) == {'sku': 10, 'product_name': 20, 'operator': 5}
+
+    rows = [
+        ('2025-01-05', 'SKU0000001', '产品' * 6, 1, 0, 1, '供应商' * 2, '张三', '备注' * 100),
+        ('2025-01-05', 'SKU00000001', '产品' * 7, 1, 0, 1, '供应商' * 3, '张三'),
+    ]
+    records, errors = convert_rows(rows, 2, parse_date_flexible, lengths)
+    print(errors)
+    # 超长的行不写入（不被数据库截断），每个超长的字段报告一条错误
+    assert [record.sku for record in records] == ['SKU0000001']
+    assert errors == ['第3行：SKU长度不能超过10个字符', '第3行：产品名称长度不能超过12个字符',
+                      '第3行：供应商长度不能超过8个字符']
+
+
+if __name__ == '__main__':
+    test_iter_excel_rows()
+    test_iter_chunks()
+    test_convert_rows()
+    test_text_lengths()
@@ -0,0 +1,89 @@
+import io
+import openpyxl
+from flask import Flask, request, jsonify
+from importer import iter_excel_rows
+from uploads import SpooledUploadRequest, spool_copy
+
+# 测试上传文件在内存中解析：不超过阈值时不写入磁盘，超过时写入匿名临时文件；后台任务使用的副本在请求结束后仍可读取
+
+
+def _workbook_bytes(row_count):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("库存数据")
+    ws.append(["日期", "SKU", "产品名称", "入库数量", "出库数量", "库存余额", "供应商"])
+    for i in range(row_count):
+        ws.append([f"2025-01-{i % 28 + 1:02d}", f"SKU{i:05d}", f"产品{i}", 10, 5, 5, "供应商A"])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def _make_app(max_memory):
+    app = Flask(__name__)
+    app.config['UPLOAD_SPOOL_MAX_MEMORY'] = max_memory
+    app.request_class = SpooledUploadRequest
+    copies = []
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        stream = request.files['file'].stream
+        copies.append(spool_copy(stream, max_memory))
+        rows = list(iter_excel_rows(stream))
+        return jsonify({'rows': len(rows), 'last_sku': rows[-1][1], 'on_disk': stream._rolled})
+
+    return app, copies
+
+
+def test_spooled_upload():
+    print("=== 测试上传文件在内存中解析 ===")
+    data = _workbook_bytes(2000)
+    print(f"文件大小: {len(data)} 字节")
+
+    # 阈值大于文件：只在内存中
+    app, copies = _make_app(len(data) * 2)
+    result = app.test_client().post('/upload', data={'file': (io.BytesIO(data), '库存.xlsx')}).get_json()
+    print(result)
+    assert result == {'rows': 2000, 'last_sku': 'SKU01999', 'on_disk': False}
+
+    # 阈值小于文件：写入匿名临时文件，解析结果相同
+    app, copies = _make_app(1024)
+    result = app.test_client().post('/upload', data={'file': (io.BytesIO(data), '库存.xlsx')}).get_json()
+    print(result)
+    assert result == {'rows': 2000, 'last_sku': 'SKU01999', 'on_disk': True}
+
+    # 请求结束后副本仍可读取，供后台导入任务使用
+    copy = copies[0]
+    assert len(list(iter_excel_rows(copy))) == 2000
+    copy.close()
+
+
+def test_per_view_content_length():
+    print("=== 测试单个视图放宽请求大小上限 ===")
+    app = Flask(__name__)
+    app.config['UPLOAD_SPOOL_MAX_MEMORY'] = 1024
+    app.config['MAX_CONTENT_LENGTH'] = 1024
+    app.request_class = SpooledUploadRequest
+
+    @app.route('/small', methods=['POST'])
+    def small():
+        return jsonify({'size': len(request.files['file'].read())})
+
+    @app.route('/large', methods=['POST'])
+    def large():
+        request.max_content_length = 64 * 1024
+        return jsonify({'size': len(request.files['file'].read())})
+
+    client = app.test_client()
+    data = b'x' * 10000
+    assert client.post('/small', data={'file': (io.BytesIO(data), 'a.zip')}).status_code == 413
+    response = client.post('/large', data={'file': (io.BytesIO(data), 'a.zip')})
+    print(response.status_code, response.get_json())
+    assert response.get_json() == {'size': 10000}
+    # 放宽的上限只对设置它的请求生效
+    assert client.post('/small', data={'file': (io.BytesIO(data), 'a.zip')}).status_code == 413
+    assert client.post('/large', data={'file': (io.BytesIO(b'x' * 70000), 'a.zip')}).status_code == 413
+
+
+if __name__ == '__main__':
+    test_spooled_upload()
+    test_per_view_content_length()
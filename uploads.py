@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from flask import Request, current_app
+
+# 上传文件直接从请求流解析：不超过UPLOAD_SPOOL_MAX_MEMORY字节时只保存在内存中，
+# 超过时才写入匿名临时文件（创建后即从目录中删除，关闭时释放），不会重名，出错时也不会残留
+
+
+def spooled_file(max_memory):
+    return tempfile.SpooledTemporaryFile(max_size=max_memory, mode='w+b')
+
+
+class SpooledUploadRequest(Request):
+    """按应用配置的内存阈值接收multipart上传的文件（Werkzeug默认超过500KB即写入临时文件）；
+    视图可以在读取请求体之前设置max_content_length，单独放宽该请求的大小上限（如批量导入）"""
+
+    _max_content_length = None
+
+    @property
+    def max_content_length(self):
+        if self._max_content_length is not None:
+            return self._max_content_length
+        return super().max_content_length
+
+    @max_content_length.setter
+    def max_content_length(self, value):
+        self._max_content_length = value
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return spooled_file(current_app.config['UPLOAD_SPOOL_MAX_MEMORY'])
+
+
+def spool_copy(stream, max_memory):
+    """复制上传文件供请求结束后的后台任务读取（请求结束时请求中的文件会被关闭）"""
+    copy = spooled_file(max_memory)
+    stream.seek(0)
+    shutil.copyfileobj(stream, copy)
+    copy.seek(0)
+    return copy
+
+
+def file_sha256(*sources):
+    """计算文件内容的SHA-256（多个文件按顺序连续计算），用于识别重复上传的文件；
+    source为文件路径或已打开的二进制文件，读取后回到文件开头供解析"""
+    digest = hashlib.sha256()
+    for source in sources:
+        f = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+        try:
+            f.seek(0)
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+            f.seek(0)
+        finally:
+            if f is not source:
+                f.close()
+    return digest.hexdigest()
+
+
+class ResumableUploadStore:
+    """分片续传：创建会话 → 按序号上传分片（可乱序、可重传） → 完成。每个会话一个目录，
+    保存元数据（meta.json）、按文件大小预分配的数据文件（data + 原文件扩展名）和已接收分片的标记（received/<序号>，内容为分片的SHA-256）。
+    分片直接写入数据文件中的对应位置，不在内存中拼接；状态都在磁盘上，多进程部署时分片可以由不同进程接收"""
+
+    COPY_BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, root, chunk_size, max_size, ttl):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.ttl = ttl
+
+    def _path(self, upload_id, *parts):
+        return os.path.join(self.root, upload_id, *parts)
+
+    def create(self, filename, size, sha256=None):
+        """创建上传会话，sha256为整个文件的校验值（可选，完成时校验）"""
+        if size <= 0:
+            raise ValueError('文件大小必须大于0')
+        if size > self.max_size:
+            raise ValueError(f'文件大小不能超过{self.max_size // (1024 * 1024)}MB')
+        if sha256 is not None and not re.fullmatch(r'[0-9a-fA-F]{64}', sha256):
+            raise ValueError('sha256格式不正确')
+        self.purge_expired()
+
+        upload_id = uuid.uuid4().hex
+        # 数据文件保留扩展名，解析时按扩展名识别格式
+        data_file = 'data' + os.path.splitext(filename)[1].lower()
+        os.makedirs(self._path(upload_id, 'received'))
+        with open(self._path(upload_id, data_file), 'wb') as f:
+            f.truncate(size)
+        meta = {
+            'id': upload_id,
+            'filename': filename,
+            'data_file': data_file,
+            'size': size,
+            'chunk_size': self.chunk_size,
+            'total_chunks': -(-size // self.chunk_size),
+            'sha256': sha256.lower() if sha256 else None,
+            'created_at': time.time(),
+        }
+        with open(self._path(upload_id, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        return meta
+
+    def load(self, upload_id):
+        """读取会话元数据，会话不存在（或已过期删除）时返回None"""
+        if not re.fullmatch(r'[0-9a-f]{32}', upload_id):
+            return None
+        try:
+            with open(self._path(upload_id, 'meta.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def received(self, meta):
+        """已接收的分片序号（升序）"""
+        return sorted(int(name) for name in os.listdir(self._path(meta['id'], 'received')))
+
+    def describe(self, meta):
+        info = {name: meta[name] for name in ('id', 'filename', 'size', 'chunk_size', 'total_chunks')}
+        info['received'] = self.received(meta)
+        return info
+
+    def write_chunk(self, meta, index, stream, sha256=None):
+        """把请求体中的分片按块写入数据文件，大小或校验值不符时抛出ValueError（该分片需要重传）"""
+        if not 0 <= index < meta['total_chunks']:
+            raise ValueError(f'分片序号超出范围：0 ~ {meta["total_chunks"] - 1}')
+        offset = index * meta['chunk_size']
+        expected = min(meta['chunk_size'], meta['size'] - offset)
+        marker = self._path(meta['id'], 'received', str(index))
+        # 重传的分片先取消已接收标记，写入并校验通过后再标记
+        if os.path.exists(marker):
+            os.remove(marker)
+
+        digest = hashlib.sha256()
+        written = 0
+        with open(self._path(meta['id'], meta['data_file']), 'r+b') as f:
+            f.seek(offset)
+            while True:
+                # 多读一个字节以发现超长的分片
+                block = stream.read(min(self.COPY_BLOCK_SIZE, expected - written + 1))
+                if not block:
+                    break
+                written += len(block)
+                if written > expected:
+                    raise ValueError(f'分片{index}大小不正确：应为{expected}字节')
+                digest.update(block)
+                f.write(block)
+        if written != expected:
+            raise ValueError(f'分片{index}大小不正确：应为{expected}字节，收到{written}字节')
+        checksum = digest.hexdigest()
+        if sha256 and sha256.lower() != checksum:
+            raise ValueError(f'分片{index}校验失败，请重新上传')
+
+        with open(marker, 'w') as f:
+            f.write(checksum)
+        # 会话按最后一次上传分片的时间计算过期
+        os.utime(self._path(meta['id'], 'meta.json'))
+        return checksum
+
+    def complete(self, meta):
+        """所有分片都已接收且整个文件的校验值一致时返回数据文件路径，否则抛出ValueError；
+        缺少分片时保留会话以便续传，整个文件校验失败时无法确定哪个分片出错，删除会话"""
+        received = set(self.received(meta))
+        missing = [index for index in range(meta['total_chunks']) if index not in received]
+        if missing:
+            raise ValueError(f'还有{len(missing)}个分片未上传：{missing[:10]}')
+        path = self._path(meta['id'], meta['data_file'])
+        if meta['sha256']:
+            if file_sha256(path) != meta['sha256']:
+                self.discard(meta['id'])
+                raise ValueError('文件校验失败：上传的内容与sha256不一致，请重新上传')
+        return path
+
+    def discard(self, upload_id):
+        shutil.rmtree(self._path(upload_id), ignore_errors=True)
+
+    def purge_expired(self):
+        """删除超过ttl秒没有上传分片的会话"""
+        if not os.path.isdir(self.root):
+            return
+        deadline = time.time() - self.ttl
+        for upload_id in os.listdir(self.root):
+            try:
+                expired = os.path.getmtime(self._path(upload_id, 'meta.json')) < deadline
+            except OSError:
+                # 没有元数据的目录（创建中途失败）同样清理
+                expired = os.path.getmtime(self._path(upload_id)) < deadline
+            if expired:
+                self.discard(upload_id)